@@ -8,7 +8,8 @@ matplotlib.use('AGG')
 import numpy as np
 
 from acoustics.emit_receive import Emitter
-from simulation.acoustic_sim import simulate_2d_static_emitter_field
+from simulation.acoustic_sim import plot_2d_field
+from simulation.beam_steering import PhaseSweep
 
 
 def main():
@@ -22,14 +23,19 @@ def main():
         x = (ind - num_emitters/2) * wave_length/2
         emitters.append(Emitter(init_position=np.array([x,-2*wave_length,0]), init_attitude=np.array([0,0,0]), emit_power=30, frequency=freq,
                           antenna_pattern=None))
+    phase_offsets = list()
     for phase_delta in phase_deltas:
         phase_offset = list()
         deg_shift = phase_delta/num_emitters
         for ind in range(num_emitters):
             phase_offset.append(ind * deg_shift)
-        bb = np.array([[-20*wave_length,20*wave_length],[-4*wave_length,200*wave_length]])
-        simulate_2d_static_emitter_field(emitters=emitters, bounding_box=bb, spatial_resolution=wave_length/4,
-                                         phase_offsets=phase_offset, output_dir=os.path.dirname(__file__), title='%semitters_%s_phase_delta' % (num_emitters, phase_delta))
+        phase_offsets.append(phase_offset)
+    bb = np.array([[-20*wave_length,20*wave_length],[-4*wave_length,200*wave_length]])
+    sweep = PhaseSweep.from_grid(emitters, bounding_box=bb, spatial_resolution=wave_length/4)
+    fields = sweep.fields(phase_offsets)
+    for phase_delta, field in zip(phase_deltas, fields):
+        plot_2d_field(sweep.x, sweep.y, field.real, emitters=emitters, output_dir=os.path.dirname(__file__),
+                      title='%semitters_%s_phase_delta' % (num_emitters, phase_delta))
     # logger = logging.getLogger()
     # logger.setLevel(logging.INFO)
     #
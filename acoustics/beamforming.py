@@ -0,0 +1,270 @@
+from collections import OrderedDict
+
+import numpy as np
+from scipy import fft, signal
+
+DELAY_AND_SUM_CHUNK_BYTES = 2**20
+
+
+def look_directions(azimuth, elevation):
+    """
+    Grid of far field look directions, with the same angle convention as AcousticPattern: azimuth from +x towards +y
+    and elevation from the x-y plane towards +z.
+
+    :param np.ndarray azimuth: Azimuths [rad] of shape [Na].
+    :param np.ndarray elevation: Elevations [rad] of shape [Ne].
+    :return: Unit vectors of shape [Na * Ne, 3], azimuth major.
+    """
+    az, el = np.meshgrid(np.asarray(azimuth, dtype=np.float64), np.asarray(elevation, dtype=np.float64),
+                         indexing='ij')
+    return np.column_stack((np.ravel(np.cos(el) * np.cos(az)), np.ravel(np.cos(el) * np.sin(az)),
+                            np.ravel(np.sin(el))))
+
+
+class Beamformer(object):
+    """
+    Steered response power beamformer for a CompositeMicrophoneArray, over a grid of far field look directions or
+    near field focus points. Three implementations share the same steering delays:
+
+    - delay_and_sum: time domain, channels shifted by whole samples and summed.
+    - frequency_domain: one FFT per channel, then a phase shift and sum per frequency bin as a batched matrix product.
+    - csm_power: conventional beamforming of a cross spectral matrix averaged over several segments, or segment_power
+      on the segment spectra directly when there are fewer segments than microphones.
+
+    Steering vectors depend only on the steering delays and the FFT bins, and are cached per combination so repeated
+    blocks only pay for the FFT and the matrix products. The delays are computed once from the microphone positions;
+    call update_geometry after moving microphones.
+
+    e.x: beamformer = Beamformer(mic_array, sample_rate=48E3, directions=look_directions(az, el))
+         for block in blocks:                                          # block of shape [M, 2048]
+             power = beamformer.frequency_domain(block, f_min=500, f_max=8000)
+             direction = beamformer.directions[np.argmax(power)]
+    """
+
+    def __init__(self, microphone_array, sample_rate, directions=None, focus_points=None, speed_of_sound=337,
+                 max_cached_steering=8, dtype=np.complex64):
+        """
+        :param CompositeMicrophoneArray microphone_array: Microphones, in the order of the signal channels.
+        :param float sample_rate: Signal sample rate [Hz].
+        :param np.ndarray directions: Far field look directions of shape [G, 3], pointing from the array to the
+        source. Unit length.
+        :param np.ndarray focus_points: Near field focus points of shape [G, 3], used instead of directions.
+        :param float speed_of_sound: Speed of sound [m/s].
+        :param int max_cached_steering: Number of steering vector sets kept in the LRU cache.
+        :param dtype: np.complex64 or np.complex128 for the steering vectors and spectra.
+        """
+        if (directions is None) == (focus_points is None):
+            raise ValueError('Give either look directions or focus points')
+        self.microphone_array = microphone_array
+        self.sample_rate = float(sample_rate)
+        self.speed_of_sound = speed_of_sound
+        self.directions = None if directions is None else np.atleast_2d(np.asarray(directions, dtype=np.float64))
+        self.focus_points = None if focus_points is None else np.atleast_2d(np.asarray(focus_points,
+                                                                                      dtype=np.float64))
+        self.max_cached_steering = max_cached_steering
+        self.dtype = np.dtype(dtype)
+        self._steering = OrderedDict()
+        self.update_geometry()
+
+    @property
+    def positions(self):
+        return self.microphone_array.positions
+
+    @property
+    def num_looks(self):
+        return len(self.delays)
+
+    def steering_delays(self):
+        """
+        Delay of each channel for each look, such that sum_m x_m(t - delay_gm) aligns a source in look g.
+
+        :return: np.ndarray of shape [G, M] in seconds.
+        """
+        positions = self.positions
+        center = positions.mean(axis=0)
+        if self.directions is not None:
+            return (self.directions @ (positions - center).T) / self.speed_of_sound
+        reference = np.linalg.norm(self.focus_points - center, axis=1)
+        distance = np.linalg.norm(self.focus_points[:, np.newaxis, :] - positions[np.newaxis, :, :], axis=2)
+        return (reference[:, np.newaxis] - distance) / self.speed_of_sound
+
+    def update_geometry(self):
+        """
+        Recompute the steering delays from the current microphone positions, e.g. after the array has moved. Steering
+        vectors cached for the old delays are no longer used.
+        """
+        self.delays = self.steering_delays()
+        self._geometry_key = hash(self.delays.tobytes())
+
+    def steering_vectors(self, freqs):
+        """
+        Cached steering vectors exp(-i*2*pi*f*delay) / M.
+
+        :param np.ndarray freqs: Frequencies [Hz] of shape [F].
+        :return: np.ndarray of shape [F, G, M].
+        """
+        freqs = np.asarray(freqs, dtype=np.float64)
+        key = (self._geometry_key, freqs.tobytes())
+        steering = self._steering.get(key)
+        if steering is None:
+            cycles = freqs[:, np.newaxis, np.newaxis] * self.delays[np.newaxis, :, :]
+            cycles -= np.floor(cycles)
+            steering = (np.exp(-2j*np.pi * cycles) / self.delays.shape[1]).astype(self.dtype)
+            self._steering[key] = steering
+            if len(self._steering) > self.max_cached_steering:
+                self._steering.popitem(last=False)
+        else:
+            self._steering.move_to_end(key)
+        return steering
+
+    def delay_and_sum(self, block, max_chunk_bytes=DELAY_AND_SUM_CHUNK_BYTES):
+        """
+        Time domain delay and sum, with the delays rounded to whole samples. Computed in the real precision of dtype.
+
+        :param np.ndarray block: Signals of shape [M, N].
+        :param int max_chunk_bytes: Size of the channel windows gathered per chunk of looks, best kept within cache.
+        :return: Mean output power of each look, shape [G], over the samples every channel covers.
+        """
+        real_dtype = np.empty(0, dtype=self.dtype).real.dtype
+        block = np.asarray(block, dtype=real_dtype)
+        num_mics, num_samples = block.shape
+        shifts = np.round(self.delays * self.sample_rate).astype(np.int64)
+        shifts -= shifts.min()
+        start = int(shifts.max())
+        if start >= num_samples:
+            raise ValueError('Block of %s samples is shorter than the steering delays' % num_samples)
+        num_valid = num_samples - start
+
+        # Each look takes a contiguous window of every channel, gathered for all channels of a chunk of looks at once
+        # as rows of a sliding window view
+        windows = np.lib.stride_tricks.sliding_window_view(block, num_valid, axis=1)
+        offsets = start - shifts
+        channels = np.arange(num_mics)
+        power = np.empty(self.num_looks)
+        look_chunk = int(max(1, min(self.num_looks, max_chunk_bytes // (num_mics * num_valid * real_dtype.itemsize))))
+        for g_start in range(0, self.num_looks, look_chunk):
+            g_slice = slice(g_start, min(g_start + look_chunk, self.num_looks))
+            output = windows[channels, offsets[g_slice]].sum(axis=1)
+            power[g_slice] = np.einsum('gn,gn->g', output, output)
+        return power / (num_mics**2 * num_valid)
+
+    def spectra(self, block, f_min=None, f_max=None, window='hann'):
+        """
+        :param np.ndarray block: Signals of shape [M, N].
+        :return: (frequencies [F], spectra [F, M]) of the bins within [f_min, f_max].
+        """
+        block = np.asarray(block)
+        num_samples = block.shape[1]
+        weights = signal.get_window(window, num_samples) if window is not None else np.ones(num_samples)
+        spectra = fft.rfft(block * weights, axis=1)
+        freqs = fft.rfftfreq(num_samples, d=1.0 / self.sample_rate)
+        band = _band(freqs, f_min, f_max)
+        return freqs[band], np.ascontiguousarray(spectra[:, band].T, dtype=self.dtype)
+
+    def frequency_domain(self, block, f_min=None, f_max=None, window='hann'):
+        """
+        Frequency domain delay and sum, exact for fractional delays.
+
+        :param np.ndarray block: Signals of shape [M, N].
+        :param float f_min: Lowest frequency included [Hz], if None from the first non DC bin.
+        :param float f_max: Highest frequency included [Hz], if None up to Nyquist.
+        :param str window: scipy.signal window applied to each channel.
+        :return: Steered response power of each look, shape [G], summed over the band.
+        """
+        freqs, spectra = self.spectra(block, f_min, f_max, window)
+        steering = self.steering_vectors(freqs)
+        output = np.matmul(steering, spectra[:, :, np.newaxis])[:, :, 0]
+        return np.sum(output.real**2 + output.imag**2, axis=0)
+
+    def segment_spectra(self, signals, segment_length=1024, overlap=0.5, f_min=None, f_max=None, window='hann'):
+        """
+        Spectra of overlapping segments of the signals.
+
+        :param np.ndarray signals: Signals of shape [M, N], N >= segment_length.
+        :return: (frequencies [F], spectra [F, M, S]) of the S segments.
+        """
+        signals = np.asarray(signals)
+        step = max(1, int(segment_length * (1 - overlap)))
+        starts = range(0, signals.shape[1] - segment_length + 1, step)
+        segments = np.stack([signals[:, start:start + segment_length] for start in starts])
+        weights = signal.get_window(window, segment_length) if window is not None else np.ones(segment_length)
+        spectra = fft.rfft(segments * weights, axis=2)
+        freqs = fft.rfftfreq(segment_length, d=1.0 / self.sample_rate)
+        band = _band(freqs, f_min, f_max)
+        return freqs[band], np.ascontiguousarray(np.transpose(spectra[:, :, band], (2, 1, 0)), dtype=self.dtype)
+
+    def cross_spectral_matrix(self, signals, segment_length=1024, overlap=0.5, f_min=None, f_max=None,
+                              window='hann'):
+        """
+        Cross spectral matrix C_f = E[X_f X_f^H], averaged over overlapping segments.
+
+        :param np.ndarray signals: Signals of shape [M, N], N >= segment_length.
+        :return: (frequencies [F], csm [F, M, M])
+        """
+        freqs, spectra = self.segment_spectra(signals, segment_length, overlap, f_min, f_max, window)
+        csm = np.matmul(spectra, np.conj(np.swapaxes(spectra, 1, 2))) / spectra.shape[2]
+        return freqs, csm
+
+    def csm_power(self, freqs, csm, remove_diagonal=False):
+        """
+        Conventional beamforming of a cross spectral matrix, sum_f w_f^T C_f conj(w_f), the expected power of the
+        frequency_domain output.
+
+        :param np.ndarray freqs: Frequencies of the csm [Hz].
+        :param np.ndarray csm: Cross spectral matrix of shape [F, M, M].
+        :param bool remove_diagonal: Remove the auto spectra, suppressing uncorrelated (e.g. wind) noise.
+        :return: Steered response power of each look, shape [G].
+        """
+        if remove_diagonal:
+            csm = csm.copy()
+            idx = np.arange(csm.shape[1])
+            csm[:, idx, idx] = 0
+        steering = self.steering_vectors(freqs)
+        projected = np.matmul(steering, csm)
+        return np.sum(np.real(np.sum(projected * np.conj(steering), axis=2)), axis=0)
+
+    def segment_power(self, freqs, spectra, remove_diagonal=False):
+        """
+        csm_power of the cross spectral matrix of segment spectra, without forming it: w^T C conj(w) is the mean of
+        |w^T X_s|^2 over the segments, F G M S operations instead of F G M M, so cheaper with fewer segments than
+        microphones.
+
+        :param np.ndarray freqs: Frequencies of the spectra [Hz].
+        :param np.ndarray spectra: Segment spectra of shape [F, M, S], see segment_spectra.
+        :param bool remove_diagonal: Remove the auto spectra, see csm_power.
+        :return: Steered response power of each look, shape [G].
+        """
+        steering = self.steering_vectors(freqs)
+        output = np.matmul(steering, spectra)
+        power = np.sum(output.real**2 + output.imag**2, axis=(0, 2))
+        if remove_diagonal:
+            auto = np.sum(spectra.real**2 + spectra.imag**2, axis=2)
+            power -= np.einsum('fgm,fm->g', steering.real**2 + steering.imag**2, auto)
+        return power / spectra.shape[2]
+
+    def steered_response(self, signals, method='frequency', **kwargs):
+        """
+        :param str method: 'frequency', 'delay_and_sum' or 'csm'.
+        :return: Steered response power of each look, shape [G].
+        """
+        if method == 'frequency':
+            return self.frequency_domain(signals, **kwargs)
+        elif method == 'delay_and_sum':
+            return self.delay_and_sum(signals, **kwargs)
+        elif method == 'csm':
+            remove_diagonal = kwargs.pop('remove_diagonal', False)
+            freqs, spectra = self.segment_spectra(signals, **kwargs)
+            if spectra.shape[2] < spectra.shape[1]:
+                return self.segment_power(freqs, spectra, remove_diagonal=remove_diagonal)
+            csm = np.matmul(spectra, np.conj(np.swapaxes(spectra, 1, 2))) / spectra.shape[2]
+            return self.csm_power(freqs, csm, remove_diagonal=remove_diagonal)
+        raise ValueError('Unknown beamforming method: %s' % method)
+
+
+def _band(freqs, f_min, f_max):
+    band = freqs > 0
+    if f_min is not None:
+        band &= freqs >= f_min
+    if f_max is not None:
+        band &= freqs <= f_max
+    return band
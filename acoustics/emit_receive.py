@@ -1,7 +1,156 @@
+import numpy as np
+from scipy.special import j1
+
+from acoustics.beamforming import Beamformer
+from utilities.coordinate_systems import rotation_matrix
+
 
 class AcousticPattern(object):
-    def __init__(self):
-        pass
+    """
+    Directivity of an emitter or microphone as a table of amplitude gains over azimuth and elevation in the element's
+    body frame, bilinearly interpolated. Boresight is the body +x axis, azimuth is measured from +x towards +y and
+    elevation from the x-y plane towards +z.
+
+    e.x: pattern = AcousticPattern.piston(radius=0.01, frequency=25E3)
+         emitter = Emitter(position, attitude, emit_power=30, frequency=25E3, antenna_pattern=pattern)
+         gain = pattern.gain(directions, attitude)          # directions of shape [..., 3] in the inertial frame
+    """
+
+    def __init__(self, azimuth=None, elevation=None, gain=None):
+        """
+        :param np.ndarray azimuth: Table azimuths [rad] of shape [Na], increasing, covering -pi to pi.
+        :param np.ndarray elevation: Table elevations [rad] of shape [Ne], increasing, covering -pi/2 to pi/2.
+        :param np.ndarray gain: Amplitude gain of shape [Na, Ne]. If None the pattern is omnidirectional.
+        """
+        if gain is None:
+            azimuth = np.array([-np.pi, np.pi])
+            elevation = np.array([-np.pi/2, np.pi/2])
+            gain = np.ones((2, 2))
+        self.azimuth = np.asarray(azimuth, dtype=np.float64)
+        self.elevation = np.asarray(elevation, dtype=np.float64)
+        self.table = np.asarray(gain, dtype=np.float64)
+        if self.table.shape != (len(self.azimuth), len(self.elevation)):
+            raise ValueError('Gain table shape %s does not match %s azimuths and %s elevations' % (
+                self.table.shape, len(self.azimuth), len(self.elevation)))
+
+    @classmethod
+    def from_off_axis(cls, func, resolution=np.radians(1.0)):
+        """
+        Tabulate an axisymmetric pattern.
+
+        :param func: Vectorized function of the angle off boresight [rad] returning the amplitude gain.
+        :param float resolution: Table spacing [rad].
+        """
+        azimuth = np.linspace(-np.pi, np.pi, int(round(2*np.pi / resolution)) + 1)
+        elevation = np.linspace(-np.pi/2, np.pi/2, int(round(np.pi / resolution)) + 1)
+        az, el = np.meshgrid(azimuth, elevation, indexing='ij')
+        off_axis = np.arccos(np.clip(np.cos(el) * np.cos(az), -1.0, 1.0))
+        return cls(azimuth, elevation, func(off_axis))
+
+    @classmethod
+    def omnidirectional(cls):
+        return cls()
+
+    @classmethod
+    def piston(cls, radius, frequency, speed_of_sound=337, baffled=True, resolution=np.radians(1.0)):
+        """
+        Circular piston, 2 * J1(ka sin(theta)) / (ka sin(theta)). A baffled piston radiates nothing behind the baffle.
+
+        :param float radius: Piston radius [m].
+        :param float frequency: Frequency [Hz].
+        """
+        ka = 2*np.pi*frequency / speed_of_sound * radius
+
+        def gain(off_axis):
+            x = ka * np.sin(off_axis)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                value = np.where(np.abs(x) > 1E-9, 2 * j1(x) / x, 1.0)
+            if baffled:
+                value = np.where(off_axis > np.pi/2, 0.0, value)
+            return np.abs(value)
+        return cls.from_off_axis(gain, resolution=resolution)
+
+    @classmethod
+    def dipole(cls, resolution=np.radians(1.0)):
+        return cls.from_off_axis(lambda off_axis: np.abs(np.cos(off_axis)), resolution=resolution)
+
+    @classmethod
+    def cardioid(cls, resolution=np.radians(1.0)):
+        return cls.from_off_axis(lambda off_axis: 0.5 * (1 + np.cos(off_axis)), resolution=resolution)
+
+    def gain_at(self, azimuth, elevation):
+        """
+        Interpolated gain at arrays of body frame angles, azimuth is wrapped into [-pi, pi).
+
+        :return: np.ndarray of gains, broadcast over azimuth and elevation.
+        """
+        azimuth = np.remainder(np.asarray(azimuth) + np.pi, 2*np.pi) - np.pi
+        az_idx, az_weight = _interval(self.azimuth, azimuth)
+        el_idx, el_weight = _interval(self.elevation, elevation)
+        table = self.table
+        return ((table[az_idx, el_idx] * (1 - el_weight) + table[az_idx, el_idx + 1] * el_weight) * (1 - az_weight) +
+                (table[az_idx + 1, el_idx] * (1 - el_weight) + table[az_idx + 1, el_idx + 1] * el_weight) * az_weight)
+
+    def gain_body(self, x, y, z):
+        """
+        Gain in the directions of body frame vector components, each of the same (broadcastable) shape.
+        """
+        return self.gain_at(np.arctan2(y, x), np.arctan2(z, np.hypot(x, y)))
+
+    def gain(self, directions, attitude=None):
+        """
+        :param np.ndarray directions: Inertial frame direction vectors of shape [..., 3], need not be normalised.
+        :param np.ndarray attitude: Element (roll, pitch, yaw) [rad], if None the body and inertial frames are aligned.
+        :return: Gains of shape directions.shape[:-1].
+        """
+        directions = np.asarray(directions, dtype=np.float64)
+        if attitude is not None:
+            directions = directions @ attitude_rotation(attitude).T
+        return self.gain_body(directions[..., 0], directions[..., 1], directions[..., 2])
+
+
+def attitude_rotation(attitude):
+    """
+    :param np.ndarray attitude: (roll, pitch, yaw) [rad] of shape [3] or [E, 3].
+    :return: Inertial to body frame rotation matrices, as utilities.coordinate_systems.rotation_matrix.
+    """
+    return rotation_matrix(np.asarray(attitude, dtype=np.float64)[..., :3])
+
+
+def element_gains(patterns, attitudes, dx, dy, dz):
+    """
+    Gains of a set of elements in the directions of a block of vectors, without any per point Python calls.
+
+    :param list patterns: AcousticPattern (or None for omnidirectional) of each element.
+    :param np.ndarray attitudes: (roll, pitch, yaw) of each element, shape [E, 3].
+    :param np.ndarray dx: Inertial x components of the vectors from each element, shape [E, ...] (or broadcastable).
+    :param np.ndarray dy: Inertial y components.
+    :param np.ndarray dz: Inertial z components.
+    :return: Gains of the broadcast shape of dx, dy and dz, or None if every element is omnidirectional.
+    """
+    if all(pattern is None for pattern in patterns):
+        return None
+    shape = np.broadcast(dx, dy, dz).shape
+    gains = np.ones(shape)
+    column = (slice(None),) + (np.newaxis,) * (len(shape) - 1)
+    rotation = attitude_rotation(np.reshape(attitudes, (len(patterns), -1)))
+    for pattern in set(pattern for pattern in patterns if pattern is not None):
+        idx = np.array([ind for ind, element_pattern in enumerate(patterns) if element_pattern is pattern])
+        r = rotation[idx][column]
+        select = lambda component: component[idx] if np.ndim(component) > 0 and np.shape(component)[0] == len(
+            patterns) else component
+        x, y, z = select(dx), select(dy), select(dz)
+        gains[idx] = pattern.gain_body(r[..., 0, 0] * x + r[..., 0, 1] * y + r[..., 0, 2] * z,
+                                       r[..., 1, 0] * x + r[..., 1, 1] * y + r[..., 1, 2] * z,
+                                       r[..., 2, 0] * x + r[..., 2, 1] * y + r[..., 2, 2] * z)
+    return gains
+
+
+def _interval(grid, value):
+    idx = np.clip(np.searchsorted(grid, value, side='right') - 1, 0, len(grid) - 2)
+    weight = np.clip((value - grid[idx]) / (grid[idx + 1] - grid[idx]), 0.0, 1.0)
+    return idx, weight
+
 
 class Emitter(object):
     def __init__(self, init_position, init_attitude, emit_power, frequency, antenna_pattern):
@@ -20,3 +169,20 @@ class Microphone(object):
 class CompositeMicrophoneArray(object):
     def __init__(self, microphones):
         self.microphones = microphones
+
+    @property
+    def positions(self):
+        """
+        :return: Microphone positions of shape [M, 3].
+        """
+        positions = np.zeros((len(self.microphones), 3))
+        for ind, microphone in enumerate(self.microphones):
+            position = np.ravel(microphone.position)[:3]
+            positions[ind, :len(position)] = position
+        return positions
+
+    def beamformer(self, sample_rate, directions=None, focus_points=None, **kwargs):
+        """
+        :return: acoustics.beamforming.Beamformer over this array.
+        """
+        return Beamformer(self, sample_rate, directions=directions, focus_points=focus_points, **kwargs)
@@ -1,5 +1,55 @@
+import numpy as np
+
 
 class Airfoil(object):
 
-    def __init__(self):
-        pass
\ No newline at end of file
+    def __init__(self, lift_slope=2 * np.pi, zero_lift_angle=0.0, cl_max=1.4, cd0=0.01, drag_factor=0.0, cm0=0.0,
+                 name=None):
+        """
+        Section characteristics of an airfoil, linear in the angle of attack up to stall. The defaults are thin airfoil
+        theory values for a symmetric section.
+
+        e.x: Airfoil(lift_slope=6.0, zero_lift_angle=np.radians(-2.0), cl_max=1.5, cd0=0.008, drag_factor=0.01,
+                     cm0=-0.05, name='NACA 2412')
+
+        :param float lift_slope: Lift curve slope dCl/dalpha [1/rad].
+        :param float zero_lift_angle: Angle of attack of zero lift [rad].
+        :param float cl_max: Magnitude of the lift coefficient at stall.
+        :param float cd0: Zero lift profile drag coefficient.
+        :param float drag_factor: k of the profile drag polar Cd = cd0 + k Cl^2.
+        :param float cm0: Pitching moment coefficient about the quarter chord, positive nose up.
+        :param str name: Name for logging.
+        """
+        self.lift_slope = lift_slope
+        self.zero_lift_angle = zero_lift_angle
+        self.cl_max = cl_max
+        self.cd0 = cd0
+        self.drag_factor = drag_factor
+        self.cm0 = cm0
+        self.name = name
+
+    def coefficients(self, alpha):
+        """
+        :param np.ndarray alpha: Angles of attack [rad].
+        :return: (Cl, Cd, Cm) of the section at alpha, see section_coefficients.
+        """
+        return section_coefficients(alpha, self.lift_slope, self.zero_lift_angle, self.cl_max, self.cd0,
+                                    self.drag_factor, self.cm0)
+
+
+def section_coefficients(alpha, lift_slope, zero_lift_angle, cl_max, cd0, drag_factor=0.0, cm0=0.0):
+    """
+    Sectional coefficients of the linear airfoil model, vectorized over alpha and every characteristic. The lift is
+    linear up to +-cl_max, held there past stall and faded by cos(alpha - zero_lift_angle) to zero at 90 degrees, and a
+    flat plate drag rise 2 (sin^2(alpha - zero_lift_angle) - sin^2(stall angle)) is added past stall, so the
+    coefficients stay continuous for the integrators.
+
+    :param np.ndarray alpha: Angles of attack [rad], in (-pi, pi].
+    :return: (Cl, Cd, Cm), each broadcast to the shape of the inputs.
+    """
+    relative = alpha - zero_lift_angle
+    cl = np.minimum(np.maximum(lift_slope * relative, -cl_max), cl_max) * np.cos(relative)
+    stall = np.sin(np.minimum(cl_max / lift_slope, np.pi / 2))**2
+    cd = cd0 + drag_factor * cl**2 + 2 * np.maximum(np.sin(relative)**2 - stall, 0.0)
+    cm = np.zeros_like(cl) + cm0
+    return cl, cd, cm
@@ -0,0 +1,205 @@
+"""
+Strip theory aerodynamic loads of lifting surfaces. A wing is cut into spanwise strips once, and the strip quarter chord
+centroids, axes, chords, areas, twist and airfoil characteristics are kept as arrays. Each load evaluation then takes
+the local velocity of every strip including the rotation of the wing (v + w x r), the local angle of attack in the plane
+of the section, and the sectional lift, drag and pitching moment in one vectorized pass over the strips.
+
+Geometry is in the wing frame, which has the axes of the vehicle body frame (x forward, y right, z down) rotated by the
+wing's component angle, with the origin at the root quarter chord.
+
+e.x: strips = StripGeometry.from_wing(wing, strips_per_segment=8)
+     force, moment = strips.loads(velocity=(30.0, 0.0, 2.0), angular_rate=(0.0, 0.1, 0.0), density=1.225)
+"""
+
+import numpy as np
+
+from aerodynamics.airfoil import Airfoil, section_coefficients
+from utilities.coordinate_systems import cross
+
+SECTION_CHARACTERISTICS = ('lift_slope', 'zero_lift_angle', 'cl_max', 'cd0', 'drag_factor', 'cm0')
+
+
+def section_axes(polyhedral, twist):
+    """
+    :param float polyhedral: Polyhedral of the segment [rad], positive tip up.
+    :param float twist: Twist of the section [rad], positive nose up.
+    :return: (span_axis, chord_axis, normal) unit vectors of a right hand segment in the wing frame, mirror y for the
+    left hand side of a symmetric wing.
+    """
+    span_axis = np.array([0.0, np.cos(polyhedral), -np.sin(polyhedral)])
+    normal = np.array([0.0, -np.sin(polyhedral), -np.cos(polyhedral)])
+    chord_axis = np.array([1.0, 0.0, 0.0])
+    # Twist is a nose up rotation of the section about the span axis
+    return (span_axis, np.cos(twist) * chord_axis + np.sin(twist) * normal,
+            np.cos(twist) * normal - np.sin(twist) * chord_axis)
+
+
+class StripGeometry(object):
+    """
+    Spanwise strips of a lifting surface. Every attribute is an array with one row per strip:
+
+    position     quarter chord centroid [m], [S, 3]
+    span_axis    unit vector along the span, outboard, [S, 3]
+    chord_axis   unit vector along the (twisted) chord, towards the leading edge, [S, 3]
+    normal       unit vector normal to the (twisted) chord, up, [S, 3]
+    pitch_axis   chord_axis x normal, the nose up rotation axis of the section, [S, 3]
+    chord, width, area, twist [rad], and the Airfoil characteristics of SECTION_CHARACTERISTICS, [S]
+    """
+
+    def __init__(self, position, span_axis, chord_axis, normal, chord, width, twist=None, **characteristics):
+        """
+        :param np.ndarray position: Strip quarter chord centroids [m], [S, 3].
+        :param np.ndarray span_axis: Outboard unit vectors, [S, 3].
+        :param np.ndarray chord_axis: Unit vectors along the chord towards the leading edge, twist included, [S, 3].
+        :param np.ndarray normal: Unit vectors normal to the chord, up, twist included, [S, 3].
+        :param np.ndarray chord: Strip chords [m], [S].
+        :param np.ndarray width: Strip widths along the span [m], [S].
+        :param np.ndarray twist: Strip twist [rad], [S]. Only kept for reference, the axes already include it.
+        :param characteristics: Section characteristics named in SECTION_CHARACTERISTICS, scalar or [S], defaulting
+        to those of Airfoil().
+        """
+        self.position = np.asarray(position, dtype=np.float64)
+        num_strips = len(self.position)
+        self.span_axis = np.asarray(span_axis, dtype=np.float64)
+        self.chord_axis = np.asarray(chord_axis, dtype=np.float64)
+        self.normal = np.asarray(normal, dtype=np.float64)
+        self.pitch_axis = cross(self.chord_axis, self.normal)
+        self.chord = np.asarray(chord, dtype=np.float64)
+        self.width = np.asarray(width, dtype=np.float64)
+        self.area = self.chord * self.width
+        self.twist = np.zeros(num_strips) if twist is None else np.asarray(twist, dtype=np.float64)
+
+        default = Airfoil()
+        unknown = set(characteristics) - set(SECTION_CHARACTERISTICS)
+        if unknown:
+            raise TypeError('Unknown section characteristics: %s' % ', '.join(sorted(unknown)))
+        for name in SECTION_CHARACTERISTICS:
+            value = characteristics.get(name, getattr(default, name))
+            setattr(self, name, np.broadcast_to(np.asarray(value, dtype=np.float64), (num_strips,)).copy())
+
+        # The chordwise and normal velocities are linear in (v, w), c.(v + w x r) = c.v + (r x c).w, and the total
+        # loads linear in the chordwise and normal forces and pitching moments, so each evaluation is one product
+        # with each of these maps around the sectional math.
+        chord_moment_arm = cross(self.position, self.chord_axis)
+        normal_moment_arm = cross(self.position, self.normal)
+        self._velocity_map = np.block([[self.chord_axis, chord_moment_arm], [self.normal, normal_moment_arm]])
+        self._load_map = np.block([[self.chord_axis.T, self.normal.T, np.zeros((3, num_strips))],
+                                   [chord_moment_arm.T, normal_moment_arm.T, self.pitch_axis.T]])
+
+    def __len__(self):
+        return len(self.position)
+
+    @classmethod
+    def from_wing(cls, wing, strips_per_segment=8, finite_span_correction=True, oswald_efficiency=0.9):
+        """
+        Discretize a vehicles.components.wing.Wing into strips, following the quarter chord line of
+        Wing.planform_coordinates bent up by the polyhedral of each segment. The twist of a segment applies to all of
+        its strips, the airfoil characteristics are interpolated between the segment's root and tip airfoils, and
+        symmetric wings are mirrored about the xz plane.
+
+        :param wing: Wing with standardized segment lists (span, chord, sweep, polyhedral and twist in degrees).
+        :param int strips_per_segment: Number of equal width strips each segment is cut into.
+        :param bool finite_span_correction: Reduce the section lift slope by the lifting line factor
+        1 / (1 + a / (pi AR)) and add the induced drag Cl^2 / (pi e AR) to the drag polar, since strips alone do not
+        see the downwash of the trailing vortices.
+        :param float oswald_efficiency: Span efficiency e of the induced drag.
+        :return: StripGeometry
+        """
+        airfoils = wing.airfoil if wing.airfoil is not None else [Airfoil()] * (len(wing.span) + 1)
+        eta = (np.arange(strips_per_segment) + 0.5) / strips_per_segment
+
+        root = np.zeros(3)
+        rows = {name: list() for name in ('position', 'span_axis', 'chord_axis', 'normal', 'chord', 'width',
+                                          'twist') + SECTION_CHARACTERISTICS}
+        for inx, span in enumerate(wing.span):
+            sweep = np.deg2rad(wing.sweep[inx])
+            polyhedral = np.deg2rad(wing.polyhedral[inx])
+            twist = np.deg2rad(wing.twist[inx])
+
+            span_axis, chord_axis, normal = section_axes(polyhedral, twist)
+
+            tip = root + span * np.array([-np.tan(sweep), np.cos(polyhedral), -np.sin(polyhedral)])
+            rows['position'].append(root + eta[:, np.newaxis] * (tip - root))
+            rows['span_axis'].append(np.tile(span_axis, (strips_per_segment, 1)))
+            rows['chord_axis'].append(np.tile(chord_axis, (strips_per_segment, 1)))
+            rows['normal'].append(np.tile(normal, (strips_per_segment, 1)))
+            rows['chord'].append(wing.chord[inx] + eta * (wing.chord[inx + 1] - wing.chord[inx]))
+            rows['width'].append(np.full(strips_per_segment, span / strips_per_segment))
+            rows['twist'].append(np.full(strips_per_segment, twist))
+            for name in SECTION_CHARACTERISTICS:
+                inner, outer = getattr(airfoils[inx], name), getattr(airfoils[inx + 1], name)
+                rows[name].append(inner + eta * (outer - inner))
+            root = tip
+
+        arrays = {name: np.concatenate(value) for name, value in rows.items()}
+        if wing.symmetric:
+            mirror = np.array([1.0, -1.0, 1.0])
+            for name in ('position', 'span_axis', 'chord_axis', 'normal'):
+                arrays[name] = np.concatenate((arrays[name], arrays[name] * mirror))
+            for name in ('chord', 'width', 'twist') + SECTION_CHARACTERISTICS:
+                arrays[name] = np.concatenate((arrays[name], arrays[name]))
+
+        if finite_span_correction:
+            aspect_ratio = wing.aspect_ratio
+            arrays['lift_slope'] = arrays['lift_slope'] / (1 + arrays['lift_slope'] / (np.pi * aspect_ratio))
+            arrays['drag_factor'] = arrays['drag_factor'] + 1 / (np.pi * oswald_efficiency * aspect_ratio)
+
+        return cls(**arrays)
+
+    def section_loads(self, velocity, angular_rate, density):
+        """
+        Sectional loads of every strip, as scalars along the strip axes.
+
+        :param np.ndarray velocity: Velocity of the wing frame origin relative to the air [m/s], in the wing frame,
+        [3] or [..., 3] for a batch of flight conditions.
+        :param np.ndarray angular_rate: Angular rate of the wing frame [rad/s], [3] or [..., 3].
+        :param density: Air density [kg/m^3], scalar or [...].
+        :return: (alpha [rad], chordwise force [N], normal force [N], pitching moment about the quarter chord [N m]),
+        each [..., S].
+        """
+        velocity = np.asarray(velocity, dtype=np.float64)
+        angular_rate = np.asarray(angular_rate, dtype=np.float64)
+        density = np.asarray(density, dtype=np.float64)[..., np.newaxis]
+
+        num_strips = len(self.position)
+        if velocity.shape != angular_rate.shape:
+            velocity, angular_rate = np.broadcast_arrays(velocity, angular_rate)
+        rates = np.concatenate((velocity, angular_rate), axis=-1)
+        local = rates @ self._velocity_map.T
+        u_chord = local[..., :num_strips]
+        u_normal = local[..., num_strips:]
+        alpha = np.arctan2(-u_normal, u_chord)
+        cl, cd, cm = section_coefficients(alpha, self.lift_slope, self.zero_lift_angle, self.cl_max, self.cd0,
+                                          self.drag_factor, self.cm0)
+
+        # Lift is along (sin(alpha) chord + cos(alpha) normal) and drag along the relative wind
+        # -(cos(alpha) chord - sin(alpha) normal), with cos(alpha) = u_chord / V and sin(alpha) = -u_normal / V
+        half_rho_s = 0.5 * density * self.area
+        speed_squared = u_chord**2 + u_normal**2
+        scale = half_rho_s * np.sqrt(speed_squared)
+        chord_force = scale * (-cl * u_normal - cd * u_chord)
+        normal_force = scale * (cl * u_chord - cd * u_normal)
+        pitching_moment = half_rho_s * speed_squared * self.chord * cm
+        return alpha, chord_force, normal_force, pitching_moment
+
+    def strip_loads(self, velocity, angular_rate, density):
+        """
+        Sectional loads of every strip as vectors, e.g. for span loadings. See section_loads for the arguments.
+
+        :return: (alpha [..., S] [rad], force [..., S, 3] [N], moment [..., S, 3] [N m]) in the wing frame, with the
+        moments about the strip quarter chords.
+        """
+        alpha, chord_force, normal_force, pitching_moment = self.section_loads(velocity, angular_rate, density)
+        force = chord_force[..., np.newaxis] * self.chord_axis + normal_force[..., np.newaxis] * self.normal
+        moment = pitching_moment[..., np.newaxis] * self.pitch_axis
+        return alpha, force, moment
+
+    def loads(self, velocity, angular_rate, density):
+        """
+        Total aerodynamic force and moment, see section_loads for the arguments.
+
+        :return: (force [..., 3] [N], moment [..., 3] [N m]) in the wing frame, the moment about its origin.
+        """
+        alpha, chord_force, normal_force, pitching_moment = self.section_loads(velocity, angular_rate, density)
+        loads = np.concatenate((chord_force, normal_force, pitching_moment), axis=-1) @ self._load_map.T
+        return loads[..., :3], loads[..., 3:]
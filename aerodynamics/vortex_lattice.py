@@ -0,0 +1,375 @@
+"""
+Vortex lattice method for lifting surfaces built from vehicles.components.wing.Wing geometry, for the induced drag, span
+loading and stability derivatives of a main wing alone or together with its horizontal and vertical stabilizers.
+
+Each surface is meshed into horseshoe vortices on the planform of Wing.planform_coordinates, bent up by the polyhedral
+of each segment and placed at the wing's component position and angle. Twist and the airfoil zero lift angle enter
+through the panel normals of the flow tangency condition, so the mesh stays continuous across segments. The influence
+matrix is assembled with vectorized Biot-Savart kernels and LU factored once per geometry; factorizations are cached by
+a hash of the mesh, so rebuilding an unchanged configuration costs no assembly, and every flight condition (angle of
+attack, sideslip and body rates) is one column of a single batched back-substitution.
+
+The lattice is in the vehicle body frame (x forward, y right, z down), with the wake trailing along -x. Solutions are
+for a unit freestream speed and density and are reported as coefficients.
+
+e.x: lattice = VortexLattice([wing, horizontal_stabilizer, vertical_stabilizer], reference_point=center_of_mass)
+     solution = lattice.solve(alpha=np.radians(np.linspace(-4, 10, 15)))
+     solution.lift_coefficient, solution.induced_drag_coefficient, solution.span_load
+     derivatives = lattice.stability_derivatives(alpha=np.radians(2.0))
+     derivatives['Cm'][0] / derivatives['CL'][0]                                  # -static margin, dCm/dCL
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+
+from aerodynamics.airfoil import Airfoil
+from aerodynamics.strip_theory import section_axes
+from utilities.coordinate_systems import cross
+
+FACTORIZATION_CACHE_SIZE = 32
+_factorizations = OrderedDict()
+
+DERIVATIVE_VARIABLES = ('alpha', 'beta', 'p', 'q', 'r')
+COEFFICIENTS = ('CX', 'CY', 'CZ', 'Cl', 'Cm', 'Cn', 'CL', 'CD')
+
+
+def segment_velocity(points, start, end, cutoff=1E-10):
+    """
+    Velocity induced by straight vortex segments of unit circulation, from start to end.
+
+    :param np.ndarray points: Evaluation points, [..., 3], broadcast against start and end.
+    :param np.ndarray start: Segment start points, [..., 3].
+    :param np.ndarray end: Segment end points, [..., 3].
+    :param float cutoff: Points closer to the segment line than sqrt(cutoff) times its length see no velocity.
+    :return: np.ndarray [..., 3].
+    """
+    r1 = points - start
+    r2 = points - end
+    r1_cross_r2 = cross(r1, r2)
+    denominator = np.sum(r1_cross_r2**2, axis=-1)
+    r0 = end - start
+    length_1 = np.sqrt(np.sum(r1**2, axis=-1))
+    length_2 = np.sqrt(np.sum(r2**2, axis=-1))
+    singular = denominator <= cutoff * np.sum(r0**2, axis=-1)**2
+    scale = (np.sum(r0 * r1, axis=-1) / length_1 - np.sum(r0 * r2, axis=-1) / length_2) / (
+        4 * np.pi * np.where(singular, 1.0, denominator))
+    return np.where(singular, 0.0, scale)[..., np.newaxis] * r1_cross_r2
+
+
+def semi_infinite_velocity(points, start, direction, cutoff=1E-10):
+    """
+    Velocity induced by semi-infinite vortex lines of unit circulation, from start to infinity along direction.
+
+    :param np.ndarray points: Evaluation points, [..., 3], broadcast against start and direction.
+    :param np.ndarray start: Line start points, [..., 3].
+    :param np.ndarray direction: Unit vectors along the lines, [..., 3].
+    :param float cutoff: Points closer to the line than sqrt(cutoff) see no velocity.
+    :return: np.ndarray [..., 3].
+    """
+    r = points - start
+    direction_cross_r = cross(direction, r)
+    denominator = np.sum(direction_cross_r**2, axis=-1)
+    length = np.sqrt(np.sum(r**2, axis=-1))
+    singular = denominator <= cutoff
+    scale = (1 + np.sum(direction * r, axis=-1) / np.where(singular, 1.0, length)) / (
+        4 * np.pi * np.where(singular, 1.0, denominator))
+    return np.where(singular, 0.0, scale)[..., np.newaxis] * direction_cross_r
+
+
+def horseshoe_velocity(points, start, end, direction):
+    """
+    Velocity induced by horseshoe vortices of unit circulation: a trailing line from infinity to start, the bound
+    segment from start to end, and a trailing line from end to infinity, both trailing lines along direction.
+
+    :return: np.ndarray [..., 3], see segment_velocity for the arguments.
+    """
+    return (segment_velocity(points, start, end) + semi_infinite_velocity(points, end, direction) -
+            semi_infinite_velocity(points, start, direction))
+
+
+def clear_cache():
+    _factorizations.clear()
+
+
+class LatticeMesh(object):
+    """
+    Horseshoe vortex panels of one or more surfaces. Every attribute is an array with one row per panel:
+
+    start, end     bound vortex end points on the panel quarter chord, ordered so positive circulation lifts [m], [P, 3]
+    control        flow tangency points at the panel three quarter chord [m], [P, 3]
+    normal         panel normals including twist and zero lift angle, [P, 3]
+    strip          index of the spanwise strip the panel belongs to, [P]
+    surface        index of the surface the panel belongs to, [P]
+
+    and per spanwise strip: strip_position (bound vortex midpoint of the leading panel) [S, 3], strip_chord [S] and
+    strip_surface [S].
+    """
+
+    def __init__(self, wings, chordwise_panels=4, spanwise_panels=8):
+        """
+        :param wings: Wing instances; their position and angle place them in the vehicle body frame.
+        :param int chordwise_panels: Number of panels along the chord.
+        :param int spanwise_panels: Number of equal width strips each wing segment is cut into.
+        """
+        rows = {name: list() for name in ('start', 'end', 'control', 'normal', 'strip', 'surface')}
+        strip_rows = {name: list() for name in ('strip_position', 'strip_chord', 'strip_surface')}
+        num_strips = 0
+        for surface, wing in enumerate(wings):
+            halves = _surface_panels(wing, chordwise_panels, spanwise_panels)
+            rotation = wing.handle.rotation
+            position = np.asarray(wing.position, dtype=np.float64)
+            for start, end, control, normal, chord in halves:
+                strips = len(chord)
+                rows['start'].append(start @ rotation + position)
+                rows['end'].append(end @ rotation + position)
+                rows['control'].append(control @ rotation + position)
+                rows['normal'].append(normal @ rotation)
+                rows['strip'].append(num_strips + np.repeat(np.arange(strips), chordwise_panels))
+                rows['surface'].append(np.full(strips * chordwise_panels, surface))
+                leading = slice(None, None, chordwise_panels)
+                strip_rows['strip_position'].append(
+                    (0.5 * (start[leading] + end[leading])) @ rotation + position)
+                strip_rows['strip_chord'].append(chord)
+                strip_rows['strip_surface'].append(np.full(strips, surface))
+                num_strips += strips
+
+        for name, value in list(rows.items()) + list(strip_rows.items()):
+            setattr(self, name, np.concatenate(value))
+        self.midpoint = 0.5 * (self.start + self.end)
+        self.bound = self.end - self.start
+
+    def __len__(self):
+        return len(self.start)
+
+    @property
+    def geometry_hash(self):
+        digest = hashlib.sha1()
+        for array in (self.start, self.end, self.control, self.normal):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+
+def _surface_panels(wing, chordwise_panels, spanwise_panels):
+    """
+    Mesh the right hand side of a wing in its own frame from planform_coordinates, and mirror it for symmetric wings.
+
+    :return: List of (start, end, control, normal, strip chord) per side, panels ordered strip by strip from the root,
+    leading edge first within a strip.
+    """
+    num_segments = len(wing.span)
+    span_coordinate, planform_y = wing.planform_coordinates(half=True)
+    leading_edge = planform_y[:num_segments + 1]  # Then the trailing edge, tip to root
+    airfoils = wing.airfoil if wing.airfoil is not None else [Airfoil()] * (num_segments + 1)
+
+    eta = np.linspace(0.0, 1.0, spanwise_panels + 1)
+    eta_strip = 0.5 * (eta[1:] + eta[:-1])
+    root = np.zeros(3)
+    stations = list()
+    station_chords = list()
+    normals = list()
+    for inx in range(num_segments):
+        polyhedral = np.deg2rad(wing.polyhedral[inx])
+        segment = (span_coordinate[inx + 1] - span_coordinate[inx]) * np.array(
+            [0.0, np.cos(polyhedral), -np.sin(polyhedral)])
+        # Leading edge points of the segment's strip edges, the root one belongs to the previous segment
+        edge = np.zeros((spanwise_panels + 1, 3))
+        edge[:, 0] = leading_edge[inx] + eta * (leading_edge[inx + 1] - leading_edge[inx])
+        edge[:, 1:] = root[1:] + eta[:, np.newaxis] * segment[1:]
+        chord = wing.chord[inx] + eta * (wing.chord[inx + 1] - wing.chord[inx])
+        first = 0 if inx == 0 else 1
+        stations.append(edge[first:])
+        station_chords.append(chord[first:])
+        root = edge[-1]
+
+        zero_lift_angle = (airfoils[inx].zero_lift_angle + eta_strip *
+                           (airfoils[inx + 1].zero_lift_angle - airfoils[inx].zero_lift_angle))
+        for angle in np.deg2rad(wing.twist[inx]) - zero_lift_angle:
+            normals.append(section_axes(polyhedral, angle)[2])
+
+    stations = np.concatenate(stations)
+    station_chords = np.concatenate(station_chords)
+    normals = np.repeat(np.array(normals), chordwise_panels, axis=0)
+
+    # Chordwise lines of the mesh run aft from the leading edge, panel i spans [i, i + 1] / chordwise_panels
+    chordwise = np.arange(chordwise_panels + 1) / chordwise_panels
+    grid = stations[:, np.newaxis, :] - (station_chords[:, np.newaxis, np.newaxis] * chordwise[:, np.newaxis] *
+                                         np.array([1.0, 0.0, 0.0]))
+    inner_front, inner_back = grid[:-1, :-1], grid[:-1, 1:]
+    outer_front, outer_back = grid[1:, :-1], grid[1:, 1:]
+    start = (inner_front + 0.25 * (inner_back - inner_front)).reshape(-1, 3)
+    end = (outer_front + 0.25 * (outer_back - outer_front)).reshape(-1, 3)
+    control = (0.5 * (inner_front + outer_front) + 0.75 * (0.5 * (inner_back + outer_back) -
+                                                          0.5 * (inner_front + outer_front))).reshape(-1, 3)
+    strip_chord = 0.5 * (station_chords[1:] + station_chords[:-1])
+
+    halves = [(start, end, control, normals, strip_chord)]
+    if wing.symmetric:
+        mirror = np.array([1.0, -1.0, 1.0])
+        # Swapping the bound vortex ends keeps positive circulation lifting on the mirrored side
+        halves.append((end * mirror, start * mirror, control * mirror, normals * mirror, strip_chord))
+    return halves
+
+
+class LatticeSolution(object):
+    """
+    Solution of a VortexLattice for K flight conditions.
+
+    circulation         panel circulations for a unit freestream speed, [K, P]
+    force_coefficient   body frame (CX, CY, CZ), [K, 3]
+    moment_coefficient  body frame (Cl, Cm, Cn) about the reference point, roll and yaw on the reference span and
+                        pitch on the reference chord, [K, 3]
+    lift_coefficient, induced_drag_coefficient, side_force_coefficient in wind axes, [K]
+    span_load           c cl / c_ref of each spanwise strip, [K, S], at mesh.strip_position
+    """
+
+    def __init__(self, lattice, alpha, beta, circulation, force_coefficient, moment_coefficient):
+        self.alpha = alpha
+        self.beta = beta
+        self.circulation = circulation
+        self.force_coefficient = force_coefficient
+        self.moment_coefficient = moment_coefficient
+
+        drag_axis = -_freestream_direction(alpha, beta)
+        lift_axis = np.stack((np.sin(alpha), np.zeros_like(alpha), -np.cos(alpha)), axis=-1)
+        self.induced_drag_coefficient = np.sum(force_coefficient * drag_axis, axis=-1)
+        self.lift_coefficient = np.sum(force_coefficient * lift_axis, axis=-1)
+        self.side_force_coefficient = force_coefficient[:, 1]
+
+        strip_circulation = np.zeros((len(circulation), len(lattice.mesh.strip_chord)))
+        np.add.at(strip_circulation.T, lattice.mesh.strip, circulation.T)
+        self.span_load = 2 * strip_circulation / lattice.reference_chord
+        self.span_position = lattice.mesh.strip_position
+
+    def coefficients(self):
+        """
+        :return: Dict of the COEFFICIENTS, each [K].
+        """
+        values = np.column_stack((self.force_coefficient, self.moment_coefficient, self.lift_coefficient,
+                                  self.induced_drag_coefficient))
+        return dict(zip(COEFFICIENTS, values.T))
+
+
+def _freestream_direction(alpha, beta):
+    """
+    :return: Unit vectors of the body velocity relative to the air, [K, 3].
+    """
+    return np.stack((np.cos(alpha) * np.cos(beta), np.sin(beta), np.sin(alpha) * np.cos(beta)), axis=-1)
+
+
+class VortexLattice(object):
+
+    def __init__(self, wings, chordwise_panels=4, spanwise_panels=8, reference_area=None, reference_chord=None,
+                 reference_span=None, reference_point=np.zeros(3)):
+        """
+        Vortex lattice of one or more wings. The references default to those of the first wing, which should be the
+        main wing.
+
+        e.x: VortexLattice([wing, horizontal_stabilizer, vertical_stabilizer], spanwise_panels=12).solve(alpha=0.05)
+
+        :param wings: Wing instances placed by their component position and angle.
+        :param int chordwise_panels: Number of panels along the chord.
+        :param int spanwise_panels: Number of strips each wing segment is cut into.
+        :param float reference_area: Reference area of the coefficients [m^2].
+        :param float reference_chord: Reference chord of the pitching moment and span load [m].
+        :param float reference_span: Reference span of the rolling and yawing moments [m].
+        :param np.ndarray reference_point: Moment reference point in the body frame, e.g. the center of mass [m].
+        """
+        wings = list(wings)
+        self.wings = wings
+        self.reference_area = wings[0].area if reference_area is None else reference_area
+        self.reference_chord = wings[0].mean_aerodynamic_chord if reference_chord is None else reference_chord
+        self.reference_span = wings[0].total_span() if reference_span is None else reference_span
+        self.reference_point = np.asarray(reference_point, dtype=np.float64)
+
+        self.mesh = LatticeMesh(wings, chordwise_panels=chordwise_panels, spanwise_panels=spanwise_panels)
+        self.geometry_hash = self.mesh.geometry_hash
+        self.factorization, self.induced_velocity = self._factorize()
+
+    @classmethod
+    def from_vehicle(cls, vehicle, **options):
+        """
+        Lattice of every wing among the components of a vehicle, about its center of mass.
+        """
+        wings = [component for component in vehicle.components if hasattr(component, 'planform_coordinates')]
+        options.setdefault('reference_point', vehicle.center_of_mass)
+        return cls(wings, **options)
+
+    def _factorize(self):
+        """
+        LU factorization of the influence matrix, and the velocity induced at the bound vortex midpoints per unit
+        circulation [3, P, P], taken from the cache when a lattice of the same geometry was built before.
+        """
+        key = self.geometry_hash
+        if key in _factorizations:
+            _factorizations.move_to_end(key)
+            return _factorizations[key]
+
+        mesh = self.mesh
+        wake = np.array([-1.0, 0.0, 0.0])
+        at_control = horseshoe_velocity(mesh.control[:, np.newaxis], mesh.start, mesh.end, wake)
+        influence = np.sum(at_control * mesh.normal[:, np.newaxis], axis=-1)
+        at_midpoint = horseshoe_velocity(mesh.midpoint[:, np.newaxis], mesh.start, mesh.end, wake)
+
+        entry = (lu_factor(influence), np.ascontiguousarray(np.moveaxis(at_midpoint, -1, 0)))
+        _factorizations[key] = entry
+        while len(_factorizations) > FACTORIZATION_CACHE_SIZE:
+            _factorizations.popitem(last=False)
+        return entry
+
+    def _body_velocity(self, alpha, beta, rates):
+        """
+        :return: (velocity [K, 3], angular rate [K, 3]) of the body for a unit speed, rates from the dimensionless
+        (p b / 2V, q c / 2V, r b / 2V).
+        """
+        scale = 2 / np.array([self.reference_span, self.reference_chord, self.reference_span])
+        return _freestream_direction(alpha, beta), rates * scale
+
+    def solve(self, alpha=0.0, beta=0.0, rates=np.zeros(3)):
+        """
+        Solve a batch of flight conditions with one back-substitution.
+
+        :param alpha: Angles of attack [rad], scalar or [K].
+        :param beta: Sideslip angles [rad], scalar or [K].
+        :param np.ndarray rates: Dimensionless body rates (p b / 2V, q c / 2V, r b / 2V), [3] or [K, 3].
+        :return: LatticeSolution
+        """
+        alpha, beta = np.broadcast_arrays(np.atleast_1d(np.asarray(alpha, dtype=np.float64)),
+                                          np.atleast_1d(np.asarray(beta, dtype=np.float64)))
+        rates = np.broadcast_to(np.asarray(rates, dtype=np.float64), alpha.shape + (3,))
+        velocity, angular_rate = self._body_velocity(alpha, beta, rates)
+        mesh = self.mesh
+
+        # Air velocity relative to the lattice, -(v + w x r), at the control points, [K, P, 3]
+        onset = -(velocity[:, np.newaxis] + cross(angular_rate[:, np.newaxis], mesh.control))
+        right_hand_side = -np.sum(onset * mesh.normal, axis=-1)
+        circulation = lu_solve(self.factorization, right_hand_side.T).T
+
+        # Kutta-Joukowski on the bound vortices with the onset and induced velocities at their midpoints
+        onset = -(velocity[:, np.newaxis] + cross(angular_rate[:, np.newaxis], mesh.midpoint))
+        local = onset + np.moveaxis(self.induced_velocity @ circulation.T, 0, -1).swapaxes(0, 1)
+        force = circulation[..., np.newaxis] * cross(local, mesh.bound)
+        moment = cross(mesh.midpoint - self.reference_point, force)
+
+        dynamic_pressure_area = 0.5 * self.reference_area
+        moment_scale = dynamic_pressure_area * np.array([self.reference_span, self.reference_chord,
+                                                         self.reference_span])
+        return LatticeSolution(self, alpha, beta, circulation, force.sum(axis=1) / dynamic_pressure_area,
+                               moment.sum(axis=1) / moment_scale)
+
+    def stability_derivatives(self, alpha=0.0, beta=0.0, step=1E-4):
+        """
+        Derivatives of the coefficients with respect to alpha, beta [rad] and the dimensionless body rates, by
+        central differences, all perturbed conditions solved in one batch.
+
+        :return: Dict of the COEFFICIENTS, each an array of the derivatives along DERIVATIVE_VARIABLES [5].
+        """
+        perturbation = step * np.vstack((np.eye(5), -np.eye(5)))
+        conditions = np.array([alpha, beta, 0.0, 0.0, 0.0]) + perturbation
+        solution = self.solve(conditions[:, 0], conditions[:, 1], conditions[:, 2:])
+        derivatives = dict()
+        for name, values in solution.coefficients().items():
+            derivatives[name] = (values[:5] - values[5:]) / (2 * step)
+        return derivatives
@@ -0,0 +1,91 @@
+"""
+Benchmark of the chunked complex phasor solver in simulation.acoustic_sim against the original per-emitter loop,
+across emitter counts and grid sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_acoustic_sim
+"""
+import argparse
+import time
+
+import numpy as np
+
+from acoustics.emit_receive import Emitter
+from simulation.acoustic_sim import grid_axes, solve_2d_static_emitter_field
+
+
+def reference_field(emitters, bounding_box, spatial_resolution, speed_of_sound=337, phase_offsets=None):
+    if phase_offsets is None:
+        phase_offsets = np.zeros(len(emitters))
+    nu = 1.8E-5
+    rho = 1.225
+    x, y = grid_axes(bounding_box, spatial_resolution)
+    amplitude_field = np.zeros([len(x), len(y)])
+    x_mesh, y_mesh = np.meshgrid(x, y)
+    for ind, emitter in enumerate(emitters):
+        alpha = 2 * nu * (2*np.pi*emitter.base_frequency)**2/(3*rho*speed_of_sound**3)
+        distance = np.sqrt((x_mesh-emitter.position[0])**2 + (y_mesh-emitter.position[1])**2)
+        time_of_flight = distance/speed_of_sound + phase_offsets[ind]/(2*np.pi*emitter.base_frequency)
+        power = 10**(emitter.emit_power/10) * np.exp(-alpha * distance)
+        omega_t = 2*np.pi*emitter.base_frequency * time_of_flight
+        wave_length = speed_of_sound / emitter.base_frequency
+        wave_number = 2*np.pi/wave_length
+        k_x = distance * wave_number
+        amplitude_field += np.cos(omega_t.T)*power.T
+    return amplitude_field
+
+
+def line_array(num_emitters, frequency, speed_of_sound):
+    wave_length = speed_of_sound / frequency
+    return [Emitter(init_position=np.array([(ind - num_emitters/2) * wave_length/2, -2*wave_length, 0]),
+                    init_attitude=np.zeros(3), emit_power=30, frequency=frequency, antenna_pattern=None)
+            for ind in range(num_emitters)]
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emitters', type=int, nargs='+', default=[2, 16, 128, 512])
+    parser.add_argument('--resolutions', type=float, nargs='+', default=[4, 8, 16],
+                        help='Grid points per wave length.')
+    parser.add_argument('--frequency', type=float, default=25E3)
+    parser.add_argument('--chunk-mb', type=float, default=8)
+    parser.add_argument('--reference-limit', type=float, default=2e8,
+                        help='Largest emitters * grid points the loop implementation is timed at.')
+    args = parser.parse_args()
+
+    speed_of_sound = 337
+    wave_length = speed_of_sound / args.frequency
+    bounding_box = np.array([[-20*wave_length, 20*wave_length], [-4*wave_length, 200*wave_length]])
+    print('%9s %12s %12s %12s %10s %12s' % ('emitters', 'grid points', 'loop', 'complex64', 'speedup',
+                                            'complex128'))
+    for num_emitters in args.emitters:
+        emitters = line_array(num_emitters, args.frequency, speed_of_sound)
+        phase_offsets = np.linspace(0, np.pi, num_emitters)
+        for resolution in args.resolutions:
+            spatial_resolution = wave_length / resolution
+            kwargs = {'phase_offsets': phase_offsets, 'max_chunk_bytes': int(args.chunk_mb * 2**20)}
+            new_time, (x, y, field) = time_call(solve_2d_static_emitter_field, emitters, bounding_box,
+                                                spatial_resolution, **kwargs)
+            double_time, (_, _, double_field) = time_call(solve_2d_static_emitter_field, emitters, bounding_box,
+                                                          spatial_resolution, dtype=np.complex128, **kwargs)
+            grid_points = len(x) * len(y)
+            if num_emitters * grid_points <= args.reference_limit:
+                ref_time, ref = time_call(reference_field, emitters, bounding_box, spatial_resolution,
+                                          phase_offsets=phase_offsets)
+                scale = np.abs(ref).max()
+                assert np.allclose(double_field.real, ref, rtol=0, atol=1e-9 * scale)
+                assert np.allclose(field.real, ref, rtol=0, atol=1e-5 * scale)
+                print('%9d %12d %11.4fs %11.4fs %9.1fx %11.4fs' % (num_emitters, grid_points, ref_time, new_time,
+                                                                  ref_time / new_time, double_time))
+            else:
+                print('%9d %12d %12s %11.4fs %10s %11.4fs' % (num_emitters, grid_points, 'skipped', new_time, '-',
+                                                              double_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Real time check of acoustics.beamforming on a 64 channel, 48 kHz array. A broadband source is rendered with
+simulation.time_domain_acoustics, then each beamformer is timed per block and its real time factor (block duration /
+compute time, > 1 keeps up) reported along with the direction it finds.
+
+Run from the repository root:
+    python -m benchmarks.bench_beamforming
+"""
+import argparse
+import time
+
+import numpy as np
+
+from acoustics.beamforming import look_directions
+from acoustics.emit_receive import CompositeMicrophoneArray, Emitter, Microphone
+from simulation.time_domain_acoustics import TimeDomainPropagator
+
+
+def spiral_array(num_microphones, radius):
+    # Sunflower spiral, a common aperiodic planar layout with low side lobes
+    idx = np.arange(num_microphones) + 0.5
+    r = radius * np.sqrt(idx / num_microphones)
+    theta = np.pi * (1 + 5**0.5) * idx
+    return CompositeMicrophoneArray([Microphone(np.array([r[ind] * np.cos(theta[ind]), r[ind] * np.sin(theta[ind]),
+                                                          0.0]), np.zeros(3), None)
+                                     for ind in range(num_microphones)])
+
+
+def time_per_block(func, blocks, repeats):
+    func(blocks[0])
+    start = time.perf_counter()
+    for ind in range(repeats):
+        result = func(blocks[ind % len(blocks)])
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--channels', type=int, default=64)
+    parser.add_argument('--sample-rate', type=float, default=48E3)
+    parser.add_argument('--block-size', type=int, default=2048)
+    parser.add_argument('--azimuth-step', type=float, default=5.0, help='Look grid azimuth step [deg].')
+    parser.add_argument('--elevation-step', type=float, default=10.0, help='Look grid elevation step [deg].')
+    parser.add_argument('--f-min', type=float, default=500.0)
+    parser.add_argument('--f-max', type=float, default=8000.0)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    mic_array = spiral_array(args.channels, radius=0.5)
+    source_direction = np.radians([30.0, 40.0])
+    source_position = 200.0 * look_directions([source_direction[0]], [source_direction[1]])[0]
+    rng = np.random.default_rng(0)
+    duration = 8 * args.block_size / args.sample_rate
+    source = rng.standard_normal((1, int(args.sample_rate * (duration + 1.0))))
+    emitter = Emitter(source_position, np.zeros(3), emit_power=0, frequency=1E3, antenna_pattern=None)
+    propagator = TimeDomainPropagator([emitter], mic_array, args.sample_rate, source_signals=source)
+    signals = propagator.render(duration, start_time=1.0)
+    signals += 1E-4 * rng.standard_normal(signals.shape)
+    blocks = [signals[:, start:start + args.block_size] for start in range(0, signals.shape[1], args.block_size)]
+
+    azimuth = np.radians(np.arange(-180, 180, args.azimuth_step))
+    elevation = np.radians(np.arange(0, 90 + 1E-9, args.elevation_step))
+    directions = look_directions(azimuth, elevation)
+    beamformer = mic_array.beamformer(args.sample_rate, directions=directions)
+    block_duration = args.block_size / args.sample_rate
+    print('%s channels, %s Hz, %s sample blocks (%.1f ms), %s looks, %s-%s Hz' % (
+        args.channels, args.sample_rate, args.block_size, block_duration * 1E3, len(directions), args.f_min,
+        args.f_max))
+
+    start = time.perf_counter()
+    beamformer.steering_vectors(beamformer.spectra(blocks[0], args.f_min, args.f_max)[0])
+    print('steering vectors built in %.3fs' % (time.perf_counter() - start))
+
+    methods = [('frequency domain', lambda block: beamformer.frequency_domain(block, args.f_min, args.f_max)),
+               ('cross spectral', lambda block: beamformer.steered_response(
+                   block, method='csm', segment_length=args.block_size // 4, f_min=args.f_min, f_max=args.f_max)),
+               ('delay and sum', lambda block: beamformer.delay_and_sum(block))]
+    print('%18s %12s %12s %18s' % ('method', 'per block', 'real time', 'az/el found [deg]'))
+    for name, func in methods:
+        block_time, power = time_per_block(func, blocks, args.repeats)
+        found = np.degrees(np.unravel_index(np.argmax(power), (len(azimuth), len(elevation))) *
+                           np.radians([args.azimuth_step, args.elevation_step]) + [azimuth[0], elevation[0]])
+        print('%18s %10.2fms %11.1fx %8.0f/%-8.0f' % (name, block_time * 1E3, block_duration / block_time,
+                                                     found[0], found[1]))
+    print('source at %.0f/%.0f' % tuple(np.degrees(source_direction)))
+
+
+if __name__ == '__main__':
+    main()
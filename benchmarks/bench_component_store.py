@@ -0,0 +1,96 @@
+"""
+Benchmark of the structure of arrays vehicles.component_store.ComponentStore against per component Python loops, for
+the reductions a 6-DOF step needs on a vehicle with many parts: summed force and moment about the center of mass,
+relative angular momentum, and re-aggregating the mass properties after one component (a fuel slice) changes.
+
+Run from the repository root:
+    python -m benchmarks.bench_component_store
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utilities.coordinate_systems import rotation_matrix
+from vehicles.component_store import ComponentStore
+
+
+def loop_loads(parts, forces, moments, center_of_mass):
+    force = np.zeros(3)
+    moment = np.zeros(3)
+    for part, f, m in zip(parts, forces, moments):
+        force += f
+        moment += m + np.cross(part['position'] - center_of_mass, f)
+    return force, moment
+
+
+def loop_angular_momentum(parts):
+    momentum = np.zeros(3)
+    for part in parts:
+        rotation = rotation_matrix(part['angle'])
+        momentum += rotation.T @ (part['inertia_0'] @ part['angle_rate'])
+    return momentum
+
+
+def loop_mass_properties(parts):
+    mass = 0.0
+    first_moment = np.zeros(3)
+    inertia = np.zeros((3, 3))
+    for part in parts:
+        rotation = rotation_matrix(part['angle'])
+        position = part['position']
+        mass += part['mass']
+        first_moment += part['mass'] * position
+        inertia += rotation.T @ part['inertia_0'] @ rotation + part['mass'] * (
+            position.dot(position) * np.eye(3) - np.outer(position, position))
+    return mass, first_moment, np.linalg.inv(inertia)
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--components', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    print('%10s %24s %24s %30s' % ('components', 'loads loop/store [us]', 'spin h loop/store [us]',
+                                   'mass update loop/store [us]'))
+    for num_components in args.components:
+        rng = np.random.default_rng(num_components)
+        parts = [{'mass': rng.uniform(0.1, 2.0), 'position': rng.normal(size=3), 'angle': rng.normal(size=3),
+                  'inertia_0': np.diag(rng.uniform(0.01, 0.1, 3)), 'angle_rate': rng.normal(size=3)}
+                 for _ in range(num_components)]
+        forces = rng.normal(size=(num_components, 3))
+        moments = rng.normal(size=(num_components, 3))
+        center_of_mass = np.zeros(3)
+
+        store = ComponentStore()
+        handles = [store.add(part['mass'], part['position'], part['angle'], part['inertia_0'], part['angle_rate'])
+                   for part in parts]
+        store.force[:] = forces
+        store.moment[:] = moments
+        store.mass_contribution()
+
+        def burn():
+            handles[0].set_mass(handles[0].mass * 0.999)
+            mass, first_moment, inertia = store.mass_contribution()
+            return np.linalg.inv(inertia)
+
+        timings = [time_per_call(lambda: loop_loads(parts, forces, moments, center_of_mass), args.repeat),
+                   time_per_call(lambda: store.total_loads(center_of_mass), args.repeat),
+                   time_per_call(lambda: loop_angular_momentum(parts), args.repeat),
+                   time_per_call(store.relative_angular_momentum, args.repeat),
+                   time_per_call(lambda: loop_mass_properties(parts), args.repeat),
+                   time_per_call(burn, args.repeat)]
+        print('%10d %11.0f / %-10.0f %11.0f / %-10.0f %11.0f / %-10.0f' % ((num_components,) +
+                                                                          tuple(1E6 * t for t in timings)))
+
+
+if __name__ == '__main__':
+    main()
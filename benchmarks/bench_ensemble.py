@@ -0,0 +1,82 @@
+"""
+Throughput of the lockstep Monte-Carlo engine in simulation.ensemble on an artillery dispersion study: 155 mm shells
+with dispersed muzzle velocity, elevation, drag coefficient and wind, flown to ground impact. Reports vehicle-steps per
+second for growing ensembles in one process and split over a process pool, against one member at a time.
+
+Run from the repository root:
+    python -m benchmarks.bench_ensemble
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from simulation.ensemble import DragModel, ground_impact, impact_points, run_ensemble
+from simulation.rigid_body import state_from_euler
+
+
+def dispersion_study(num_members, seed=0):
+    rng = np.random.default_rng(seed)
+    muzzle_velocity = rng.normal(560.0, 3.0, num_members)
+    elevation = np.radians(rng.normal(35.0, 0.1, num_members))
+    azimuth = np.radians(rng.normal(0.0, 0.1, num_members))
+    velocity = muzzle_velocity[:, np.newaxis] * np.column_stack((np.cos(elevation) * np.cos(azimuth),
+                                                                 np.cos(elevation) * np.sin(azimuth),
+                                                                 -np.sin(elevation)))
+    attitude = np.column_stack((np.zeros(num_members), elevation, azimuth))
+    spin = np.column_stack((np.full(num_members, 50.0), np.zeros(num_members), np.zeros(num_members)))
+    states = state_from_euler(np.zeros((num_members, 3)), velocity, attitude, spin)
+    wind = np.column_stack((rng.normal(0.0, 5.0, num_members), rng.normal(0.0, 5.0, num_members),
+                            np.zeros(num_members)))
+    model = DragModel(mass=43.0, inertia=np.diag([0.15, 1.7, 1.7]), reference_area=np.pi * 0.155**2 / 4,
+                      drag_coefficient=rng.normal(0.30, 0.01, num_members), wind=wind, stability_coefficient=0.5,
+                      damping_coefficient=5.0)
+    return model, states
+
+
+def time_run(model, states, args, workers=None):
+    start = time.perf_counter()
+    result = run_ensemble(model, states, end_time=args.end_time, dt=args.dt, method=args.method,
+                          terminate=ground_impact, workers=workers)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, nargs='+', default=[1, 100, 1000, 3000])
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--dt', type=float, default=1E-2)
+    parser.add_argument('--method', default='rk4')
+    parser.add_argument('--end-time', type=float, default=200.0)
+    parser.add_argument('--single-runs', type=int, default=3,
+                        help='Members flown one at a time for the per vehicle baseline.')
+    args = parser.parse_args()
+
+    model, states = dispersion_study(args.single_runs)
+    start = time.perf_counter()
+    member_steps = 0
+    for member in range(args.single_runs):
+        result = run_ensemble(model, states[member:member + 1], end_time=args.end_time, dt=args.dt,
+                              method=args.method, terminate=ground_impact, members=[member])
+        member_steps += result.num_member_steps
+    baseline = member_steps / (time.perf_counter() - start)
+    print('%s, dt %s s, one member at a time: %.3g vehicle-steps/s' % (args.method, args.dt, baseline))
+
+    print('%8s %8s %10s %16s %10s %18s' % ('members', 'workers', 'time', 'vehicle-steps/s', 'speedup',
+                                          'range mean/std'))
+    for num_members in args.members:
+        model, states = dispersion_study(num_members)
+        for workers in sorted({1, args.workers}):
+            if workers > 1 and num_members < 100 * workers:
+                continue
+            elapsed, result = time_run(model, states, args, workers=workers)
+            ranges = impact_points(result)[:, 0]
+            rate = result.num_member_steps / elapsed
+            print('%8d %8d %9.3fs %16.3g %9.1fx %11.0f/%.0f m' % (num_members, workers, elapsed, rate,
+                                                                  rate / baseline, np.nanmean(ranges),
+                                                                  np.nanstd(ranges)))
+
+
+if __name__ == '__main__':
+    main()
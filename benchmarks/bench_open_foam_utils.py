@@ -0,0 +1,75 @@
+"""
+Benchmark of the O(n) moving average and vectorized central difference in utilities.open_foam_utils against the
+original per-sample loop implementations.
+
+Run from the repository root:
+    python -m benchmarks.bench_open_foam_utils
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utilities.open_foam_utils import diff, moving_avg
+
+
+def reference_moving_avg(val, bins):
+    bin_arr = np.zeros(bins)
+    ret_val = np.zeros(len(val))
+    for idx in range(0, len(val)):
+        bin_arr[idx % bins] = val[idx]
+        if idx < bins:
+            ret_val[idx] = val[idx]
+        else:
+            ret_val[idx] = np.average(bin_arr)
+
+    return ret_val[bins:]
+
+
+def reference_diff(time, val):
+    differencne = np.zeros(len(val))
+
+    for idx in range(1, len(time) - 1):
+        differencne[idx] = (val[idx + 1] - val[idx - 1]) / (time[idx + 1] - time[idx - 1])
+
+    return differencne
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e4, 1e6, 1e7])
+    parser.add_argument('--bins', type=int, default=400)
+    parser.add_argument('--reference-limit', type=float, default=1e6,
+                        help='Largest size the loop implementations are timed at, they take minutes above 1e6.')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print('%10s %12s %12s %10s %12s %12s %10s' % ('samples', 'avg loop', 'avg new', 'speedup', 'diff loop',
+                                                 'diff new', 'speedup'))
+    for size in args.sizes:
+        size = int(size)
+        t = np.cumsum(rng.uniform(0.5e-3, 1.5e-3, size))
+        val = 0.5 + 0.01 * rng.standard_normal(size)
+
+        avg_time, avg = time_call(moving_avg, val, args.bins)
+        diff_time, diffs = time_call(diff, t, val)
+        if size <= args.reference_limit:
+            ref_avg_time, ref_avg = time_call(reference_moving_avg, val, args.bins)
+            ref_diff_time, ref_diffs = time_call(reference_diff, t, val)
+            assert np.allclose(avg, ref_avg) and np.allclose(diffs, ref_diffs)
+            print('%10d %11.4fs %11.4fs %9.1fx %11.4fs %11.4fs %9.1fx' % (
+                size, ref_avg_time, avg_time, ref_avg_time / avg_time, ref_diff_time, diff_time,
+                ref_diff_time / diff_time))
+        else:
+            print('%10d %12s %11.4fs %10s %12s %11.4fs %10s' % (size, 'skipped', avg_time, '-', 'skipped',
+                                                              diff_time, '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of the strip theory loads of aerodynamics.strip_theory.StripGeometry against a per strip Python loop doing the
+same sectional math, for a two segment tapered, swept and twisted wing at a growing number of strips. Also reports the
+throughput of a batch of flight conditions evaluated in one call, as an ensemble or a trim sweep would.
+
+Run from the repository root:
+    python -m benchmarks.bench_strip_theory
+"""
+import argparse
+import time
+
+import numpy as np
+
+from aerodynamics.airfoil import Airfoil, section_coefficients
+from vehicles.components.wing import Wing
+
+
+def loop_loads(strips, velocity, angular_rate, density):
+    force = np.zeros(3)
+    moment = np.zeros(3)
+    for inx in range(len(strips)):
+        position = strips.position[inx]
+        chord_axis = strips.chord_axis[inx]
+        normal = strips.normal[inx]
+        local = velocity + np.cross(angular_rate, position)
+        u_chord = local.dot(chord_axis)
+        u_normal = local.dot(normal)
+        alpha = np.arctan2(-u_normal, u_chord)
+        cl, cd, cm = section_coefficients(alpha, strips.lift_slope[inx], strips.zero_lift_angle[inx],
+                                          strips.cl_max[inx], strips.cd0[inx], strips.drag_factor[inx],
+                                          strips.cm0[inx])
+        speed = np.sqrt(u_chord**2 + u_normal**2)
+        dynamic_pressure = 0.5 * density * speed**2 * strips.area[inx]
+        lift = cl * dynamic_pressure * (-u_normal * chord_axis + u_chord * normal) / speed
+        drag = -cd * dynamic_pressure * (u_chord * chord_axis + u_normal * normal) / speed
+        strip_force = lift + drag
+        force += strip_force
+        moment += np.cross(position, strip_force) + cm * dynamic_pressure * strips.chord[inx] * strips.pitch_axis[inx]
+    return force, moment
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--strips-per-segment', type=int, nargs='+', default=[4, 8, 16, 32])
+    parser.add_argument('--batch', type=int, default=1000, help='Flight conditions evaluated in one batched call.')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    airfoils = [Airfoil(cl_max=1.5, cd0=0.008, drag_factor=0.01, cm0=-0.05), Airfoil(),
+                Airfoil(zero_lift_angle=np.radians(1.0))]
+    rng = np.random.default_rng(0)
+    velocity = np.array([25.0, 1.0, 2.0])
+    angular_rate = np.array([0.3, 0.1, -0.05])
+    velocities = velocity + rng.normal(0.0, 2.0, (args.batch, 3))
+    angular_rates = rng.normal(0.0, 0.2, (args.batch, 3))
+
+    print('%8s %16s %16s %10s %22s %12s' % ('strips', 'loop [us]', 'vectorized [us]', 'speedup',
+                                            'batched [loads/s]', 'max error'))
+    for strips_per_segment in args.strips_per_segment:
+        wing = Wing(Wing.SubType.MAIN_WING, span=(0.8, 0.4), chord=(0.3, 0.25, 0.12), sweep=(5, 25),
+                    polyhedral=(3, 8), twist=(0, -2), Airfoil=airfoils, strips_per_segment=strips_per_segment)
+        strips = wing.strips
+
+        reference = np.concatenate(loop_loads(strips, velocity, angular_rate, 1.225))
+        error = np.max(np.abs(np.concatenate(strips.loads(velocity, angular_rate, 1.225)) - reference))
+        loop = time_per_call(lambda: loop_loads(strips, velocity, angular_rate, 1.225),
+                             max(1, args.repeat // strips_per_segment))
+        vectorized = time_per_call(lambda: strips.loads(velocity, angular_rate, 1.225), args.repeat)
+        batched = time_per_call(lambda: strips.loads(velocities, angular_rates, 1.225), max(1, args.repeat // 20))
+        print('%8d %16.1f %16.1f %9.1fx %22.3g %12.2g' % (len(strips), 1E6 * loop, 1E6 * vectorized,
+                                                          loop / vectorized, args.batch / batched, error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark of aerodynamics.vortex_lattice.VortexLattice on a main wing, horizontal and vertical stabilizer
+configuration: influence matrix assembly with the vectorized Biot-Savart kernels against a per panel pair loop, a
+sweep of angle of attack / sideslip conditions solved by one batched LU back-substitution against a dense solve per
+condition, and rebuilding an unchanged configuration from the factorization cache.
+
+Run from the repository root:
+    python -m benchmarks.bench_vortex_lattice
+"""
+import argparse
+import time
+
+import numpy as np
+
+from aerodynamics import vortex_lattice
+from aerodynamics.vortex_lattice import VortexLattice, horseshoe_velocity
+from vehicles.components.wing import Wing
+
+
+def configuration():
+    wing = Wing(Wing.SubType.MAIN_WING, span=(0.8, 0.4), chord=(0.3, 0.25, 0.12), sweep=(5, 25), polyhedral=(3, 8),
+                twist=(0, -2), angle=np.radians([0.0, 2.0, 0.0]))
+    horizontal = Wing(Wing.SubType.HORZ_STAB, span=0.35, chord=(0.15, 0.1), sweep=10, polyhedral=0,
+                      position=np.array([-1.0, 0.0, -0.05]), angle=np.radians([0.0, -1.0, 0.0]))
+    vertical = Wing(Wing.SubType.VERT_STAB, span=0.25, chord=(0.18, 0.1), sweep=30, polyhedral=90, symmetric=False,
+                    position=np.array([-1.0, 0.0, 0.0]))
+    return [wing, horizontal, vertical]
+
+
+def loop_influence(mesh):
+    wake = np.array([-1.0, 0.0, 0.0])
+    influence = np.zeros((len(mesh), len(mesh)))
+    for i in range(len(mesh)):
+        for j in range(len(mesh)):
+            influence[i, j] = horseshoe_velocity(mesh.control[i], mesh.start[j], mesh.end[j], wake).dot(mesh.normal[i])
+    return influence
+
+
+def loop_solve(influence, normal, alpha, beta):
+    circulation = list()
+    for a, b in zip(alpha, beta):
+        velocity = np.array([np.cos(a) * np.cos(b), np.sin(b), np.sin(a) * np.cos(b)])
+        circulation.append(np.linalg.solve(influence, normal @ velocity))
+    return np.array(circulation)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--spanwise-panels', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--chordwise-panels', type=int, default=4)
+    parser.add_argument('--conditions', type=int, default=200, help='Angle of attack / sideslip pairs per sweep.')
+    args = parser.parse_args()
+
+    wings = configuration()
+    rng = np.random.default_rng(0)
+    alpha = np.radians(rng.uniform(-4.0, 10.0, args.conditions))
+    beta = np.radians(rng.uniform(-6.0, 6.0, args.conditions))
+
+    print('%7s %22s %26s %24s %14s' % ('panels', 'assembly loop/vec [ms]', 'sweep solve/batched [ms]',
+                                       'build new/cached [ms]', 'max error'))
+    for spanwise_panels in args.spanwise_panels:
+        vortex_lattice.clear_cache()
+        start = time.perf_counter()
+        lattice = VortexLattice(wings, chordwise_panels=args.chordwise_panels, spanwise_panels=spanwise_panels)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        VortexLattice(wings, chordwise_panels=args.chordwise_panels, spanwise_panels=spanwise_panels)
+        cached = time.perf_counter() - start
+
+        mesh = lattice.mesh
+        start = time.perf_counter()
+        vectorized_influence = np.sum(horseshoe_velocity(mesh.control[:, np.newaxis], mesh.start, mesh.end,
+                                                         np.array([-1.0, 0.0, 0.0])) * mesh.normal[:, np.newaxis],
+                                      axis=-1)
+        vectorized = time.perf_counter() - start
+        if len(mesh) <= 200:
+            start = time.perf_counter()
+            error = np.max(np.abs(loop_influence(mesh) - vectorized_influence))
+            loop = '%10.1f' % (1E3 * (time.perf_counter() - start))
+        else:
+            error, loop = 0.0, '%10s' % '-'
+
+        start = time.perf_counter()
+        reference = loop_solve(vectorized_influence, mesh.normal, alpha, beta)
+        sweep = time.perf_counter() - start
+        start = time.perf_counter()
+        solution = lattice.solve(alpha, beta)
+        batched = time.perf_counter() - start
+        error = max(error, np.max(np.abs(solution.circulation - reference)))
+
+        print('%7d %s / %-9.1f %12.1f / %-11.1f %11.1f / %-10.2f %14.2g' % (
+            len(mesh), loop, 1E3 * vectorized, 1E3 * sweep, 1E3 * batched, 1E3 * build, 1E3 * cached, error))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,29 @@
 import numpy as np
-import scipy
 
-from vehicles import vehicle
-from vehicles.vehicle import Vehicle
+from simulation.integrators import make_stepper
+from simulation.rigid_body import normalize_quaternion, rigid_body_derivative, state_from_euler
 from simulation.simluation import SimulationManager
+from vehicles.vehicle import Vehicle
+
+
+def vehicle_derivative(vehicle, control_manager, environment_manager, simulation_manager):
+    """
+    State derivative func(t, state) of a vehicle for simulation.integrators. The vehicle loads are evaluated at each
+    integrator stage, with the managers held at their state from the start of the step.
+
+    :param Vehicle vehicle:
+    :return: Function of (t, state [13]) returning the derivative [13].
+    """
+    def derivative(t, state):
+        vehicle.states = state
+        force_b, moment_b = vehicle.calculate_loads_body_frame(control_manager, environment_manager, simulation_manager)
+        angular_momentum_b = vehicle.calculate_angular_momentum_body_frame()
+        return rigid_body_derivative(state, np.ravel(force_b), np.ravel(moment_b), vehicle.mass,
+                                     np.asarray(vehicle.inertia), inv_inertia=np.asarray(vehicle.inv_inertia),
+                                     gravity=environment_manager.gravity(vehicle),
+                                     angular_momentum_b=np.ravel(angular_momentum_b))
+    return derivative
+
 
 def simulate_vehicle(vehicle, control_manager, environment_manager, simulation_manager):
     """
@@ -16,41 +36,24 @@ def simulate_vehicle(vehicle, control_manager, environment_manager, simulation_m
     """
 
     # initialize vehicle states
-    vehicle.states[0:3] = simulation_manager.initial_pos
-    vehicle.states[3:6] = simulation_manager.initial_vel
-    vehicle.states[6:9] = simulation_manager.initial_attitude
-    vehicle.states[9:] = simulation_manager.initial_attitude_rate
+    vehicle.states = state_from_euler(simulation_manager.initial_pos, simulation_manager.initial_vel,
+                                      simulation_manager.initial_attitude, simulation_manager.initial_attitude_rate)
+    stepper = make_stepper(simulation_manager.method, simulation_manager.dt, projection=normalize_quaternion,
+                           **simulation_manager.integrator_options)
+    derivative = vehicle_derivative(vehicle, control_manager, environment_manager, simulation_manager)
 
-    simulation_manager.logger.log_interation(vehicle,control_manager,environment_manager, simulation_manager)
+    simulation_manager.logger.log_iteration(vehicle, control_manager, environment_manager, simulation_manager)
 
     while(simulation_manager.simulate):
-        environment_manager.update(vehicle, simulation_manager)
-        control_manager.update(vehicle, simulation_manager)
-        force_b, moment_b = vehicle.calculate_loads_body_frame(control_manager, environment_manager, simulation_manager)
-        angular_momentum_be_b = vehicle.calculate_angular_momentum_body_frame()
-
-
-        inertia_b = vehicle.inertia
-        inv_inertia_b = vehicle.inv_inertia
-        local_level_transform = vehicle.local_level_transform
-
-        gravity_ll = environment_manager.gravity(vehicle)
-        gravity_b = local_level_transform * gravity_ll
-
-        omega_be_b = vehicle.omega_be_b
+        environment_changed = environment_manager.update(vehicle, simulation_manager) is not False
+        controls_changed = control_manager.update(vehicle, simulation_manager) is not False
 
-        velocity_b = local_level_transform * vehicle.velocity
-        vel_det = vehicle.mass * np.linalg.det(np.array([[1, 1, 1],
-                                           [vehicle.states[9],vehicle.states[10],vehicle.states[11]],
-                                           [velocity_b[0],velocity_b[1],velocity_b[2]]]))
+        # A derivative carried over from the previous step is only valid if the managers left the loads unchanged
+        if environment_changed or controls_changed:
+            stepper.reset()
+        state = vehicle.states
+        simulation_manager.time, vehicle.states = stepper.step(derivative, simulation_manager.time, state,
+                                                               t_bound=simulation_manager.end_time)
 
-        accel_b = force_b/vehicle.mass - vel_det + gravity_b
-        ang_accel_b = inv_inertia_b * (-omega_be_b * (inertia_b * vehicle.ang_rate  +  angular_momentum_be_b) + moment_b)
-
-        vehicle.states[3:6] = vehicle.states[3:6] + simulation_manager.dt * local_level_transform.T * accel_b
-        vehicle.states[9:12] = vehicle.states[9:12] + simulation_manager.dt * ang_accel_b
-        simulation_manager.update(vehicle, control_manager, environment_manager, simulation_manager)
+        simulation_manager.update(vehicle, control_manager, environment_manager)
         simulation_manager.logger.log_iteration(vehicle, control_manager, environment_manager, simulation_manager)
-
-
-
@@ -1,53 +1,422 @@
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import numpy as np
 
 import matplotlib.pyplot as plt
 import matplotlib as mpl
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
-def simulate_2d_static_emitter_field(emitters, bounding_box, spatial_resolution, speed_of_sound=337, phase_offsets=None,
-                                     output_dir=None, title=None):
-    """
-    
-    :param emitters: 
-    :param bounding_box: 
-    :param spatial_resolution: 
-    :return: 
-    """
-    if phase_offsets is None:
-        phase_offsets = np.zeros(len(emitters))
-    nu =1.8E-5
-    rho = 1.225
+from acoustics.emit_receive import element_gains
+
+AIR_KINEMATIC_VISCOSITY = 1.8E-5
+AIR_DENSITY = 1.225
+DEFAULT_CHUNK_BYTES = 8 * 2**20
+DEFAULT_MEMORY_BUDGET = 512 * 2**20
+FIELD_QUANTITIES = ('complex', 'real', 'magnitude')
+
+
+def absorption_coefficient(frequency, speed_of_sound=337, nu=AIR_KINEMATIC_VISCOSITY, rho=AIR_DENSITY):
+    """
+    Classical (viscous) absorption coefficient of a plane wave.
+
+    :param frequency: Frequency [Hz].
+    :return: alpha [1/m], the amplitude decays as exp(-alpha * distance).
+    """
+    return 2 * nu * (2*np.pi*np.asarray(frequency, dtype=np.float64))**2 / (3*rho*speed_of_sound**3)
+
+
+def emitter_arrays(emitters, speed_of_sound=337, phase_offsets=None):
+    """
+    Gather the emitter properties the solvers need into arrays.
+
+    :param list emitters: List of acoustics.emit_receive.Emitter.
+    :param float speed_of_sound: Speed of sound [m/s].
+    :param phase_offsets: Phase offset of each emitter [rad], if None all emitters are in phase.
+    :return: dict of 'position' [E, 3], 'amplitude' [E], 'wave_number' [E], 'alpha' [E], 'phase' [E] and
+    'attitude' [E, 3] arrays, and the 'pattern' list of each emitter's AcousticPattern (None if omnidirectional).
+    """
+    num_emitters = len(emitters)
+    position = np.zeros((num_emitters, 3))
+    attitude = np.zeros((num_emitters, 3))
+    for ind, emitter in enumerate(emitters):
+        emitter_position = np.ravel(emitter.position)
+        position[ind, :len(emitter_position)] = emitter_position[:3]
+        if emitter.attitude is not None:
+            emitter_attitude = np.ravel(emitter.attitude)
+            attitude[ind, :len(emitter_attitude)] = emitter_attitude[:3]
+    frequency = np.array([emitter.base_frequency for emitter in emitters], dtype=np.float64)
+    phase = np.zeros(num_emitters) if phase_offsets is None else np.asarray(phase_offsets, dtype=np.float64)
+    return {'position': position,
+            'amplitude': 10**(np.array([emitter.emit_power for emitter in emitters], dtype=np.float64)/10),
+            'wave_number': 2*np.pi*frequency / speed_of_sound,
+            'alpha': absorption_coefficient(frequency, speed_of_sound),
+            'phase': phase,
+            'attitude': attitude,
+            'pattern': [emitter.antenna_pattern for emitter in emitters]}
+
+
+def _apply_patterns(arrays, e_slice, mag, dx, dy, dz):
+    # Scale the phasor magnitudes of a block by each emitter's directivity towards the block's points
+    gains = element_gains(arrays['pattern'][e_slice], arrays['attitude'][e_slice], dx, dy, dz)
+    if gains is not None:
+        mag *= gains
+
+
+def _chunk_sizes(num_emitters, num_x, num_y, cell_bytes, max_chunk_bytes):
+    # Each chunk holds [emitters, x, y] work buffers, split over emitters first and then over x rows
+    row_bytes = num_y * cell_bytes
+    emitter_chunk = int(max(1, min(num_emitters, max_chunk_bytes // max(1, num_x * row_bytes))))
+    x_chunk = int(max(1, min(num_x, max_chunk_bytes // max(1, emitter_chunk * row_bytes))))
+    return emitter_chunk, x_chunk
+
+
+def _magnitude_and_angle(arrays, e_slice, r, cycles, mag, ang):
+    """
+    Phasor magnitude A * exp(-alpha * r) and angle k * r + phi of a block of emitter distances, with the emitters
+    along the first axis. The angle is reduced to [0, 2pi) in double precision so the trig functions can be evaluated
+    in single precision. r and cycles are used as work buffers.
+    """
+    column = (e_slice,) + (np.newaxis,) * (r.ndim - 1)
+    np.multiply(r, -arrays['alpha'][column], out=mag)
+    np.exp(mag, out=mag)
+    np.multiply(mag, arrays['amplitude'][column], out=mag)
+
+    r *= arrays['wave_number'][column] / (2*np.pi)
+    r += arrays['phase'][column] / (2*np.pi)
+    np.floor(r, out=cycles)
+    r -= cycles
+    np.multiply(r, 2*np.pi, out=ang)
+
+
+def propagation_matrix(arrays, points, max_chunk_bytes=DEFAULT_CHUNK_BYTES, dtype=np.complex64):
+    """
+    Complex phasor of each emitter at each point, A * exp(-alpha*r) * exp(i*(k*r + phi)). The field of the emitters
+    for any set of phase offsets is then a matrix product, see simulation.beam_steering.
+
+    :param dict arrays: Emitters gathered with emitter_arrays.
+    :param np.ndarray points: Field points of shape [P, 3], or [P, 2] for distances in the x-y plane only.
+    :param int max_chunk_bytes: Size of the work buffers.
+    :param dtype: np.complex64 or np.complex128, see complex_pressure_field_2d.
+    :return: np.ndarray of shape [E, P].
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+    dtype = np.dtype(dtype)
+    real_dtype = np.float32 if dtype == np.complex64 else np.float64
+    position = arrays['position']
+    num_emitters = len(position)
+    num_points = len(points)
+    matrix = np.empty((num_emitters, num_points), dtype=dtype)
+
+    point_chunk = int(max(1, min(num_points, max_chunk_bytes // max(1, num_emitters * (16 + 3 * np.dtype(
+        real_dtype).itemsize)))))
+    shape = (num_emitters, point_chunk)
+    distance = np.empty(shape)
+    whole_cycles = np.empty(shape)
+    magnitude = np.empty(shape, dtype=real_dtype)
+    angle = np.empty(shape, dtype=real_dtype)
+    trig = np.empty(shape, dtype=real_dtype)
+    for p_start in range(0, num_points, point_chunk):
+        p_slice = slice(p_start, min(p_start + point_chunk, num_points))
+        block = (slice(None), slice(0, p_slice.stop - p_start))
+        r, cycles, mag, ang, tr = [buffer[block] for buffer in (distance, whole_cycles, magnitude, angle, trig)]
+
+        components = [points[np.newaxis, p_slice, axis] - position[:, axis, np.newaxis]
+                      for axis in range(points.shape[1])]
+        r[...] = 0
+        for component in components:
+            r += component**2
+        np.sqrt(r, out=r)
+        _magnitude_and_angle(arrays, slice(None), r, cycles, mag, ang)
+        _apply_patterns(arrays, slice(None), mag, *(components + [0.0] * (3 - len(components))))
+
+        np.cos(ang, out=tr)
+        np.multiply(mag, tr, out=matrix.real[:, p_slice])
+        np.sin(ang, out=tr)
+        np.multiply(mag, tr, out=matrix.imag[:, p_slice])
+    return matrix
+
+
+def complex_pressure_field_2d(emitters, x, y, speed_of_sound=337, phase_offsets=None, z=0.0,
+                              max_chunk_bytes=DEFAULT_CHUNK_BYTES, dtype=np.complex64, out=None):
+    """
+    Complex phasor field of a set of static emitters over a 2D grid, sum(A * exp(-alpha*r) * exp(i*(k*r + phi))).
+    Emitters are broadcast against the grid in chunks through reused work buffers, so memory use is bounded by
+    max_chunk_bytes whatever the number of emitters or size of the grid.
+
+    :param list emitters: List of acoustics.emit_receive.Emitter.
+    :param np.ndarray x: Grid x coordinates.
+    :param np.ndarray y: Grid y coordinates.
+    :param float speed_of_sound: Speed of sound [m/s].
+    :param phase_offsets: Phase offset of each emitter [rad], if None all emitters are in phase.
+    :param float z: Height of the grid plane.
+    :param int max_chunk_bytes: Size of the work buffers. A few MB keeps them in cache.
+    :param dtype: np.complex64 or np.complex128. Distances and phases are always reduced to a single cycle in double
+    precision, so complex64 is accurate to ~1e-6 of the emitter amplitudes while evaluating the trig functions many
+    times faster.
+    :param np.ndarray out: Array of shape [len(x), len(y)] to write the field into, e.g. a np.memmap.
+    :return: Complex np.ndarray of shape [len(x), len(y)]. The real part is the instantaneous field at t=0 and the
+    magnitude its amplitude (for emitters of a single frequency).
+    """
+    arrays = emitter_arrays(emitters, speed_of_sound, phase_offsets)
+    return complex_pressure_field_from_arrays(arrays, x, y, z=z, max_chunk_bytes=max_chunk_bytes, dtype=dtype,
+                                              out=out)
+
+
+def complex_pressure_field_from_arrays(arrays, x, y, z=0.0, max_chunk_bytes=DEFAULT_CHUNK_BYTES, dtype=np.complex64,
+                                       out=None):
+    """
+    complex_pressure_field_2d for emitters already gathered with emitter_arrays.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    dtype = np.dtype(dtype)
+    real_dtype = np.float32 if dtype == np.complex64 else np.float64
+    if out is None:
+        out = np.zeros((len(x), len(y)), dtype=dtype)
+    else:
+        out[...] = 0
+
+    position = arrays['position']
+    num_emitters = len(position)
+    emitter_chunk, x_chunk = _chunk_sizes(num_emitters, len(x), len(y), 16 + 3 * np.dtype(real_dtype).itemsize,
+                                          max_chunk_bytes)
+    shape = (emitter_chunk, x_chunk, len(y))
+    distance = np.empty(shape)
+    whole_cycles = np.empty(shape)
+    magnitude = np.empty(shape, dtype=real_dtype)
+    angle = np.empty(shape, dtype=real_dtype)
+    trig = np.empty(shape, dtype=real_dtype)
+
+    dy = y[np.newaxis, :] - position[:, 1, np.newaxis]
+    dz = z - position[:, 2]
+    dy_sq = dy**2 + dz[:, np.newaxis]**2
+    for e_start in range(0, num_emitters, emitter_chunk):
+        e_slice = slice(e_start, min(e_start + emitter_chunk, num_emitters))
+        num_e = e_slice.stop - e_start
+        for x_start in range(0, len(x), x_chunk):
+            x_slice = slice(x_start, min(x_start + x_chunk, len(x)))
+            block = (slice(0, num_e), slice(0, x_slice.stop - x_start))
+            r, cycles, mag, ang, tr = [buffer[block] for buffer in (distance, whole_cycles, magnitude, angle, trig)]
+
+            dx = x[np.newaxis, x_slice] - position[e_slice, 0, np.newaxis]
+            np.add((dx**2)[:, :, np.newaxis], dy_sq[e_slice, np.newaxis, :], out=r)
+            np.sqrt(r, out=r)
+            _magnitude_and_angle(arrays, e_slice, r, cycles, mag, ang)
+            _apply_patterns(arrays, e_slice, mag, dx[:, :, np.newaxis], dy[e_slice, np.newaxis, :],
+                            dz[e_slice, np.newaxis, np.newaxis])
+
+            np.cos(ang, out=tr)
+            out.real[x_slice] += np.einsum('eij,eij->ij', mag, tr)
+            np.sin(ang, out=tr)
+            out.imag[x_slice] += np.einsum('eij,eij->ij', mag, tr)
+    return out
+
+
+def grid_axes(bounding_box, spatial_resolution):
+    """
+    :param np.ndarray bounding_box: [[x_min, x_max], [y_min, y_max]]
+    :param float spatial_resolution: Grid spacing.
+    :return: (x, y) grid coordinates.
+    """
     num_x = int(((bounding_box[0,1] - bounding_box[0,0]) / spatial_resolution))+1
     num_y = int(((bounding_box[1,1] - bounding_box[1,0]) / spatial_resolution))+1
-    amplitude_field = np.zeros([num_x, num_y])
-
     x = np.linspace(bounding_box[0,0], bounding_box[0,1], num_x, endpoint=True)
     y = np.linspace(bounding_box[1,0], bounding_box[1,1], num_y, endpoint=True)
+    return x, y
 
-    x_mesh, y_mesh = np.meshgrid(x, y)
-    plt.figure(figsize=(16,9), dpi=72)
-    for ind, emitter in enumerate(emitters):
-        alpha = 2 * nu * (2*np.pi*emitter.base_frequency)**2/(3*rho*speed_of_sound**3)
-        distance = np.sqrt((x_mesh-emitter.position[0])**2 + (y_mesh-emitter.position[1])**2)
-        # distance = np.sqrt(x_mesh**2 + y_mesh**2)
-        time = distance/speed_of_sound + phase_offsets[ind]/(2*np.pi*emitter.base_frequency)
-        power = 10**(emitter.emit_power/10) * np.exp(-alpha * distance)
-        omega_t = 2*np.pi*emitter.base_frequency * time
-        wave_length = speed_of_sound / emitter.base_frequency
-        wave_number = 2*np.pi/wave_length
-        k_x = distance * wave_number
-        amplitude_field += np.cos(omega_t.T)*power.T
-    # amplitude_field = 10*np.log10(amplitude_field)
-
-    plt.contourf(x, y, amplitude_field.T,  cmap=mpl.colormaps['seismic'], levels=64)
-    plt.colorbar()
-    for emitter in emitters:
-        plt.scatter(emitter.position[0], emitter.position[1])
+
+def solve_2d_static_emitter_field(emitters, bounding_box, spatial_resolution, speed_of_sound=337, phase_offsets=None,
+                                  max_chunk_bytes=DEFAULT_CHUNK_BYTES, dtype=np.complex64):
+    """
+    Solve the field of a set of static emitters over a bounding box without plotting.
+
+    :param list emitters: List of acoustics.emit_receive.Emitter.
+    :param np.ndarray bounding_box: [[x_min, x_max], [y_min, y_max]]
+    :param float spatial_resolution: Grid spacing.
+    :param float speed_of_sound: Speed of sound [m/s].
+    :param phase_offsets: Phase offset of each emitter [rad], if None all emitters are in phase.
+    :param int max_chunk_bytes: Size of the solver work buffers.
+    :param dtype: np.complex64 or np.complex128, see complex_pressure_field_2d.
+    :return: (x, y, complex field of shape [len(x), len(y)])
+    """
+    x, y = grid_axes(bounding_box, spatial_resolution)
+    field = complex_pressure_field_2d(emitters, x, y, speed_of_sound=speed_of_sound, phase_offsets=phase_offsets,
+                                      max_chunk_bytes=max_chunk_bytes, dtype=dtype)
+    return x, y, field
+
+
+def tile_slices(num_x, num_y, tile_shape):
+    """
+    :param tuple tile_shape: (tile_x, tile_y) points per tile.
+    :return: List of (x slice, y slice) covering the [num_x, num_y] grid.
+    """
+    return [(slice(x_start, min(x_start + tile_shape[0], num_x)), slice(y_start, min(y_start + tile_shape[1], num_y)))
+            for x_start in range(0, num_x, tile_shape[0]) for y_start in range(0, num_y, tile_shape[1])]
+
+
+def _tile_layout(num_x, num_y, workers, memory_budget):
+    # Each worker holds one complex64/128 tile (<= 16 bytes per point) and its solver work buffers, given half of
+    # its share of the budget each
+    worker_budget = memory_budget // max(1, workers)
+    tile_points = max(1, worker_budget // 2 // 16)
+    tile_y = int(min(num_y, max(1, np.sqrt(tile_points))))
+    tile_x = int(min(num_x, max(1, tile_points // tile_y)))
+    return (tile_x, tile_y), worker_budget // 2
+
+
+def _field_quantity(field, quantity):
+    if quantity == 'real':
+        return field.real
+    elif quantity == 'magnitude':
+        return np.abs(field)
+    return field
+
+
+def _evaluate_tile(arrays, x, y, z, tile, out, quantity, max_chunk_bytes, dtype):
+    x_slice, y_slice = tile
+    field = complex_pressure_field_from_arrays(arrays, x[x_slice], y[y_slice], z=z, max_chunk_bytes=max_chunk_bytes,
+                                               dtype=dtype)
+    out[x_slice, y_slice] = _field_quantity(field, quantity)
+
+
+def _evaluate_tiles_worker(arrays, x, y, z, tiles, path, quantity, max_chunk_bytes, dtype):
+    out = np.load(path, mmap_mode='r+')
+    for tile in tiles:
+        _evaluate_tile(arrays, x, y, z, tile, out, quantity, max_chunk_bytes, dtype)
+    out.flush()
+
+
+def tiled_pressure_field_2d(emitters, x, y, speed_of_sound=337, phase_offsets=None, z=0.0, quantity='real',
+                            out_dtype=np.float32, out=None, output_path=None, workers=None, executor='thread',
+                            memory_budget=DEFAULT_MEMORY_BUDGET, tile_shape=None):
+    """
+    Evaluate a large field tile by tile, optionally in a thread or process pool, writing each tile straight into a
+    preallocated or memory mapped output. Memory use beyond the output itself is bounded by memory_budget, so the
+    output can be far larger than RAM when it is a memmap.
+
+    e.x: x, y = grid_axes(bounding_box, wave_length / 20)                # ~1e8 points
+         field = tiled_pressure_field_2d(emitters, x, y, output_path='field.npy', workers=8)
+
+    :param list emitters: List of acoustics.emit_receive.Emitter.
+    :param np.ndarray x: Grid x coordinates.
+    :param np.ndarray y: Grid y coordinates.
+    :param float speed_of_sound: Speed of sound [m/s].
+    :param phase_offsets: Phase offset of each emitter [rad], if None all emitters are in phase.
+    :param float z: Height of the grid plane.
+    :param str quantity: 'real' for the instantaneous field, 'magnitude' for its amplitude or 'complex'.
+    :param out_dtype: dtype of the output, e.g. np.float32 (or np.complex64 for 'complex').
+    :param np.ndarray out: Array of shape [len(x), len(y)] to write into, e.g. a np.memmap.
+    :param str output_path: .npy file to create as a memory mapped output, used when out is None.
+    :param int workers: Number of pool workers, if None or 1 the tiles are evaluated in this thread.
+    :param str executor: 'thread' (NumPy releases the GIL in the solver) or 'process', which needs output_path.
+    :param int memory_budget: Bytes of working memory shared between the workers, excluding the output.
+    :param tuple tile_shape: (tile_x, tile_y) points per tile, if None chosen from the memory budget.
+    :return: Output array of shape [len(x), len(y)].
+    """
+    if quantity not in FIELD_QUANTITIES:
+        raise ValueError('Unknown field quantity: %s' % quantity)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    out_dtype = np.dtype(out_dtype)
+    if out is None:
+        if output_path is not None:
+            out = np.lib.format.open_memmap(output_path, mode='w+', dtype=out_dtype, shape=(len(x), len(y)))
+        else:
+            out = np.empty((len(x), len(y)), dtype=out_dtype)
+    solver_dtype = np.complex64 if out.dtype.itemsize <= 8 and out.dtype != np.float64 else np.complex128
+
+    workers = 1 if workers is None else max(1, int(workers))
+    default_tile_shape, max_chunk_bytes = _tile_layout(len(x), len(y), workers, memory_budget)
+    tiles = tile_slices(len(x), len(y), default_tile_shape if tile_shape is None else tile_shape)
+    arrays = emitter_arrays(emitters, speed_of_sound, phase_offsets)
+
+    if workers == 1 or len(tiles) == 1:
+        for tile in tiles:
+            _evaluate_tile(arrays, x, y, z, tile, out, quantity, max_chunk_bytes, solver_dtype)
+    elif executor == 'thread':
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_evaluate_tile, arrays, x, y, z, tile, out, quantity, max_chunk_bytes,
+                                   solver_dtype) for tile in tiles]
+            for future in futures:
+                future.result()
+    elif executor == 'process':
+        if output_path is None or getattr(out, 'filename', None) != os.path.abspath(output_path):
+            raise ValueError('Process pool evaluation writes through a memory mapped output, give output_path')
+        out.flush()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_evaluate_tiles_worker, arrays, x, y, z, tiles[start::workers], output_path,
+                                   quantity, max_chunk_bytes, solver_dtype) for start in range(workers)]
+            for future in futures:
+                future.result()
+        out = np.load(output_path, mmap_mode='r+')
+    else:
+        raise ValueError('Unknown executor: %s' % executor)
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def plot_2d_field(x, y, amplitude_field, emitters=None, output_dir=None, title=None, max_points=2000):
+    """
+    Contour plot of a field from solve_2d_static_emitter_field.
+
+    :param np.ndarray amplitude_field: Real field of shape [len(x), len(y)].
+    :param str output_dir: Directory to save the plot to, if None the plot is shown.
+    :param int max_points: Larger fields are strided down to at most this many points along each axis.
+    """
+    x_stride = max(1, int(np.ceil(len(x) / float(max_points))))
+    y_stride = max(1, int(np.ceil(len(y) / float(max_points))))
+    x = x[::x_stride]
+    y = y[::y_stride]
+    amplitude_field = np.asarray(amplitude_field[::x_stride, ::y_stride])
+    if output_dir is not None:
+        fig = Figure(figsize=(16,9), dpi=72)
+        FigureCanvasAgg(fig)
+    else:
+        fig = plt.figure(figsize=(16,9), dpi=72)
+    ax = fig.subplots()
+    contour = ax.contourf(x, y, amplitude_field.T,  cmap=mpl.colormaps['seismic'], levels=64)
+    fig.colorbar(contour, ax=ax)
+    if emitters is not None:
+        for emitter in emitters:
+            ax.scatter(emitter.position[0], emitter.position[1])
     if output_dir is not None:
-        plt.savefig(os.path.join(output_dir, '%s.png' % title))
+        fig.savefig(os.path.join(output_dir, '%s.png' % title))
     else:
         plt.show()
 
 
+def simulate_2d_static_emitter_field(emitters, bounding_box, spatial_resolution, speed_of_sound=337, phase_offsets=None,
+                                     output_dir=None, title=None, plot=True, workers=None, output_path=None,
+                                     memory_budget=None):
+    """
+    Instantaneous field of a set of static emitters, see solve_2d_static_emitter_field.
 
+    :param list emitters: List of acoustics.emit_receive.Emitter.
+    :param np.ndarray bounding_box: [[x_min, x_max], [y_min, y_max]]
+    :param float spatial_resolution: Grid spacing.
+    :param phase_offsets: Phase offset of each emitter [rad], if None all emitters are in phase.
+    :param str output_dir: Directory to save the plot to, if None the plot is shown.
+    :param str title: Name of the saved plot.
+    :param bool plot: Plot the field.
+    :param int workers: Evaluate the field tile by tile in a thread pool of this size, see tiled_pressure_field_2d.
+    :param str output_path: .npy file to memory map the float32 field into, for fields larger than memory.
+    :param int memory_budget: Working memory for tiled evaluation.
+    :return: (x, y, real field of shape [len(x), len(y)])
+    """
+    if workers is None and output_path is None and memory_budget is None:
+        x, y, field = solve_2d_static_emitter_field(emitters, bounding_box, spatial_resolution,
+                                                    speed_of_sound=speed_of_sound, phase_offsets=phase_offsets)
+        amplitude_field = field.real
+    else:
+        x, y = grid_axes(bounding_box, spatial_resolution)
+        amplitude_field = tiled_pressure_field_2d(
+            emitters, x, y, speed_of_sound=speed_of_sound, phase_offsets=phase_offsets, workers=workers,
+            output_path=output_path,
+            memory_budget=DEFAULT_MEMORY_BUDGET if memory_budget is None else memory_budget)
+    if plot:
+        plot_2d_field(x, y, amplitude_field, emitters=emitters, output_dir=output_dir, title=title)
+    return x, y, amplitude_field
@@ -0,0 +1,185 @@
+import numpy as np
+
+from simulation.acoustic_sim import DEFAULT_CHUNK_BYTES, emitter_arrays, grid_axes, propagation_matrix
+
+
+class PhaseSweep(object):
+    """
+    Field of a fixed set of emitters for many phase offset vectors. The complex propagation field of every emitter is
+    computed once, after which the field for a batch of phase offsets is a single matrix product
+    exp(i * phase_offsets) @ propagation.
+
+    e.x: sweep = PhaseSweep.from_grid(emitters, bounding_box, wave_length / 4)
+         fields = sweep.fields(phase_offsets)                  # [S, num_x, num_y] complex
+         arc = PhaseSweep.from_arc(emitters, np.radians(np.linspace(-90, 90, 1801)), radius=100 * wave_length)
+         metrics = arc.beam_metrics(phase_offsets)             # main lobe, beamwidth and side lobe level per row
+    """
+
+    def __init__(self, emitters, points, speed_of_sound=337, max_chunk_bytes=DEFAULT_CHUNK_BYTES, dtype=np.complex64,
+                 shape=None, angles=None):
+        """
+        :param list emitters: List of acoustics.emit_receive.Emitter.
+        :param np.ndarray points: Field points of shape [P, 3], or [P, 2] for distances in the x-y plane only.
+        :param float speed_of_sound: Speed of sound [m/s].
+        :param int max_chunk_bytes: Size of the work buffers used to build the propagation matrix.
+        :param dtype: np.complex64 or np.complex128.
+        :param tuple shape: Shape the P points are reshaped to in fields(), e.g. (num_x, num_y).
+        :param np.ndarray angles: Look angle of each point for beam_metrics, set by from_arc.
+        """
+        self.emitters = emitters
+        self.points = np.asarray(points, dtype=np.float64)
+        self.shape = (len(self.points),) if shape is None else tuple(shape)
+        self.angles = angles
+        self.propagation = propagation_matrix(emitter_arrays(emitters, speed_of_sound), self.points,
+                                              max_chunk_bytes=max_chunk_bytes, dtype=dtype)
+
+    @classmethod
+    def from_grid(cls, emitters, bounding_box, spatial_resolution, **kwargs):
+        """
+        Sweep over the same x-y grid as simulate_2d_static_emitter_field, fields() returns [S, num_x, num_y].
+        """
+        x, y = grid_axes(bounding_box, spatial_resolution)
+        x_mesh, y_mesh = np.meshgrid(x, y, indexing='ij')
+        sweep = cls(emitters, np.column_stack((x_mesh.ravel(), y_mesh.ravel())), shape=(len(x), len(y)), **kwargs)
+        sweep.x = x
+        sweep.y = y
+        return sweep
+
+    @classmethod
+    def from_arc(cls, emitters, angles, radius, center=None, **kwargs):
+        """
+        Sweep over an arc of points in the x-y plane around the array, for beam patterns. Angles are measured from
+        the +y axis towards the +x axis, so broadside to an array along x is 0.
+
+        :param np.ndarray angles: Look angles [rad], increasing.
+        :param float radius: Arc radius, large compared to the array for a far field pattern.
+        :param np.ndarray center: Arc center, if None the centroid of the emitters.
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        if center is None:
+            center = emitter_arrays(emitters)['position'].mean(axis=0)
+        center_3d = np.zeros(3)
+        center_3d[:len(np.ravel(center)[:3])] = np.ravel(center)[:3]
+        points = np.column_stack((center_3d[0] + radius * np.sin(angles), center_3d[1] + radius * np.cos(angles),
+                                  np.full(len(angles), center_3d[2])))
+        return cls(emitters, points, angles=angles, **kwargs)
+
+    def fields(self, phase_offsets, out=None):
+        """
+        :param np.ndarray phase_offsets: Phase offsets [rad] of shape [E] or [S, E].
+        :param np.ndarray out: C contiguous array of shape [S] + self.shape and the dtype of self.propagation to write
+        the fields into.
+        :return: Complex fields of shape self.shape, or [S] + self.shape for a batch of phase offsets. The real part
+        is the instantaneous field at t=0 (as simulate_2d_static_emitter_field) and the magnitude its amplitude.
+        """
+        phase_offsets = np.asarray(phase_offsets, dtype=np.float64)
+        weights = np.exp(1j * np.atleast_2d(phase_offsets)).astype(self.propagation.dtype)
+        if out is not None:
+            # A reshape of a non contiguous array is a copy, which matmul would fill instead of out
+            if (out.shape != (len(weights),) + self.shape or out.dtype != self.propagation.dtype
+                    or not out.flags['C_CONTIGUOUS']):
+                raise ValueError('out must be a C contiguous %s array of shape %s'
+                                 % (self.propagation.dtype, (len(weights),) + self.shape))
+            np.matmul(weights, self.propagation, out=out.reshape(len(weights), -1))
+            fields = out
+        else:
+            fields = (weights @ self.propagation).reshape((len(weights),) + self.shape)
+        return fields[0] if phase_offsets.ndim == 1 else fields
+
+    def beam_pattern(self, phase_offsets, batch_size=1024):
+        """
+        :param np.ndarray phase_offsets: Phase offsets [rad] of shape [E] or [S, E].
+        :param int batch_size: Number of phase offset vectors evaluated per matrix product.
+        :return: Field magnitude at each point, [P] or [S, P].
+        """
+        phase_offsets = np.asarray(phase_offsets, dtype=np.float64)
+        batch = np.atleast_2d(phase_offsets)
+        pattern = np.empty((len(batch), len(self.points)), dtype=self.propagation.real.dtype)
+        for start in range(0, len(batch), batch_size):
+            weights = np.exp(1j * batch[start:start + batch_size]).astype(self.propagation.dtype)
+            pattern[start:start + batch_size] = np.abs(weights @ self.propagation)
+        return pattern[0] if phase_offsets.ndim == 1 else pattern
+
+    def beam_metrics(self, phase_offsets, batch_size=1024):
+        """
+        Beam pattern metrics over the arc of from_arc, see beam_metrics.
+        """
+        if self.angles is None:
+            raise ValueError('beam_metrics needs the look angles of the points, create the sweep with from_arc')
+        return beam_metrics(self.angles, self.beam_pattern(phase_offsets, batch_size=batch_size))
+
+
+def steering_phases(emitters, angles, speed_of_sound=337):
+    """
+    Phase offsets that steer the far field main lobe of the emitters to each angle, in the x-y plane with angles
+    measured from the +y axis towards the +x axis.
+
+    :param list emitters: List of acoustics.emit_receive.Emitter.
+    :param np.ndarray angles: Steering angles [rad].
+    :return: np.ndarray of shape [len(angles), E].
+    """
+    arrays = emitter_arrays(emitters, speed_of_sound)
+    angles = np.atleast_1d(np.asarray(angles, dtype=np.float64))
+    directions = np.column_stack((np.sin(angles), np.cos(angles)))
+    path_difference = directions @ arrays['position'][:, :2].T
+    return np.remainder(arrays['wave_number'][np.newaxis, :] * path_difference, 2*np.pi)
+
+
+def beam_metrics(angles, pattern):
+    """
+    Main lobe direction, -3 dB beamwidth and side lobe level of a batch of beam patterns.
+
+    :param np.ndarray angles: Look angles [rad], increasing.
+    :param np.ndarray pattern: Field magnitude of shape [len(angles)] or [S, len(angles)].
+    :return: dict of 'main_lobe_angle' [rad], 'peak' (magnitude), 'beamwidth' [rad] (NaN if the main lobe does not
+    drop 3 dB within the angles on both sides) and 'side_lobe_level' [dB relative to the peak] (NaN if there are no
+    side lobes), each of shape [S] (or scalars for a single pattern).
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    single = np.ndim(pattern) == 1
+    pattern = np.atleast_2d(np.asarray(pattern, dtype=np.float64))
+    num_patterns, num_angles = pattern.shape
+    rows = np.arange(num_patterns)
+    idx = np.arange(num_angles)[np.newaxis, :]
+
+    peak_idx = np.argmax(pattern, axis=1)
+    peak = pattern[rows, peak_idx]
+    left_side = idx < peak_idx[:, np.newaxis]
+    right_side = idx > peak_idx[:, np.newaxis]
+
+    # -3 dB points, interpolated between the samples either side of the crossing
+    half_power = peak / np.sqrt(2)
+    below = pattern < half_power[:, np.newaxis]
+    left = np.max(np.where(below & left_side, idx, -1), axis=1)
+    right = np.min(np.where(below & right_side, idx, num_angles), axis=1)
+    found = (left >= 0) & (right < num_angles)
+    left_c = np.clip(left, 0, num_angles - 2)
+    right_c = np.clip(right, 1, num_angles - 1)
+    left_angle = _crossing(angles, pattern, rows, left_c, left_c + 1, half_power)
+    right_angle = _crossing(angles, pattern, rows, right_c - 1, right_c, half_power)
+    beamwidth = np.where(found, right_angle - left_angle, np.nan)
+
+    # The main lobe extends to the first local minimum either side of the peak
+    interior = np.zeros(pattern.shape, dtype=bool)
+    interior[:, 1:-1] = (pattern[:, 1:-1] <= pattern[:, :-2]) & (pattern[:, 1:-1] <= pattern[:, 2:])
+    left_null = np.max(np.where(interior & left_side, idx, 0), axis=1)
+    right_null = np.min(np.where(interior & right_side, idx, num_angles - 1), axis=1)
+    side = (idx < left_null[:, np.newaxis]) | (idx > right_null[:, np.newaxis])
+    side_peak = np.max(np.where(side, pattern, -np.inf), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        side_lobe_level = np.where(np.isfinite(side_peak) & (side_peak > 0),
+                                   20 * np.log10(np.maximum(side_peak, 1e-300) / peak), np.nan)
+
+    metrics = {'main_lobe_angle': angles[peak_idx], 'peak': peak, 'beamwidth': beamwidth,
+               'side_lobe_level': side_lobe_level}
+    if single:
+        return {name: value[0] for name, value in metrics.items()}
+    return metrics
+
+
+def _crossing(angles, pattern, rows, lower, upper, level):
+    lower_val = pattern[rows, lower]
+    upper_val = pattern[rows, upper]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(upper_val != lower_val, (level - lower_val) / (upper_val - lower_val), 0.5)
+    return angles[lower] + np.clip(fraction, 0, 1) * (angles[upper] - angles[lower])
@@ -0,0 +1,227 @@
+"""
+Monte-Carlo ensembles of 6-DOF vehicles advanced in lockstep. The N states are one [N, 13] simulation.rigid_body array,
+the loads of every active member are evaluated in one vectorized call of the model, and members that have terminated
+(e.g. hit the ground) are dropped from the active set so the remaining steps only cost what is still flying.
+
+e.x: model = DragModel(mass=43.0, inertia=np.diag([0.15, 1.7, 1.7]), reference_area=0.0189, drag_coefficient=cd,
+                       wind=winds)                                            # cd [N], winds [N, 3]
+     result = run_ensemble(model, states_0, end_time=120, dt=0.01, terminate=ground_impact, workers=4)
+     ranges = impact_points(result)[:, 0]
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulation.integrators import make_stepper
+from simulation.rigid_body import (DENSITY_SCALE_HEIGHT, POSITION, QUATERNION, SEA_LEVEL_DENSITY, STANDARD_GRAVITY,
+                                   VELOCITY, normalize_quaternion, rigid_body_derivative)
+from utilities.coordinate_systems import quaternion_rotate
+
+
+class DragModel(object):
+    """
+    Ensemble load model of axisymmetric projectiles: quadratic drag along the relative wind, a restoring moment
+    proportional to the angle of attack and pitch/yaw rate damping, in an exponential atmosphere with a constant wind
+    per member. Every parameter is a scalar shared by the ensemble or an array with one row per member.
+    """
+
+    def __init__(self, mass, inertia, reference_area, drag_coefficient, wind=None, stability_coefficient=0.0,
+                 damping_coefficient=0.0, reference_length=None, gravity=STANDARD_GRAVITY):
+        """
+        :param mass: Mass [kg], scalar or [N].
+        :param np.ndarray inertia: Body frame inertia [kg m^2], [3, 3] or [N, 3, 3].
+        :param reference_area: Reference area [m^2].
+        :param drag_coefficient: Drag coefficient, scalar or [N].
+        :param np.ndarray wind: Inertial wind velocity [m/s], [3] or [N, 3].
+        :param stability_coefficient: Restoring moment coefficient per radian of angle of attack, scalar or [N].
+        :param damping_coefficient: Pitch and yaw damping moment coefficient per unit q L / V, scalar or [N].
+        :param float reference_length: Reference length [m], if None the diameter of the reference area.
+        :param np.ndarray gravity: Inertial gravitational acceleration [m/s^2].
+        """
+        self.mass = np.asarray(mass, dtype=np.float64)
+        self.inertia = np.asarray(inertia, dtype=np.float64)
+        self.inv_inertia = np.linalg.inv(self.inertia)
+        self.reference_area = reference_area
+        self.reference_length = (np.sqrt(4 * reference_area / np.pi) if reference_length is None
+                                 else reference_length)
+        self.drag_coefficient = np.asarray(drag_coefficient, dtype=np.float64)
+        self.wind = np.zeros(3) if wind is None else np.asarray(wind, dtype=np.float64)
+        self.stability_coefficient = np.asarray(stability_coefficient, dtype=np.float64)
+        self.damping_coefficient = np.asarray(damping_coefficient, dtype=np.float64)
+        self.gravity = np.asarray(gravity, dtype=np.float64)
+
+    def derivative(self, t, states, members):
+        """
+        :param float t: Time [s].
+        :param np.ndarray states: States of the active members, [n, 13].
+        :param np.ndarray members: Index of each active member into the per member parameters, [n].
+        :return: State derivatives [n, 13].
+        """
+        force_b, moment_b = self.loads(t, states, members)
+        return rigid_body_derivative(states, force_b, moment_b, _rows(self.mass, members, 0),
+                                     _rows(self.inertia, members, 2), _rows(self.inv_inertia, members, 2),
+                                     gravity=_rows(self.gravity, members, 1))
+
+    def loads(self, t, states, members):
+        """
+        :return: (force_b [n, 3], moment_b [n, 3]) excluding gravity.
+        """
+        quaternion = states[:, QUATERNION]
+        air_velocity_b = quaternion_rotate(quaternion, states[:, VELOCITY] - _rows(self.wind, members, 1),
+                                           inverse=True)
+        speed = np.sqrt(np.einsum('ni,ni->n', air_velocity_b, air_velocity_b))
+        density = SEA_LEVEL_DENSITY * np.exp(states[:, 2] / DENSITY_SCALE_HEIGHT)  # z is down
+        dynamic_pressure_area = 0.5 * density * speed**2 * self.reference_area
+
+        force_b = (-dynamic_pressure_area * _rows(self.drag_coefficient, members, 0) /
+                   np.maximum(speed, 1E-9))[:, np.newaxis] * air_velocity_b
+
+        # Small angle restoring moment turning the nose into the relative wind, and rate damping
+        moment_b = np.zeros_like(force_b)
+        stability = dynamic_pressure_area * self.reference_length * _rows(self.stability_coefficient, members, 0)
+        damping = (dynamic_pressure_area * self.reference_length**2 * _rows(self.damping_coefficient, members, 0) /
+                   np.maximum(speed, 1E-9))
+        inv_speed = 1 / np.maximum(speed, 1E-9)
+        moment_b[:, 1] = -stability * air_velocity_b[:, 2] * inv_speed - damping * states[:, 11]
+        moment_b[:, 2] = stability * air_velocity_b[:, 1] * inv_speed - damping * states[:, 12]
+        return force_b, moment_b
+
+
+class EnsembleResult(object):
+    def __init__(self, states, termination_time, previous_states, num_steps, num_member_steps):
+        """
+        :param np.ndarray states: Final states [N, 13], at termination for the terminated members.
+        :param np.ndarray termination_time: Time each member terminated [s], NaN if it ran to the end time.
+        :param np.ndarray previous_states: States one step before termination [N, 13], NaN if not terminated.
+        :param int num_steps: Number of lockstep integrator steps.
+        :param int num_member_steps: Sum over the steps of the members advanced.
+        """
+        self.states = states
+        self.termination_time = termination_time
+        self.previous_states = previous_states
+        self.num_steps = num_steps
+        self.num_member_steps = num_member_steps
+
+    @property
+    def terminated(self):
+        return ~np.isnan(self.termination_time)
+
+    @classmethod
+    def concatenate(cls, results):
+        return cls(np.concatenate([result.states for result in results]),
+                   np.concatenate([result.termination_time for result in results]),
+                   np.concatenate([result.previous_states for result in results]),
+                   max(result.num_steps for result in results),
+                   sum(result.num_member_steps for result in results))
+
+
+def ground_impact(t, states, altitude=0.0):
+    """
+    Termination function of members descending through an altitude [m] (z down).
+    """
+    return (states[:, 2] > -altitude) & (states[:, 5] > 0)
+
+
+def impact_points(result, altitude=0.0):
+    """
+    Ground impact positions interpolated linearly between the last two states of each terminated member.
+
+    :param EnsembleResult result: Result of run_ensemble with ground_impact (at the same altitude) as terminate.
+    :return: Inertial positions [N, 3], NaN for members that did not terminate.
+    """
+    before = result.previous_states[:, POSITION]
+    after = result.states[:, POSITION]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.clip((-altitude - before[:, 2]) / (after[:, 2] - before[:, 2]), 0.0, 1.0)
+    points = before + fraction[:, np.newaxis] * (after - before)
+    points[~result.terminated] = np.nan
+    return points
+
+
+def simulate_ensemble(model, states, end_time, dt=1E-2, method='rk4', terminate=None, members=None, start_time=0.0,
+                      max_steps=None, **options):
+    """
+    Advance an ensemble in lockstep in this process.
+
+    :param model: Load model with a derivative(t, states, members) method, e.g. DragModel.
+    :param np.ndarray states: Initial states [N, 13].
+    :param float end_time: Time [s] the members that have not terminated stop at.
+    :param float dt: Step of the fixed step methods, first step of 'dopri5'.
+    :param str method: Stepper of simulation.integrators.STEPPERS.
+    :param terminate: Function terminate(t, states) returning a bool [n] of the members to stop, e.g. ground_impact.
+    :param np.ndarray members: Index of each state into the model parameters, if None range(N).
+    :param int max_steps: Stop after this many steps.
+    :param options: Further stepper arguments, e.g. rtol and atol.
+    :return: EnsembleResult
+    """
+    states = np.array(states, dtype=np.float64)
+    num_members = len(states)
+    members = np.arange(num_members) if members is None else np.asarray(members)
+    termination_time = np.full(num_members, np.nan)
+    previous_states = np.full(states.shape, np.nan)
+
+    stepper = make_stepper(method, dt, projection=normalize_quaternion, **options)
+    active = np.arange(num_members)  # Rows of states still running
+    active_states = states.copy()
+    derivative = lambda t, y: model.derivative(t, y, members[active])
+
+    t = start_time
+    num_steps = 0
+    num_member_steps = 0
+    while t < end_time and len(active) and (max_steps is None or num_steps < max_steps):
+        last_states = active_states
+        t, active_states = stepper.step(derivative, t, active_states, t_bound=end_time)
+        num_steps += 1
+        num_member_steps += len(active)
+        if terminate is None:
+            continue
+        stop = terminate(t, active_states)
+        if np.any(stop):
+            rows = active[stop]
+            states[rows] = active_states[stop]
+            previous_states[rows] = last_states[stop]
+            termination_time[rows] = t
+            keep = ~stop
+            active = active[keep]
+            active_states = active_states[keep]
+            # The cached final stage of the stepper belongs to the old active set
+            stepper.reset()
+    states[active] = active_states
+    return EnsembleResult(states, termination_time, previous_states, num_steps, num_member_steps)
+
+
+def _simulate_chunk(model, states, members, end_time, dt, method, terminate, options):
+    return simulate_ensemble(model, states, end_time, dt=dt, method=method, terminate=terminate, members=members,
+                             **options)
+
+
+def run_ensemble(model, states, end_time, dt=1E-2, method='rk4', terminate=None, workers=None, chunk_size=None,
+                 **options):
+    """
+    Advance an ensemble, optionally split into chunks run in a process pool. Each chunk runs in lockstep on its own,
+    so a chunk whose members all terminate early frees its worker.
+
+    :param int workers: Number of processes, if None or 1 the ensemble runs in this process. The model and
+    terminate function must be picklable (module level).
+    :param int chunk_size: Members per chunk, by default the ensemble is split evenly between the workers.
+    :return: EnsembleResult in the order of states.
+    """
+    states = np.asarray(states, dtype=np.float64)
+    if workers is None or workers <= 1:
+        return simulate_ensemble(model, states, end_time, dt=dt, method=method, terminate=terminate, **options)
+
+    workers = min(workers, os.cpu_count() or workers)
+    if chunk_size is None:
+        chunk_size = int(np.ceil(len(states) / workers))
+    chunks = [np.arange(start, min(start + chunk_size, len(states))) for start in range(0, len(states), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_simulate_chunk, model, states[chunk], chunk, end_time, dt, method, terminate, options)
+                   for chunk in chunks]
+        return EnsembleResult.concatenate([future.result() for future in futures])
+
+
+def _rows(value, members, item_ndim):
+    # Per member parameters have one more dimension than shared ones
+    return value[members] if np.ndim(value) > item_ndim else value
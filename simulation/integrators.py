@@ -0,0 +1,248 @@
+"""
+Time steppers for y' = func(t, y) over ndarray states of any shape, e.g. a single simulation.rigid_body state [13] or
+an ensemble [N, 13]. Every stepper has the same interface:
+
+    stepper = RK4(dt=0.01, projection=normalize_quaternion)
+    t, y = stepper.step(func, t, y)          # one step, returns a new state array
+    stepper.num_evaluations                  # calls of func so far
+
+so a simulation loop can update its managers between steps whatever the method. integrate() runs a stepper over a
+time span, or passes the problem through to scipy.integrate.solve_ivp for any other method name.
+"""
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+# Dormand-Prince 5(4) tableau
+DOPRI_C = np.array([0.0, 1/5, 3/10, 4/5, 8/9, 1.0, 1.0])
+DOPRI_A = [np.array([]),
+           np.array([1/5]),
+           np.array([3/40, 9/40]),
+           np.array([44/45, -56/15, 32/9]),
+           np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+           np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]),
+           np.array([35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84])]
+DOPRI_ERROR = np.array([71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+
+
+class Euler(object):
+    """
+    Explicit (forward) Euler, first order. Kept as the baseline the higher order steppers are measured against.
+    """
+
+    def __init__(self, dt, projection=None):
+        """
+        :param float dt: Time step [s].
+        :param projection: Function applied in place to each new state, e.g. rigid_body.normalize_quaternion.
+        """
+        self.dt = dt
+        self.projection = projection
+        self.num_evaluations = 0
+
+    def reset(self):
+        pass
+
+    def step(self, func, t, y, t_bound=None):
+        """
+        :param func: Derivative function func(t, y) returning an array of the shape of y.
+        :param float t: Time [s].
+        :param np.ndarray y: State at t.
+        :param float t_bound: Time the step may not pass.
+        :return: (t_new, y_new)
+        """
+        dt = self.dt if t_bound is None else min(self.dt, t_bound - t)
+        y_new = y + dt * func(t, y)
+        self.num_evaluations += 1
+        if self.projection is not None:
+            self.projection(y_new)
+        return _advance(t, dt, t_bound), y_new
+
+
+class RK4(Euler):
+    """
+    Classic fixed step fourth order Runge-Kutta, four evaluations per step.
+    """
+
+    def step(self, func, t, y, t_bound=None):
+        dt = self.dt if t_bound is None else min(self.dt, t_bound - t)
+        k1 = func(t, y)
+        k2 = func(t + 0.5*dt, y + 0.5*dt * k1)
+        k3 = func(t + 0.5*dt, y + 0.5*dt * k2)
+        k4 = func(t + dt, y + dt * k3)
+        self.num_evaluations += 4
+        y_new = y + dt/6 * (k1 + 2*(k2 + k3) + k4)
+        if self.projection is not None:
+            self.projection(y_new)
+        return _advance(t, dt, t_bound), y_new
+
+
+class DormandPrince(object):
+    """
+    Adaptive Dormand-Prince 5(4), seven evaluations per accepted step. The final stage is evaluated at the new state
+    and reused as the first stage of the next step (first same as last), which then costs six, as long as that step
+    starts from the returned state, reset() is not called in between and the projection moves the state by less than
+    the tolerance.
+
+    The step size is shared by every element of the state, so an ensemble advances in lockstep at the step its worst
+    member needs.
+    """
+
+    def __init__(self, rtol=1e-6, atol=1e-9, first_step=None, max_step=np.inf, min_step=1e-10, safety=0.9,
+                 projection=None):
+        """
+        :param float rtol: Relative tolerance of the local error.
+        :param atol: Absolute tolerance, scalar or broadcastable to the state.
+        :param float first_step: Initial step [s], estimated from the first derivative if None.
+        :param float max_step: Largest step [s].
+        :param float min_step: Smallest step [s], below which a RuntimeError is raised.
+        :param float safety: Factor on the optimal step size.
+        :param projection: Function applied in place to each accepted state.
+        """
+        self.rtol = rtol
+        self.atol = atol
+        self.dt = first_step
+        self.max_step = max_step
+        self.min_step = min_step
+        self.safety = safety
+        self.projection = projection
+        self.num_evaluations = 0
+        self.num_rejected = 0
+        self._last = None
+
+    def reset(self):
+        """
+        Drop the cached final stage, needed when the derivative function changes between steps (e.g. new control
+        inputs) so the first stage of the next step is evaluated afresh.
+        """
+        self._last = None
+
+    def _error_norm(self, error, y, y_new):
+        scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+        ratio = np.atleast_1d(error / scale)
+        return float(np.max(np.sqrt(np.mean(ratio**2, axis=-1))))
+
+    def _initial_step(self, y, dy):
+        scale = self.atol + self.rtol * np.abs(y)
+        d0 = np.sqrt(np.mean((y / scale)**2))
+        d1 = np.sqrt(np.mean((dy / scale)**2))
+        dt = 0.01 * d0 / d1 if d0 > 1e-5 and d1 > 1e-5 else 1e-6
+        return min(dt, self.max_step)
+
+    def step(self, func, t, y, t_bound=None):
+        """
+        Take one accepted step, retrying with smaller steps until the local error is within tolerance.
+
+        :param func: Derivative function func(t, y) returning an array of the shape of y.
+        :param float t: Time [s].
+        :param np.ndarray y: State at t.
+        :param float t_bound: Time the step may not pass.
+        :return: (t_new, y_new)
+        """
+        if self._last is not None and self._last[0] == t and self._last[1] is y:
+            k_first = self._last[2]
+        else:
+            k_first = func(t, y)
+            self.num_evaluations += 1
+        if self.dt is None:
+            self.dt = self._initial_step(y, k_first)
+
+        k = [k_first] + [None] * 6
+        while True:
+            dt = min(self.dt, self.max_step)
+            if t_bound is not None:
+                dt = min(dt, t_bound - t)
+            for stage in range(1, 7):
+                increment = sum(a * k[ind] for ind, a in enumerate(DOPRI_A[stage]) if a != 0.0)
+                y_stage = y + dt * increment
+                k[stage] = func(t + DOPRI_C[stage] * dt, y_stage)
+            self.num_evaluations += 6
+            y_new = y_stage  # The seventh stage is evaluated at the fifth order solution
+            error = dt * sum(e * k[ind] for ind, e in enumerate(DOPRI_ERROR) if e != 0.0)
+            error_norm = self._error_norm(error, y, y_new)
+
+            if error_norm <= 1.0:
+                factor = 10.0 if error_norm == 0 else min(10.0, self.safety * error_norm**-0.2)
+                # A step shortened to land on t_bound says nothing about how far the next one can go
+                if dt >= min(self.dt, self.max_step) or factor < 1:
+                    self.dt = dt * factor
+                break
+            self.num_rejected += 1
+            self.dt = dt * max(0.2, self.safety * error_norm**-0.2)
+            if self.dt < self.min_step:
+                raise RuntimeError('Step size %s below the minimum %s at t = %s' % (self.dt, self.min_step, t))
+
+        t_new = _advance(t, dt, t_bound)
+        self._last = (t_new, y_new, k[6])
+        if self.projection is not None:
+            y_unprojected = y_new.copy()
+            self.projection(y_new)
+            if self._error_norm(y_new - y_unprojected, y_unprojected, y_new) > 1.0:
+                self._last = None
+        return t_new, y_new
+
+
+def _advance(t, dt, t_bound):
+    # Land exactly on t_bound rather than a rounding error short of it
+    return t_bound if t_bound is not None and dt == t_bound - t else t + dt
+
+
+STEPPERS = {'euler': Euler, 'rk4': RK4, 'dopri5': DormandPrince}
+
+
+def make_stepper(method, dt=None, projection=None, **options):
+    """
+    :param str method: 'euler', 'rk4' or 'dopri5'.
+    :param float dt: Time step of the fixed step methods, first step of 'dopri5' (estimated if None).
+    :param projection: Function applied in place to each new state.
+    :param options: Further arguments of the stepper, e.g. rtol and atol of DormandPrince.
+    """
+    if method not in STEPPERS:
+        raise ValueError('Unknown stepper %s, expected one of %s' % (method, sorted(STEPPERS)))
+    if method == 'dopri5':
+        return DormandPrince(first_step=dt, projection=projection, **options)
+    if dt is None:
+        raise ValueError('Method %s needs a time step dt' % method)
+    return STEPPERS[method](dt, projection=projection, **options)
+
+
+def integrate(func, t_span, y0, method='rk4', dt=None, projection=None, terminate=None, max_steps=None, **options):
+    """
+    Integrate y' = func(t, y) over t_span.
+
+    e.x: times, states = integrate(derivative, (0, 10), state_0, method='dopri5', rtol=1e-8,
+                                   projection=normalize_quaternion, terminate=lambda t, y: y[2] > 0)
+
+    :param func: Derivative function func(t, y) returning an array of the shape of y.
+    :param tuple t_span: (t_start, t_end) [s].
+    :param np.ndarray y0: Initial state, of any shape.
+    :param str method: 'euler', 'rk4' or 'dopri5' for the steppers of this module, any other name (e.g. 'RK45',
+    'DOP853', 'Radau', 'LSODA') is passed through to scipy.integrate.solve_ivp with the state flattened.
+    :param float dt: Step of the fixed step methods, first step of 'dopri5'.
+    :param projection: Function applied in place to each new state, not applied by solve_ivp.
+    :param terminate: Function terminate(t, y) returning True to stop after a step, for solve_ivp use its events.
+    :param int max_steps: Stop after this many steps.
+    :param options: Passed to the stepper (rtol, atol, max_step, ...) or to solve_ivp.
+    :return: (times [K], states [K] + y0.shape), including the initial state.
+    """
+    y0 = np.asarray(y0, dtype=np.float64)
+    t_start, t_end = t_span
+    if method not in STEPPERS:
+        shape = y0.shape
+        solution = solve_ivp(lambda t, y: np.ravel(func(t, y.reshape(shape))), t_span, y0.ravel(), method=method,
+                             first_step=dt, **options)
+        if solution.status < 0:
+            raise RuntimeError(solution.message)
+        return solution.t, solution.y.T.reshape((len(solution.t),) + shape)
+
+    stepper = make_stepper(method, dt, projection=projection, **options)
+
+    times = [t_start]
+    states = [y0.copy()]
+    t, y = t_start, states[0]
+    while t < t_end and (max_steps is None or len(times) <= max_steps):
+        t, y = stepper.step(func, t, y, t_bound=t_end)
+        times.append(t)
+        states.append(y)
+        if terminate is not None and terminate(t, y):
+            break
+    return np.array(times), np.array(states)
@@ -0,0 +1,110 @@
+"""
+Flat 6-DOF rigid body state, one row of STATE_SIZE values per vehicle:
+
+    [0:3]   position in the inertial (local level) frame [m]
+    [3:6]   velocity in the inertial frame [m/s]
+    [6:10]  attitude quaternion (w, x, y, z), see utilities.coordinate_systems
+    [10:13] body frame angular rates (p, q, r) [rad/s]
+
+States may be a single [13] vector or a batch of shape [N, 13], every function below broadcasts over the leading
+dimensions.
+"""
+
+import numpy as np
+
+from utilities.coordinate_systems import (cross, euler_to_quaternion, quaternion_derivative, quaternion_normalize,
+                                          quaternion_rotate, quaternion_to_euler)
+
+POSITION = slice(0, 3)
+VELOCITY = slice(3, 6)
+QUATERNION = slice(6, 10)
+ANGULAR_RATE = slice(10, 13)
+STATE_SIZE = 13
+
+STANDARD_GRAVITY = np.array([0.0, 0.0, 9.80665])  # Local level frame, z down
+SEA_LEVEL_DENSITY = 1.225  # [kg/m^3]
+DENSITY_SCALE_HEIGHT = 8500.0  # Of the exponential atmosphere [m]
+
+
+def state_from_euler(position, velocity, attitude, angular_rate):
+    """
+    :param np.ndarray position: Inertial position [m] of shape [..., 3].
+    :param np.ndarray velocity: Inertial velocity [m/s] of shape [..., 3].
+    :param np.ndarray attitude: (roll, pitch, yaw) [rad] of shape [..., 3].
+    :param np.ndarray angular_rate: Body rates [rad/s] of shape [..., 3].
+    :return: States of shape [..., 13].
+    """
+    position, velocity, attitude, angular_rate = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (position, velocity, attitude, angular_rate)))
+    state = np.empty(position.shape[:-1] + (STATE_SIZE,))
+    state[..., POSITION] = position
+    state[..., VELOCITY] = velocity
+    state[..., QUATERNION] = euler_to_quaternion(attitude)
+    state[..., ANGULAR_RATE] = angular_rate
+    return state
+
+
+def euler_state(state):
+    """
+    :param np.ndarray state: States of shape [..., 13].
+    :return: The 12 element (position, velocity, roll pitch yaw, angular rate) states of shape [..., 12].
+    """
+    state = np.asarray(state, dtype=np.float64)
+    return np.concatenate((state[..., :6], quaternion_to_euler(state[..., QUATERNION]), state[..., ANGULAR_RATE]),
+                          axis=-1)
+
+
+def normalize_quaternion(state):
+    """
+    Project the attitude quaternions of the states back to unit length in place, e.g. after an integrator step.
+
+    :return: state
+    """
+    quaternion_normalize(state[..., QUATERNION], out=state[..., QUATERNION])
+    return state
+
+
+def rigid_body_derivative(state, force_b, moment_b, mass, inertia, inv_inertia=None, gravity=STANDARD_GRAVITY,
+                          angular_momentum_b=None, normalization_gain=0.0, out=None):
+    """
+    Time derivative of rigid body states, a pure function of its arguments:
+
+        position_dot = velocity
+        velocity_dot = C^T force_b / mass + gravity
+        q_dot = 0.5 q (0, omega)
+        omega_dot = I^-1 (moment_b - omega x (I omega + h))
+
+    where C is the inertial to body DCM and h the angular momentum of spinning components (rotors, wheels) relative
+    to the body.
+
+    :param np.ndarray state: States of shape [..., 13].
+    :param np.ndarray force_b: Body frame force [N] of shape [..., 3], excluding gravity.
+    :param np.ndarray moment_b: Body frame moment about the center of mass [Nm] of shape [..., 3].
+    :param mass: Mass [kg], scalar or of shape [...].
+    :param np.ndarray inertia: Body frame inertia tensor [kg m^2] of shape [3, 3] or [..., 3, 3].
+    :param np.ndarray inv_inertia: Inverse of inertia, computed if None.
+    :param np.ndarray gravity: Inertial frame gravitational acceleration [m/s^2] of shape [3] or [..., 3].
+    :param np.ndarray angular_momentum_b: Body frame angular momentum of components relative to the body [kg m^2/s].
+    :param float normalization_gain: See utilities.coordinate_systems.quaternion_derivative.
+    :param np.ndarray out: Array of shape [..., 13] to write the derivatives into.
+    :return: np.ndarray of shape [..., 13].
+    """
+    state = np.asarray(state, dtype=np.float64)
+    if out is None:
+        out = np.empty(state.shape)
+    inertia = np.asarray(inertia, dtype=np.float64)
+    if inv_inertia is None:
+        inv_inertia = np.linalg.inv(inertia)
+    omega = state[..., ANGULAR_RATE]
+    quaternion = state[..., QUATERNION]
+
+    out[..., POSITION] = state[..., VELOCITY]
+    specific_force = np.asarray(force_b, dtype=np.float64) / np.asarray(mass, dtype=np.float64)[..., np.newaxis]
+    out[..., VELOCITY] = quaternion_rotate(quaternion, specific_force) + gravity
+    quaternion_derivative(quaternion, omega, normalization_gain=normalization_gain, out=out[..., QUATERNION])
+
+    momentum = np.einsum('...ij,...j->...i', inertia, omega)
+    if angular_momentum_b is not None:
+        momentum = momentum + angular_momentum_b
+    out[..., ANGULAR_RATE] = np.einsum('...ij,...j->...i', inv_inertia, moment_b - cross(omega, momentum))
+    return out
@@ -1,32 +1,80 @@
+import numpy as np
+
+from simulation.rigid_body import DENSITY_SCALE_HEIGHT, SEA_LEVEL_DENSITY, STANDARD_GRAVITY
+
+
 class SimulationManager(object):
-    def __init__(self, pos_init, vel_init, angle_init, angle_rate_init, log):
+    def __init__(self, pos_init, vel_init, angle_init, angle_rate_init, log, dt=1E-2, end_time=np.inf, method='rk4',
+                 **integrator_options):
+        """
+        :param float dt: Time step of the fixed step integrators, first step of 'dopri5'.
+        :param float end_time: Time the simulation stops at [s].
+        :param str method: Integrator of simulation.integrators.STEPPERS.
+        :param integrator_options: Further integrator arguments, e.g. rtol and atol for 'dopri5'.
+        """
         self.initial_pos = pos_init
         self.initial_vel = vel_init
         self.initial_attitude = angle_init
         self.initial_attitude_rate = angle_rate_init
         self.logger = log
         self.simulate = True
+        self.dt = dt
+        self.time = 0.0
+        self.end_time = end_time
+        self.method = method
+        self.integrator_options = integrator_options
 
-    def update(self):
-        pass
+    def update(self, vehicle=None, control_manager=None, environment_manager=None):
+        if self.time >= self.end_time:
+            self.simulate = False
 
 class EnvironmentManager(object):
     def __init__(self):
         pass
 
-    def update(self):
-        pass
+    def update(self, vehicle=None, simulation_manager=None):
+        """
+        :return: False if nothing the vehicle loads depend on changed, so the integrator may carry its last derivative
+        over to the next step. Anything else (including None) makes simulate_vehicle evaluate it afresh.
+        """
+        return False
 
     def air_properties(self, altitude):
         pass
 
+    def air_density(self, altitude):
+        """
+        :param float altitude: Height above the origin [m].
+        :return: Density of an exponential atmosphere [kg/m^3].
+        """
+        return SEA_LEVEL_DENSITY * np.exp(-altitude / DENSITY_SCALE_HEIGHT)
+
+    def wind(self, vehicle):
+        """
+        :return: Local level frame wind velocity [m/s].
+        """
+        return np.zeros(3)
+
+    def gravity(self, vehicle):
+        """
+        :return: Local level frame gravitational acceleration [m/s^2].
+        """
+        return STANDARD_GRAVITY
+
 class ControlManager():
     def __init__(self):
         pass
 
-    def update(self):
-        pass
+    def update(self, vehicle=None, simulation_manager=None):
+        """
+        :return: False if the control inputs did not change, see EnvironmentManager.update.
+        """
+        return False
 
 class DataLogger(object):
     def __init__(self):
         self.data = dict()
+
+    def log_iteration(self, vehicle, control_manager, environment_manager, simulation_manager):
+        self.data.setdefault('time', list()).append(simulation_manager.time)
+        self.data.setdefault('states', list()).append(vehicle.states.copy())
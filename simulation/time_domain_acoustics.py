@@ -0,0 +1,277 @@
+import numpy as np
+
+from acoustics.emit_receive import element_gains
+from simulation.acoustic_sim import emitter_arrays
+
+MIN_DISTANCE = 1E-3
+RETARDED_TIME_TOLERANCE = 1E-10
+MAX_RETARDED_TIME_ITERATIONS = 20
+
+
+class EmitterTrajectory(object):
+    """
+    Sampled positions of every emitter over time, linearly interpolated. The retarded time of each emitter/microphone
+    pair is different, so positions are looked up for a whole [E, M, B] block of emission times at once.
+    """
+
+    def __init__(self, times, positions):
+        """
+        :param np.ndarray times: Sample times [s] of shape [K], increasing.
+        :param np.ndarray positions: Emitter positions of shape [K, E, 3]. Positions are held constant outside of the
+        sampled times.
+        """
+        self.times = np.asarray(times, dtype=np.float64)
+        self.positions = np.asarray(positions, dtype=np.float64)
+
+    @classmethod
+    def linear(cls, emitters, velocities, end_time, start_time=0.0):
+        """
+        Emitters moving at constant velocity from their Emitter.position at start_time.
+
+        :param np.ndarray velocities: Velocity of each emitter [m/s], shape [E, 3].
+        """
+        start = emitter_arrays(emitters)['position']
+        times = np.array([start_time, end_time], dtype=np.float64)
+        positions = start[np.newaxis] + (times - start_time)[:, np.newaxis, np.newaxis] * \
+            np.asarray(velocities, dtype=np.float64)[np.newaxis]
+        return cls(times, positions)
+
+    def __call__(self, emission_time):
+        """
+        :param np.ndarray emission_time: Times of shape [E, ...], the first axis being the emitter.
+        :return: Positions of shape [E, ..., 3].
+        """
+        t = np.clip(emission_time, self.times[0], self.times[-1])
+        upper = np.clip(np.searchsorted(self.times, t, side='right'), 1, len(self.times) - 1)
+        lower = upper - 1
+        span = self.times[upper] - self.times[lower]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(span > 0, (t - self.times[lower]) / span, 0.0)[..., np.newaxis]
+        emitter = np.arange(self.positions.shape[1]).reshape((-1,) + (1,) * (t.ndim - 1))
+        return self.positions[lower, emitter] * (1 - weight) + self.positions[upper, emitter] * weight
+
+
+class TimeDomainPropagator(object):
+    """
+    Time domain propagation from a set of emitters to every microphone of a CompositeMicrophoneArray. Each received
+    signal is the sum over emitters of the source signal at the retarded (emission) time, with spherical spreading
+    and the atmospheric absorption of simulation.acoustic_sim:
+
+        p_m(t) = sum_e A_e * r_ref / r_em * exp(-alpha_e * r_em) * s_e(tau),   t = tau + r_em(tau) / c
+
+    Emitter/microphone pairs are evaluated together as [E, M, block] arrays, and the output is streamed in blocks so
+    long recordings never have to be held in memory. Moving emitters are given by an EmitterTrajectory, the retarded
+    time is then solved by fixed point iteration which gives the Doppler shift directly. Emitter and microphone
+    AcousticPatterns are applied along the direction of each pair.
+
+    e.x: propagator = TimeDomainPropagator(emitters, mic_array, sample_rate=192E3)
+         for time, block in propagator.blocks(duration=2.0, block_size=8192):
+             ...                                                   # block has shape [M, 8192]
+    """
+
+    def __init__(self, emitters, microphone_array, sample_rate, speed_of_sound=337, phase_offsets=None,
+                 source_signals=None, source_sample_rate=None, trajectory=None, reference_distance=1.0):
+        """
+        :param list emitters: List of acoustics.emit_receive.Emitter.
+        :param CompositeMicrophoneArray microphone_array: Receiving microphones.
+        :param float sample_rate: Output sample rate [Hz].
+        :param float speed_of_sound: Speed of sound [m/s].
+        :param phase_offsets: Phase offset phi of each emitter [rad] for the default tone sources, which emit
+        cos(2 pi f t - phi). This is the conjugate of the exp(i (k r + phi)) phasors of simulation.acoustic_sim, so the
+        same offsets (e.g. from simulation.beam_steering.steering_phases) steer both solvers the same way.
+        :param np.ndarray source_signals: Sampled source signals of shape [E, N] starting at t=0, zero outside. If
+        None each emitter emits a tone at its base_frequency.
+        :param float source_sample_rate: Sample rate of source_signals, if None the output sample rate.
+        :param EmitterTrajectory trajectory: Emitter motion, if None the emitters are static at Emitter.position.
+        :param float reference_distance: Distance at which the emitter amplitude is specified.
+        """
+        self.emitters = emitters
+        self.microphone_array = microphone_array
+        self.sample_rate = float(sample_rate)
+        self.speed_of_sound = speed_of_sound
+        self.trajectory = trajectory
+        self.reference_distance = reference_distance
+
+        self.arrays = emitter_arrays(emitters, speed_of_sound, phase_offsets)
+        self.frequency = self.arrays['wave_number'] * speed_of_sound / (2*np.pi)
+        self.microphone_positions = microphone_positions(microphone_array)
+        self.microphone_attitudes = microphone_attitudes(microphone_array)
+        self.microphone_patterns = [microphone.antenna_pattern for microphone in microphone_array.microphones]
+        self.source_signals = None if source_signals is None else np.asarray(source_signals, dtype=np.float64)
+        self.source_sample_rate = self.sample_rate if source_sample_rate is None else float(source_sample_rate)
+
+        self._tone_phasors = None
+        if trajectory is None:
+            self._static_vector = self.microphone_positions[np.newaxis, :, :] - self.arrays['position'][:, np.newaxis, :]
+            self._static_distance = np.sqrt(np.sum(self._static_vector**2, axis=-1))
+            if self.source_signals is None:
+                self._tone_phasors = self._static_tone_phasors()
+
+    def _static_tone_phasors(self):
+        # Static tone sources: each microphone receives Re(C_fm * exp(i*2*pi*f*t)) per distinct frequency f, so the
+        # emitters are summed once here rather than at every sample
+        distance = np.maximum(self._static_distance, MIN_DISTANCE)
+        column = (slice(None), np.newaxis)
+        gain = self.arrays['amplitude'][column] * self.reference_distance / distance * \
+            np.exp(-self.arrays['alpha'][column] * distance) * self.directivity(self._static_vector)
+        phase = -self.arrays['phase'][column] - self.arrays['wave_number'][column] * distance
+        frequencies, emitter_frequency = np.unique(self.frequency, return_inverse=True)
+        phasors = np.zeros((len(frequencies), self.num_microphones), dtype=np.complex128)
+        np.add.at(phasors, emitter_frequency, gain * np.exp(1j * phase))
+        return frequencies, phasors
+
+    @property
+    def num_microphones(self):
+        return len(self.microphone_positions)
+
+    def directivity(self, vector):
+        """
+        Combined emitter and microphone pattern gain of each emitter/microphone pair.
+
+        :param np.ndarray vector: Inertial vectors from each emitter to each microphone, shape [E, M, ..., 3].
+        :return: Gains of shape [E, M, ...], or 1 if every element is omnidirectional.
+        """
+        gain = element_gains(self.arrays['pattern'], self.arrays['attitude'], vector[..., 0], vector[..., 1],
+                             vector[..., 2])
+        gain = 1.0 if gain is None else gain
+        mic_vector = -np.swapaxes(vector, 0, 1)
+        mic_gain = element_gains(self.microphone_patterns, self.microphone_attitudes, mic_vector[..., 0],
+                                 mic_vector[..., 1], mic_vector[..., 2])
+        if mic_gain is not None:
+            gain = gain * np.swapaxes(mic_gain, 0, 1)
+        return gain
+
+    def emission_geometry(self, time):
+        """
+        Retarded time of every emitter/microphone pair, and the vector from the emitter (at the retarded time) to the
+        microphone.
+
+        :param np.ndarray time: Reception times of shape [B].
+        :return: (emission times [E, M, B], distances [E, M, B], vectors [E, M, B, 3] or [E, M, 1, 3] if static)
+        """
+        time = np.asarray(time, dtype=np.float64)
+        mic = self.microphone_positions[np.newaxis, :, np.newaxis, :]
+        if self.trajectory is None:
+            distance = np.broadcast_to(self._static_distance[:, :, np.newaxis],
+                                       self._static_distance.shape + time.shape)
+            return time - distance / self.speed_of_sound, distance, self._static_vector[:, :, np.newaxis, :]
+
+        num_emitters = len(self.arrays['position'])
+        tau = np.broadcast_to(time, (num_emitters, self.num_microphones) + time.shape).copy()
+        for _ in range(MAX_RETARDED_TIME_ITERATIONS):
+            distance = _distance(self.trajectory(tau), mic)
+            new_tau = time - distance / self.speed_of_sound
+            converged = np.max(np.abs(new_tau - tau)) <= RETARDED_TIME_TOLERANCE
+            tau = new_tau
+            if converged:
+                break
+        vector = mic - self.trajectory(tau)
+        return tau, np.sqrt(np.sum(vector**2, axis=-1)), vector
+
+    def emission_time(self, time):
+        """
+        Retarded time of every emitter/microphone pair.
+
+        :param np.ndarray time: Reception times of shape [B].
+        :return: (emission times, distances) of shape [E, M, B].
+        """
+        tau, distance, _ = self.emission_geometry(time)
+        return tau, distance
+
+    def source(self, emission_time):
+        """
+        :param np.ndarray emission_time: Times of shape [E, ...].
+        :return: Source signal of each emitter at the emission times.
+        """
+        emitter_shape = (-1,) + (1,) * (emission_time.ndim - 1)
+        if self.source_signals is None:
+            phase = self.frequency.reshape(emitter_shape) * emission_time - \
+                self.arrays['phase'].reshape(emitter_shape) / (2*np.pi)
+            return np.cos(2*np.pi * (phase - np.floor(phase)))
+
+        num_samples = self.source_signals.shape[1]
+        position = emission_time * self.source_sample_rate
+        lower = np.floor(position).astype(np.int64)
+        fraction = position - lower
+        valid_lower = (lower >= 0) & (lower < num_samples)
+        valid_upper = (lower + 1 >= 0) & (lower + 1 < num_samples)
+        flat = self.source_signals.ravel()
+        offset = (np.arange(len(self.source_signals)) * num_samples).reshape(emitter_shape)
+        lower_val = np.where(valid_lower, flat[offset + np.clip(lower, 0, num_samples - 1)], 0.0)
+        upper_val = np.where(valid_upper, flat[offset + np.clip(lower + 1, 0, num_samples - 1)], 0.0)
+        return lower_val * (1 - fraction) + upper_val * fraction
+
+    def received(self, time):
+        """
+        Signal at every microphone.
+
+        :param np.ndarray time: Reception times of shape [B].
+        :return: np.ndarray of shape [M, B].
+        """
+        if self._tone_phasors is not None:
+            frequencies, phasors = self._tone_phasors
+            cycles = frequencies[:, np.newaxis] * np.asarray(time, dtype=np.float64)[np.newaxis, :]
+            carrier = np.exp(2j*np.pi * (cycles - np.floor(cycles)))
+            return (phasors.T @ carrier).real
+
+        tau, distance, vector = self.emission_geometry(time)
+        column = (slice(None), np.newaxis, np.newaxis)
+        distance = np.maximum(distance, MIN_DISTANCE)
+        gain = self.arrays['amplitude'][column] * self.reference_distance / distance * \
+            np.exp(-self.arrays['alpha'][column] * distance) * self.directivity(vector)
+        return np.einsum('emb,emb->mb', gain, self.source(tau))
+
+    def blocks(self, duration, block_size=4096, start_time=0.0):
+        """
+        Generator over the received signals in blocks.
+
+        :param float duration: Length of the recording [s].
+        :param int block_size: Samples per block, memory use is ~ E * M * block_size * 64 bytes.
+        :param float start_time: Reception time of the first sample.
+        :return: Yields (time [B], signals [M, B]), the last block may be shorter.
+        """
+        num_samples = int(round(duration * self.sample_rate))
+        for start in range(0, num_samples, block_size):
+            time = start_time + np.arange(start, min(start + block_size, num_samples)) / self.sample_rate
+            yield time, self.received(time)
+
+    def render(self, duration, block_size=4096, start_time=0.0, out=None, dtype=np.float64):
+        """
+        Render a whole recording, block by block.
+
+        :param np.ndarray out: Array of shape [M, num_samples] to write into, e.g. a np.memmap for long recordings.
+        :return: np.ndarray of shape [M, num_samples].
+        """
+        num_samples = int(round(duration * self.sample_rate))
+        if out is None:
+            out = np.empty((self.num_microphones, num_samples), dtype=dtype)
+        start = 0
+        for time, block in self.blocks(duration, block_size=block_size, start_time=start_time):
+            out[:, start:start + len(time)] = block
+            start += len(time)
+        return out
+
+
+def microphone_positions(microphone_array):
+    """
+    :param CompositeMicrophoneArray microphone_array: Microphones.
+    :return: Microphone positions of shape [M, 3].
+    """
+    return microphone_array.positions
+
+
+def microphone_attitudes(microphone_array):
+    """
+    :param CompositeMicrophoneArray microphone_array: Microphones.
+    :return: Microphone (roll, pitch, yaw) of shape [M, 3].
+    """
+    attitudes = np.zeros((len(microphone_array.microphones), 3))
+    for ind, microphone in enumerate(microphone_array.microphones):
+        if microphone.attitude is not None:
+            attitude = np.ravel(microphone.attitude)[:3]
+            attitudes[ind, :len(attitude)] = attitude
+    return attitudes
+
+
+def _distance(a, b):
+    return np.sqrt(np.sum((a - b)**2, axis=-1))
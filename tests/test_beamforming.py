@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from acoustics.beamforming import Beamformer, look_directions
+from acoustics.emit_receive import CompositeMicrophoneArray, Microphone
+
+SAMPLE_RATE = 48E3
+SPEED_OF_SOUND = 337
+AZIMUTH = np.radians(np.arange(-180, 180, 5.0))
+ELEVATION = np.radians(np.arange(0, 90.5, 10.0))
+
+
+def spiral_array(num_microphones=24, radius=0.3):
+    idx = np.arange(num_microphones) + 0.5
+    r = radius * np.sqrt(idx / num_microphones)
+    theta = np.pi * (1 + 5**0.5) * idx
+    return CompositeMicrophoneArray([Microphone(np.array([r[ind] * np.cos(theta[ind]), r[ind] * np.sin(theta[ind]),
+                                                          0.0]), np.zeros(3), None)
+                                     for ind in range(num_microphones)])
+
+
+def plane_wave(positions, direction, num_samples=4096, seed=0):
+    """
+    White noise arriving from direction (pointing from the array to the source), each channel advanced by the
+    extra distance the wave travels to the array center, applied as a phase ramp.
+    """
+    source = np.random.default_rng(seed).standard_normal(num_samples)
+    advance = (positions - positions.mean(axis=0)) @ direction / SPEED_OF_SOUND
+    freqs = np.fft.rfftfreq(num_samples, d=1.0 / SAMPLE_RATE)
+    spectra = np.fft.rfft(source) * np.exp(2j*np.pi * freqs * advance[:, np.newaxis])
+    return np.fft.irfft(spectra, n=num_samples, axis=1)
+
+
+@pytest.mark.parametrize('method, options', [('frequency', {'f_min': 500, 'f_max': 8000}),
+                                             ('csm', {'segment_length': 512, 'f_min': 500, 'f_max': 8000}),
+                                             ('delay_and_sum', {})])
+def test_peak_at_plane_wave_direction(method, options):
+    mic_array = spiral_array()
+    beamformer = mic_array.beamformer(SAMPLE_RATE, directions=look_directions(AZIMUTH, ELEVATION),
+                                      speed_of_sound=SPEED_OF_SOUND)
+    source = look_directions(np.radians([30.0]), np.radians([40.0]))[0]
+    power = beamformer.steered_response(plane_wave(mic_array.positions, source), method=method, **options)
+    np.testing.assert_allclose(beamformer.directions[np.argmax(power)], source, atol=1E-12)
+
+
+def test_segment_power_matches_csm_power():
+    mic_array = spiral_array()
+    beamformer = Beamformer(mic_array, SAMPLE_RATE, directions=look_directions(AZIMUTH, ELEVATION),
+                            speed_of_sound=SPEED_OF_SOUND, dtype=np.complex128)
+    signals = np.random.default_rng(1).standard_normal((len(mic_array.microphones), 2048))
+    freqs, spectra = beamformer.segment_spectra(signals, segment_length=512)
+    _, csm = beamformer.cross_spectral_matrix(signals, segment_length=512)
+    for remove_diagonal in (False, True):
+        np.testing.assert_allclose(beamformer.segment_power(freqs, spectra, remove_diagonal=remove_diagonal),
+                                   beamformer.csm_power(freqs, csm, remove_diagonal=remove_diagonal), rtol=1E-9)
+
+
+def test_update_geometry_after_moving_microphones():
+    mic_array = spiral_array()
+    beamformer = mic_array.beamformer(SAMPLE_RATE, directions=look_directions(AZIMUTH, ELEVATION),
+                                      speed_of_sound=SPEED_OF_SOUND)
+    source = look_directions(np.radians([30.0]), np.radians([40.0]))[0]
+    beamformer.frequency_domain(plane_wave(mic_array.positions, source), f_min=500, f_max=8000)
+
+    # Rotate the array by 90 degrees about z, the recomputed delays keep the peak on the source
+    for microphone in mic_array.microphones:
+        microphone.position = np.array([microphone.position[1], -microphone.position[0], 0.0])
+    beamformer.update_geometry()
+    power = beamformer.frequency_domain(plane_wave(mic_array.positions, source), f_min=500, f_max=8000)
+    np.testing.assert_allclose(beamformer.directions[np.argmax(power)], source, atol=1E-12)
+    np.testing.assert_allclose(beamformer.delays, beamformer.steering_delays())
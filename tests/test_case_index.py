@@ -0,0 +1,68 @@
+import os
+
+from utilities.case_index import CaseIndex
+
+
+def make_case(case):
+    for name in ('system', 'constant', '0', '0.5', '100', '1e-05', 'processor0/0', 'processor1/constant',
+                 'postProcessing/forceCoeffs/0'):
+        os.makedirs(case / name)
+    (case / 'postProcessing' / 'forceCoeffs' / '0' / 'forceCoeffs.dat').write_text('# Time Cd\n')
+    (case / 'processor0' / 'forceCoeffs.dat').write_text('# Time Cd\n')
+
+
+def relative(index):
+    return {str(path.relative_to(index.top_directory)) for path in index.directories()}
+
+
+def touch_directory(path):
+    # Coarse file system timestamps may not show the change
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+
+def test_prunes_time_and_processor_directories(tmp_path):
+    make_case(tmp_path / '5' / 'case_a')
+    os.makedirs(tmp_path / 'results' / '12' / '3.5')
+
+    index = CaseIndex(tmp_path)
+    directories = relative(index)
+    assert os.path.join('5', 'case_a') in directories
+    assert os.path.join('5', 'case_a', 'system') in directories
+    assert os.path.join('5', 'case_a', 'postProcessing', 'forceCoeffs', '0') in directories
+    for pruned in ('0', '0.5', '100', '1e-05', 'processor0', 'processor1'):
+        assert os.path.join('5', 'case_a', pruned) not in directories
+    # Numerically named directories outside of a case are kept
+    assert os.path.join('results', '12', '3.5') in directories
+
+    dat_files = index.find_files(tmp_path / '5' / 'case_a', 'dat')
+    assert dat_files == [tmp_path / '5' / 'case_a' / 'postProcessing' / 'forceCoeffs' / '0' / 'forceCoeffs.dat']
+    assert index.find_directory('case_') == [tmp_path / '5' / 'case_a']
+
+    unpruned = relative(CaseIndex(tmp_path, prune_processor=False, prune_time=False))
+    assert os.path.join('5', 'case_a', 'processor0', '0') in unpruned
+    assert os.path.join('5', 'case_a', '1e-05') in unpruned
+
+
+def test_refresh_after_directory_change(tmp_path):
+    make_case(tmp_path / '5' / 'case_a')
+    index_path = str(tmp_path / 'index.json')
+    index = CaseIndex(tmp_path / '5', index_path=index_path)
+    assert index.refresh() == 0
+
+    make_case(tmp_path / '5' / 'case_b')
+    os.makedirs(tmp_path / '5' / 'case_a' / '200')
+    touch_directory(tmp_path / '5')
+    touch_directory(tmp_path / '5' / 'case_a')
+
+    # A persisted index is loaded and refreshed, only re-listing the changed directories
+    index = CaseIndex(tmp_path / '5', index_path=index_path)
+    directories = relative(index)
+    assert os.path.join('case_b', 'postProcessing', 'forceCoeffs', '0') in directories
+    assert os.path.join('case_a', '200') not in directories
+    assert index.refresh() == 0
+
+    os.rename(tmp_path / '5' / 'case_b', tmp_path / '5' / 'case_c')
+    touch_directory(tmp_path / '5')
+    assert index.refresh() == 1
+    assert index.find_directory('case_') == [tmp_path / '5' / 'case_a', tmp_path / '5' / 'case_c']
@@ -0,0 +1,51 @@
+import numpy as np
+
+from utilities.coordinate_systems import euler_to_dcm
+from vehicles.component_store import ComponentStore
+
+
+def brute_force(masses, positions, angles, inertias):
+    """
+    :return: (mass, first moment, inertia about the body origin) summed one row at a time.
+    """
+    inertia = np.zeros((3, 3))
+    for mass, position, angle, inertia_0 in zip(masses, positions, angles, inertias):
+        rotation = euler_to_dcm(angle)
+        inertia += rotation.T @ inertia_0 @ rotation + mass * (np.dot(position, position) * np.eye(3) -
+                                                              np.outer(position, position))
+    return np.sum(masses), np.sum(masses[:, np.newaxis] * positions, axis=0), inertia
+
+
+def random_rows(num, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0.1, 5.0, num), rng.normal(0.0, 1.0, (num, 3)), rng.uniform(-1.0, 1.0, (num, 3)),
+            np.array([np.diag(rng.uniform(0.01, 0.5, 3)) for _ in range(num)]))
+
+
+def assert_totals(contribution, reference):
+    np.testing.assert_allclose(contribution[0], reference[0], rtol=1E-12)
+    np.testing.assert_allclose(contribution[1], reference[1], atol=1E-12)
+    np.testing.assert_allclose(contribution[2], reference[2], atol=1E-12)
+
+
+def test_component_store_totals():
+    masses, positions, angles, inertias = random_rows(20)
+    store = ComponentStore(capacity=4)
+    handles = [store.add(m, p, a, i) for m, p, a, i in zip(masses, positions, angles, inertias)]
+    assert_totals(store.mass_contribution(), brute_force(masses, positions, angles, inertias))
+
+    # Incremental updates of a few rows, then removal of one
+    handles[3].set_mass(2.0)
+    inertias[3] *= 2.0 / masses[3]
+    masses[3] = 2.0
+    handles[7].position = (0.5, -0.2, 0.1)
+    positions[7] = (0.5, -0.2, 0.1)
+    handles[11].angle = (0.2, 0.0, -0.4)
+    angles[11] = (0.2, 0.0, -0.4)
+    assert_totals(store.mass_contribution(), brute_force(masses, positions, angles, inertias))
+
+    store.remove(handles[5])
+    keep = np.arange(20) != 5
+    reference = brute_force(masses[keep], positions[keep], angles[keep], inertias[keep])
+    assert_totals(store.mass_contribution(), reference)
+    np.testing.assert_allclose(np.sum(store.inertia, axis=0), reference[2], atol=1E-12)
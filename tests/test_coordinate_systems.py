@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from utilities.coordinate_systems import (dcm_to_euler, dcm_to_quaternion, euler_to_dcm, euler_to_quaternion,
+                                          quaternion_to_dcm, quaternion_to_euler)
+
+
+def random_euler(num, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack((rng.uniform(-np.pi, np.pi, num), rng.uniform(-1.5, 1.5, num),
+                            rng.uniform(-np.pi, np.pi, num)))
+
+
+def axis_angle_quaternion(axis, angle):
+    axis = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    return np.concatenate(([np.cos(angle / 2)], np.sin(angle / 2) * axis))
+
+
+def same_rotation(p, q):
+    # q and -q are the same rotation
+    return np.allclose(np.abs(np.sum(p * q, axis=-1)), 1.0, atol=1E-12)
+
+
+def test_euler_quaternion_round_trip():
+    euler = random_euler(200)
+    np.testing.assert_allclose(quaternion_to_euler(euler_to_quaternion(euler)), euler, atol=1E-10)
+
+
+def test_euler_dcm_round_trip():
+    euler = random_euler(200)
+    np.testing.assert_allclose(dcm_to_euler(euler_to_dcm(euler)), euler, atol=1E-10)
+
+
+def test_quaternion_dcm_agree_with_euler():
+    euler = random_euler(200)
+    quaternion = euler_to_quaternion(euler)
+    np.testing.assert_allclose(quaternion_to_dcm(quaternion), euler_to_dcm(euler), atol=1E-12)
+    assert same_rotation(dcm_to_quaternion(euler_to_dcm(euler)), quaternion)
+
+
+@pytest.mark.parametrize('axis, angle, branch', [((1, 2, 3), 0.3, 0),
+                                                 ((1, 0.1, -0.2), 3.0, 1),
+                                                 ((0.2, -1, 0.1), 3.0, 2),
+                                                 ((-0.1, 0.2, 1), 3.0, 3)])
+def test_dcm_to_quaternion_shepperd_branches(axis, angle, branch):
+    quaternion = axis_angle_quaternion(axis, angle)
+    dcm = quaternion_to_dcm(quaternion)
+    # Shepperd's method picks the largest of the trace and the diagonal
+    assert np.argmax([np.trace(dcm), dcm[0, 0], dcm[1, 1], dcm[2, 2]]) == branch
+
+    result = dcm_to_quaternion(dcm)
+    assert result[0] >= 0
+    np.testing.assert_allclose(result, np.sign(quaternion[0]) * quaternion, atol=1E-12)
+    np.testing.assert_allclose(quaternion_to_dcm(result), dcm, atol=1E-12)
+
+
+def test_dcm_to_quaternion_mixed_branches_batch():
+    quaternion = np.array([axis_angle_quaternion(*case) for case in
+                           [((1, 2, 3), 0.3), ((1, 0.1, -0.2), 3.0), ((0.2, -1, 0.1), 3.0), ((-0.1, 0.2, 1), 3.0),
+                            ((1, 0, 0), np.pi), ((0, 1, 0), np.pi), ((0, 0, 1), np.pi)]])
+    result = dcm_to_quaternion(quaternion_to_dcm(quaternion))
+    assert same_rotation(result, quaternion)
+    np.testing.assert_allclose(np.linalg.norm(result, axis=-1), 1.0)
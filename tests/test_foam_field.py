@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from utilities.foam_field import read_field_file
+from utilities.open_foam_utils import load_from_directory, read_field
+
+HEADER = '''FoamFile
+{
+    version     2.0;
+    format      %s;
+    arch        "LSB;label=32;scalar=64";
+    class       %s;
+    object      %s;
+}
+dimensions      [0 2 -2 0 0 0 0];
+
+'''
+
+
+def write_ascii(path, values, name='p'):
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        body = '\n'.join('%r' % float(value) for value in values)
+        field_class, value_type = 'volScalarField', 'scalar'
+    else:
+        body = '\n'.join('(%s)' % ' '.join('%r' % float(value) for value in row) for row in values)
+        field_class, value_type = 'volVectorField', 'vector'
+    path.write_text(HEADER % ('ascii', field_class, name) +
+                    'internalField   nonuniform List<%s>\n%d\n(\n%s\n)\n;\n' % (value_type, len(values), body))
+
+
+def write_binary(path, values, name='p'):
+    values = np.asarray(values, dtype='<f8')
+    field_class, value_type = ('volScalarField', 'scalar') if values.ndim == 1 else ('volVectorField', 'vector')
+    path.write_bytes((HEADER % ('binary', field_class, name) +
+                      'internalField   nonuniform List<%s> %d(' % (value_type, len(values))).encode() +
+                     values.tobytes() + b')\n;\n')
+
+
+def write_uniform(path, value, name='p'):
+    field_class = 'volScalarField' if np.ndim(value) == 0 else 'volVectorField'
+    text = '%r' % value if np.ndim(value) == 0 else '(%s)' % ' '.join('%r' % v for v in value)
+    path.write_text(HEADER % ('ascii', field_class, name) + 'internalField   uniform %s;\n' % text)
+
+
+@pytest.mark.parametrize('writer', [write_ascii, write_binary])
+def test_read_nonuniform(tmp_path, writer):
+    rng = np.random.default_rng(0)
+    scalars = rng.normal(size=7)
+    vectors = rng.normal(size=(7, 3))
+    writer(tmp_path / 'p', scalars)
+    writer(tmp_path / 'U', vectors, name='U')
+
+    np.testing.assert_array_equal(read_field_file(tmp_path / 'p'), scalars)
+    np.testing.assert_array_equal(read_field_file(tmp_path / 'U'), vectors)
+    cells = [5, 0, 2]
+    np.testing.assert_array_equal(read_field_file(tmp_path / 'p', cells=cells), scalars[cells])
+    np.testing.assert_array_equal(read_field_file(tmp_path / 'U', cells=cells), vectors[cells])
+    mask = scalars > 0
+    np.testing.assert_array_equal(read_field(tmp_path / 'p', cells=mask, cache_dir=str(tmp_path / 'cache')),
+                                  scalars[mask])
+
+
+def test_read_uniform(tmp_path):
+    write_uniform(tmp_path / 'p', 101325.0)
+    write_uniform(tmp_path / 'U', (10.0, 0.0, 1.0), name='U')
+
+    np.testing.assert_array_equal(read_field_file(tmp_path / 'p', size=4), np.full(4, 101325.0))
+    np.testing.assert_array_equal(read_field_file(tmp_path / 'U', size=4), np.tile([10.0, 0.0, 1.0], (4, 1)))
+    np.testing.assert_array_equal(read_field_file(tmp_path / 'p', cells=[1, 3]), np.full(2, 101325.0))
+    np.testing.assert_array_equal(read_field(tmp_path / 'p', cells=[1, 3]), np.full(2, 101325.0))
+    np.testing.assert_array_equal(read_field(tmp_path / 'p', cells=[True, False, True], size=3),
+                                  np.full(2, 101325.0))
+    with pytest.raises(ValueError, match='size'):
+        read_field_file(tmp_path / 'p')
+    with pytest.raises(ValueError, match='size'):
+        read_field(tmp_path / 'p')
+
+
+def test_load_from_directory_uniform_first_time(tmp_path):
+    values = np.arange(5.0)
+    for name in ('0', '1', '2'):
+        (tmp_path / name).mkdir()
+    write_uniform(tmp_path / '0' / 'p', 0.0)
+    write_uniform(tmp_path / '1' / 'p', 3.0)
+    write_ascii(tmp_path / '2' / 'p', values)
+
+    data = load_from_directory('p', str(tmp_path), grid_size=5, skip_zero=False, cache_dir=str(tmp_path / 'cache'))
+    np.testing.assert_array_equal(data, [np.zeros(5), np.full(5, 3.0), values])
+    data = load_from_directory('p', str(tmp_path), skip_zero=False, cells=[4, 1], cache_dir=str(tmp_path / 'cache'))
+    np.testing.assert_array_equal(data, [[0.0, 0.0], [3.0, 3.0], [4.0, 1.0]])
+    with pytest.raises(ValueError, match='size'):
+        load_from_directory('p', str(tmp_path), skip_zero=False, use_cache=False)
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+
+import numpy as np
+import pytest
+
+from utilities.open_foam_utils import ForceCoeffFollower, load_force_coeff
+
+HEADER = '# Time Cm Cd Cl Cl(f) Cl(r)\n'
+
+
+def rows(times, scale=1.0):
+    # Signed fixed width values, so a rewrite with another scale has the same size
+    return ''.join('%.6f %+.6f %+.6f %+.6f %+.6f %+.6f\n' % (t, scale * np.sin(t), scale * 0.1 * t,
+                                                             scale * np.cos(t), 0.5, 0.25) for t in times)
+
+
+def write(path, text, mode='w'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, mode) as dat_file:
+        dat_file.write(text)
+
+
+def assert_matches_load(follower, directory, window):
+    reference = load_force_coeff(str(directory), logging.getLogger(), use_cache=False)
+    stats = follower.stats
+    assert follower.count == reference.size
+    assert follower.last_time == reference['time'][-1]
+    for name in ('Cm', 'Cd', 'Cl'):
+        assert stats[name]['average'] == pytest.approx(np.mean(reference[name]), abs=1E-12)
+        assert stats[name]['stdev'] == pytest.approx(np.std(reference[name]), abs=1E-12)
+        assert stats[name]['min'] == np.min(reference[name])
+        assert stats[name]['max'] == np.max(reference[name])
+        assert follower.moving_average[name] == pytest.approx(np.mean(reference[name][-window:]), abs=1E-12)
+
+
+def test_append(tmp_path):
+    dat = tmp_path / '0' / 'forceCoeffs.dat'
+    write(dat, HEADER + rows(np.arange(1, 11)))
+    follower = ForceCoeffFollower(str(tmp_path), averaging_window=4)
+    assert follower.poll().size == 10
+    assert follower.poll().size == 0
+
+    # A partly written line is left for the next poll
+    text = rows(np.arange(11, 14))
+    write(dat, text[:-8], mode='a')
+    np.testing.assert_array_equal(follower.poll()['time'], [11, 12])
+    write(dat, text[-8:], mode='a')
+    np.testing.assert_array_equal(follower.poll()['time'], [13])
+    assert_matches_load(follower, tmp_path, 4)
+
+
+def test_restart_directory_going_back_in_time(tmp_path):
+    write(tmp_path / '0' / 'forceCoeffs.dat', HEADER + rows(np.arange(1, 11)))
+    follower = ForceCoeffFollower(str(tmp_path), averaging_window=4)
+    follower.poll()
+
+    # Restarted from time 5, rewriting times 6 to 10 with new values
+    write(tmp_path / '5' / 'forceCoeffs.dat', HEADER + rows(np.arange(6, 14), scale=2.0))
+    assert follower.poll().size == 13
+    assert_matches_load(follower, tmp_path, 4)
+    assert follower.stats['Cl']['max'] == pytest.approx(2 * np.max(np.cos(np.arange(6, 14))), abs=1E-6)
+
+
+def test_truncated_file(tmp_path):
+    dat = tmp_path / '0' / 'forceCoeffs.dat'
+    write(dat, HEADER + rows(np.arange(1, 21)))
+    follower = ForceCoeffFollower(str(tmp_path), averaging_window=4)
+    follower.poll()
+
+    write(dat, HEADER + rows(np.arange(1, 6), scale=3.0))
+    assert follower.poll().size == 5
+    assert_matches_load(follower, tmp_path, 4)
+
+
+def test_same_size_rewrite(tmp_path):
+    dat = tmp_path / '0' / 'forceCoeffs.dat'
+    write(dat, HEADER + rows(np.arange(1, 11)))
+    follower = ForceCoeffFollower(str(tmp_path), averaging_window=4)
+    follower.poll()
+    size = os.path.getsize(dat)
+
+    rewritten = HEADER + rows(np.arange(1, 11), scale=-1.0)
+    assert len(rewritten) == size
+    write(dat, rewritten)
+    # Coarse file system timestamps may not tell the two writes apart
+    os.utime(dat, ns=(os.stat(dat).st_atime_ns, os.stat(dat).st_mtime_ns + 1))
+    assert follower.poll().size == 10
+    assert_matches_load(follower, tmp_path, 4)
+
+
+def test_afollow(tmp_path):
+    dat = tmp_path / '0' / 'forceCoeffs.dat'
+    write(dat, HEADER + rows(np.arange(1, 6)))
+    follower = ForceCoeffFollower(str(tmp_path), averaging_window=4)
+
+    async def collect():
+        blocks = list()
+        async for block in follower.afollow(interval=0.01, timeout=0.2):
+            blocks.append(block['time'])
+            if len(blocks) == 1:
+                write(dat, rows(np.arange(6, 9)), mode='a')
+        return blocks
+
+    blocks = asyncio.run(collect())
+    assert [list(block) for block in blocks] == [[1, 2, 3, 4, 5], [6, 7, 8]]
+    assert_matches_load(follower, tmp_path, 4)
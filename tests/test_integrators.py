@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from simulation.integrators import DormandPrince, integrate
+from simulation.rigid_body import ANGULAR_RATE, QUATERNION, normalize_quaternion, rigid_body_derivative
+from utilities.coordinate_systems import quaternion_rotate
+
+# Axisymmetric body spinning about its x axis with a transverse rate, torque free
+INERTIA = np.diag([0.2, 1.0, 1.0])
+SPIN = 10.0
+TRANSVERSE = 0.5
+END_TIME = 2.0
+
+
+def spin_derivative(t, state):
+    return rigid_body_derivative(state, np.zeros(3), np.zeros(3), 1.0, INERTIA, gravity=np.zeros(3))
+
+
+def initial_state(transverse=TRANSVERSE):
+    state = np.zeros(13)
+    state[QUATERNION] = (1.0, 0.0, 0.0, 0.0)
+    state[ANGULAR_RATE] = (SPIN, transverse, 0.0)
+    return state
+
+
+def analytic_rates(t, transverse=TRANSVERSE):
+    # Euler's equations: the transverse rate rotates at (Ix - It) / It * p in the body frame
+    frequency = (INERTIA[0, 0] - INERTIA[1, 1]) / INERTIA[1, 1] * SPIN
+    return np.column_stack((np.full(len(t), SPIN), transverse * np.cos(frequency * t),
+                            transverse * np.sin(frequency * t)))
+
+
+@pytest.mark.parametrize('method, options', [('rk4', {'dt': 1E-3}), ('dopri5', {'rtol': 1E-10, 'atol': 1E-12})])
+def test_torque_free_spin_body_rates(method, options):
+    times, states = integrate(spin_derivative, (0.0, END_TIME), initial_state(), method=method,
+                              projection=normalize_quaternion, **options)
+    assert times[-1] == END_TIME
+    np.testing.assert_allclose(states[:, ANGULAR_RATE], analytic_rates(times), atol=1E-7)
+
+    # The inertial angular momentum of a torque free body is constant
+    momentum = quaternion_rotate(states[:, QUATERNION], states[:, ANGULAR_RATE] @ INERTIA)
+    np.testing.assert_allclose(momentum, momentum[0] + np.zeros_like(momentum), atol=1E-7)
+
+
+@pytest.mark.parametrize('method, options', [('rk4', {'dt': 1E-3}), ('dopri5', {'rtol': 1E-10, 'atol': 1E-12})])
+def test_pure_spin_attitude(method, options):
+    times, states = integrate(spin_derivative, (0.0, END_TIME), initial_state(transverse=0.0), method=method,
+                              projection=normalize_quaternion, **options)
+    angle = SPIN * times
+    expected = np.column_stack((np.cos(angle / 2), np.sin(angle / 2), np.zeros_like(angle), np.zeros_like(angle)))
+    np.testing.assert_allclose(states[:, QUATERNION], expected, atol=1E-8)
+
+
+def test_dopri5_reuses_final_stage_through_projection():
+    stepper = DormandPrince(rtol=1E-8, atol=1E-10, projection=normalize_quaternion)
+    t, state = 0.0, initial_state()
+    t, state = stepper.step(spin_derivative, t, state)
+    assert stepper.num_evaluations == 7
+    for _ in range(5):
+        t, state = stepper.step(spin_derivative, t, state)
+    assert stepper.num_evaluations == 7 + 5 * 6
+
+    stepper.reset()
+    t, state = stepper.step(spin_derivative, t, state)
+    assert stepper.num_evaluations == 7 + 5 * 6 + 7
+
+    # A projection well beyond the tolerance leaves the final stage stale
+    def double_quaternion(state):
+        state[QUATERNION] *= 2
+
+    stepper = DormandPrince(rtol=1E-8, atol=1E-10, projection=double_quaternion)
+    t, state = stepper.step(spin_derivative, 0.0, initial_state())
+    stepper.step(spin_derivative, t, state)
+    assert stepper.num_evaluations == 14
@@ -0,0 +1,82 @@
+import numpy as np
+
+from utilities.coordinate_systems import euler_to_dcm
+from vehicles.component_store import ComponentStore
+from vehicles.mass_properties import MassProperties
+
+
+class PointComponent(object):
+    def __init__(self, mass, position, angle, inertia_0):
+        self.mass = mass
+        self.position = np.asarray(position, dtype=np.float64)
+        self.angle = np.asarray(angle, dtype=np.float64)
+        self.inertia_0 = np.asarray(inertia_0, dtype=np.float64)
+
+    def mass_contribution(self):
+        mass, first_moment, inertia = brute_force([self.mass], [self.position], [self.angle], [self.inertia_0])
+        return mass, first_moment, inertia
+
+
+def brute_force(masses, positions, angles, inertias):
+    """
+    :return: (mass, first moment, inertia about the body origin) summed one component at a time.
+    """
+    total_mass = 0.0
+    first_moment = np.zeros(3)
+    inertia = np.zeros((3, 3))
+    for mass, position, angle, inertia_0 in zip(masses, positions, angles, inertias):
+        rotation = euler_to_dcm(angle)
+        total_mass += mass
+        first_moment += mass * np.asarray(position)
+        inertia += rotation.T @ inertia_0 @ rotation
+        for i in range(3):
+            for j in range(3):
+                inertia[i, j] += mass * ((i == j) * np.dot(position, position) - position[i] * position[j])
+    return total_mass, first_moment, inertia
+
+
+def random_components(num, seed=0):
+    rng = np.random.default_rng(seed)
+    masses = rng.uniform(0.1, 5.0, num)
+    positions = rng.normal(0.0, 1.0, (num, 3))
+    angles = rng.uniform(-1.0, 1.0, (num, 3))
+    inertias = np.array([np.diag(rng.uniform(0.01, 0.5, 3)) for _ in range(num)])
+    return masses, positions, angles, inertias
+
+
+def assert_totals(contribution, reference):
+    np.testing.assert_allclose(contribution[0], reference[0], rtol=1E-12)
+    np.testing.assert_allclose(contribution[1], reference[1], atol=1E-12)
+    np.testing.assert_allclose(contribution[2], reference[2], atol=1E-12)
+
+
+def test_mass_properties_totals():
+    masses, positions, angles, inertias = random_components(12, seed=1)
+    components = [PointComponent(m, p, a, i) for m, p, a, i in zip(masses[:6], positions[:6], angles[:6],
+                                                                   inertias[:6])]
+    store = ComponentStore()
+    store.add_many(masses[6:], positions[6:], angles[6:], inertias[6:])
+
+    properties = MassProperties()
+    for component in components + [store]:
+        properties.add(component)
+    mass, first_moment, inertia_origin = brute_force(masses, positions, angles, inertias)
+    center_of_mass = first_moment / mass
+    inertia = inertia_origin - mass * (center_of_mass.dot(center_of_mass) * np.eye(3) -
+                                       np.outer(center_of_mass, center_of_mass))
+
+    np.testing.assert_allclose(properties.mass, mass, rtol=1E-12)
+    np.testing.assert_allclose(properties.center_of_mass, center_of_mass, atol=1E-12)
+    np.testing.assert_allclose(properties.inertia_origin, inertia_origin, atol=1E-12)
+    np.testing.assert_allclose(properties.inertia, inertia, atol=1E-12)
+    np.testing.assert_allclose(properties.inv_inertia @ inertia, np.eye(3), atol=1E-10)
+
+    # Changing and removing contributors only re-aggregates those
+    components[0].mass = 3.0
+    masses[0] = 3.0
+    properties.mark_dirty(components[0])
+    properties.remove(components[1])
+    keep = np.arange(12) != 1
+    reference = brute_force(masses[keep], positions[keep], angles[keep], inertias[keep])
+    np.testing.assert_allclose(properties.mass, reference[0], rtol=1E-12)
+    np.testing.assert_allclose(properties.inertia_origin, reference[2], atol=1E-12)
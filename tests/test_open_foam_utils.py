@@ -0,0 +1,93 @@
+import logging
+
+import numpy as np
+import pytest
+
+from utilities.open_foam_utils import (load_force_coeff, merge_force_coeff_arrays, moving_avg, parse_force_coeff_text,
+                                      reduce_sweep_cases)
+
+HEADER = '# Time Cm Cd Cl Cl(f) Cl(r)\n'
+
+
+def trailing_average(val, bins):
+    # Output sample i averages the bins samples ending at val[i + bins]
+    return np.array([np.mean(val[i - bins + 1:i + 1]) for i in range(bins, len(val))])
+
+
+@pytest.mark.parametrize('bins', [1, 2, 3, 5])
+def test_simple_moving_avg_edge_lengths(bins):
+    rng = np.random.default_rng(bins)
+    for length in range(0, 2 * bins + 3):
+        val = rng.normal(10.0, 1.0, length)
+        result = moving_avg(val, bins)
+        assert result.shape == (max(length - bins, 0),)
+        np.testing.assert_allclose(result, trailing_average(val, bins), rtol=1E-12)
+
+
+@pytest.mark.parametrize('mode', ['centered', 'exponential'])
+def test_moving_avg_modes_line_up_with_time(mode):
+    for length in (3, 4, 5, 10):
+        assert moving_avg(np.arange(length, dtype=float), 4, mode=mode).shape == (max(length - 4, 0),)
+
+
+def test_moving_avg_unknown_mode():
+    with pytest.raises(ValueError):
+        moving_avg(np.arange(10.0), 3, mode='median')
+
+
+def force_coeff_rows(times, scale=1.0):
+    return ''.join('%r %r 0.02 %r 0.5 0.25\n' % (float(t), scale * 0.01 * t, scale * 0.1 * t) for t in times)
+
+
+def test_parse_force_coeff_text():
+    arr, header = parse_force_coeff_text(HEADER + force_coeff_rows(range(1, 4)) + '4 0.04 0.0')
+    assert header == [HEADER]
+    assert arr.dtype.names[0] == 'time'
+    np.testing.assert_array_equal(arr['time'], [1, 2, 3])
+    np.testing.assert_allclose(arr['Cl'], [0.1, 0.2, 0.3])
+
+
+@pytest.mark.parametrize('bad_line', ['4 0.04 0.02\n', '4 0.04 0.02 0.4 0.5 0.25 9\n', '4 0.04 0.02 abc 0.5 0.25\n'])
+def test_parse_force_coeff_text_malformed_row(bad_line):
+    # A short or malformed row is dropped without shifting the later rows into the wrong columns
+    text = HEADER + force_coeff_rows(range(1, 4)) + bad_line + force_coeff_rows(range(5, 7))
+    arr, _ = parse_force_coeff_text(text)
+    np.testing.assert_array_equal(arr['time'], [1, 2, 3, 5, 6])
+    np.testing.assert_allclose(arr['Cl'], [0.1, 0.2, 0.3, 0.5, 0.6])
+    np.testing.assert_allclose(arr['Cd'], 0.02)
+
+
+def test_duplicate_times_across_restart_files(tmp_path):
+    (tmp_path / '0').mkdir()
+    (tmp_path / '5').mkdir()
+    (tmp_path / '0' / 'forceCoeffs.dat').write_text(HEADER + force_coeff_rows(range(1, 9)))
+    (tmp_path / '5' / 'forceCoeffs.dat').write_text(HEADER + force_coeff_rows(range(6, 11), scale=2.0))
+
+    arr = load_force_coeff(str(tmp_path), logging.getLogger(), use_cache=False)
+    np.testing.assert_array_equal(arr['time'], np.arange(1, 11))
+    # The restart, read last, takes precedence for the times it rewrote
+    np.testing.assert_allclose(arr['Cl'], [0.1, 0.2, 0.3, 0.4, 0.5, 1.2, 1.4, 1.6, 1.8, 2.0])
+
+    first, _ = parse_force_coeff_text(HEADER + force_coeff_rows([3, 1, 2]))
+    second, _ = parse_force_coeff_text(HEADER + force_coeff_rows([2, 4], scale=2.0))
+    merged = merge_force_coeff_arrays([first, second], excise=2)
+    np.testing.assert_array_equal(merged['time'], [2, 3, 4])
+    np.testing.assert_allclose(merged['Cl'], [0.4, 0.3, 0.8])
+
+
+def test_reduce_sweep_cases_logs_worker_records(tmp_path, caplog):
+    cases = dict()
+    for aoa in (0, 2):
+        case_dir = tmp_path / ('aoa_%s' % aoa) / '0'
+        case_dir.mkdir(parents=True)
+        rows = ''.join('%s 0.02 %r 0.0 0.0 0.01 0.0\n' % (t, 0.1 * aoa) for t in range(400, 420))
+        (case_dir / 'forceCoeffs.dat').write_text('# Time Cd Cl Cs CmRoll CmPitch CmYaw\n' + rows)
+        cases[aoa] = (str(case_dir.parent), 'aoa_%s' % aoa)
+
+    logger = logging.getLogger('test_reduce_sweep_cases')
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        reduced = reduce_sweep_cases(cases, logger, str(tmp_path), 5, workers=2, images=False)
+    assert sorted(reduced) == [0, 2]
+    opened = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Opening File')]
+    assert len(opened) == 2
+    assert all(record.name == logger.name for record in caplog.records)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from utilities.parse_cache import cached_parse, clear_cache
+
+
+def parse(path):
+    return np.fromstring(path.read_text(), sep=' ')
+
+
+def test_cached_parse_hit(tmp_path):
+    source = tmp_path / 'data.dat'
+    source.write_text('1 2 3\n')
+    calls = list()
+
+    def counting_parse(path):
+        calls.append(path)
+        return parse(path)
+
+    for _ in range(3):
+        np.testing.assert_array_equal(cached_parse(source, counting_parse), [1, 2, 3])
+    assert len(calls) == 1
+    assert clear_cache(str(tmp_path)) == 1
+
+
+def test_file_changed_during_parse_is_not_cached_as_current(tmp_path):
+    source = tmp_path / 'data.dat'
+    source.write_text('1 2 3\n')
+
+    def parse_while_appended(path):
+        data = parse(path)
+        # A running case appends to the file after it was read
+        with open(path, 'a') as data_file:
+            data_file.write('4 5\n')
+        return data
+
+    np.testing.assert_array_equal(cached_parse(source, parse_while_appended, cache_dir=str(tmp_path / 'cache')),
+                                  [1, 2, 3])
+    np.testing.assert_array_equal(cached_parse(source, parse, cache_dir=str(tmp_path / 'cache')), [1, 2, 3, 4, 5])
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from aerodynamics.airfoil import Airfoil
+from simulation.rigid_body import ANGULAR_RATE, VELOCITY
+from simulation.simluation import EnvironmentManager
+from vehicles.aircraft import Aircraft
+from vehicles.components.wing import Wing
+
+SPEED = 30.0
+DENSITY = 1.225
+
+
+def rectangular_wing(**kwargs):
+    # 4 m span, 0.5 m chord, aspect ratio 8
+    return Wing(Wing.SubType.MAIN_WING, span=2.0, chord=0.5, sweep=0, polyhedral=0, **kwargs)
+
+
+def flow(alpha, speed=SPEED):
+    # Body axes are x forward, y right, z down, so a positive angle of attack is a positive w
+    return speed * np.array([np.cos(alpha), 0.0, np.sin(alpha)])
+
+
+def test_lift_coefficient_against_lifting_line():
+    wing = rectangular_wing()
+    alpha = np.radians(4.0)
+    force, moment = wing.strips.loads(flow(alpha), np.zeros(3), DENSITY)
+
+    # Lift is normal to the relative wind, up
+    lift = force @ np.array([np.sin(alpha), 0.0, -np.cos(alpha)])
+    lift_coefficient = lift / (0.5 * DENSITY * SPEED**2 * wing.area)
+    lift_slope = 2 * np.pi / (1 + 2 * np.pi / (np.pi * wing.aspect_ratio))
+    assert wing.aspect_ratio == pytest.approx(8.0)
+    # Within the cos(alpha) stall fade of section_coefficients
+    assert lift_coefficient == pytest.approx(lift_slope * alpha, rel=3E-3)
+    assert lift_coefficient == pytest.approx(0.350, abs=5E-4)
+
+
+def test_section_load_directions():
+    wing = rectangular_wing(Airfoil=Airfoil(cm0=0.05))
+    alpha, chord_force, normal_force, pitching_moment = wing.strips.section_loads(flow(np.radians(8.0)), np.zeros(3),
+                                                                                  DENSITY)
+    np.testing.assert_allclose(alpha, np.radians(8.0))
+    # The normal force is up and the chord force, the lift tilted forward less the drag, towards the leading edge
+    assert np.all(normal_force > 0)
+    assert np.all(chord_force > 0)
+    assert np.all(pitching_moment > 0)
+
+    force, moment = wing.strips.loads(flow(np.radians(8.0)), np.zeros(3), DENSITY)
+    assert force[0] > 0
+    assert force[2] < 0
+    # Positive cm0 pitches the nose up, a positive moment about y
+    assert moment[1] > 0
+
+
+def test_mirrored_half():
+    wing = Wing(Wing.SubType.MAIN_WING, span=2.0, chord=(0.6, 0.3), sweep=20, polyhedral=6)
+    strips = wing.strips
+    half = len(strips) // 2
+    np.testing.assert_allclose(strips.position[half:], strips.position[:half] * (1, -1, 1))
+    assert np.all(strips.position[:half, 1] > 0)
+
+    # Without sideslip the halves carry mirrored loads and no lateral force or moment
+    alpha, force, moment = strips.strip_loads(flow(np.radians(5.0)), np.zeros(3), DENSITY)
+    np.testing.assert_allclose(force[half:], force[:half] * (1, -1, 1), atol=1E-12)
+    total_force, total_moment = strips.loads(flow(np.radians(5.0)), np.zeros(3), DENSITY)
+    assert total_force[1] == pytest.approx(0.0, abs=1E-9)
+    np.testing.assert_allclose(total_moment[[0, 2]], 0.0, atol=1E-9)
+
+    # A right wing down roll rate raises the angle of attack on the right half, damping the roll
+    alpha, force, moment = strips.strip_loads(flow(np.radians(5.0)), (0.5, 0.0, 0.0), DENSITY)
+    assert np.all(alpha[:half] > alpha[half:])
+    assert strips.loads(flow(np.radians(5.0)), (0.5, 0.0, 0.0), DENSITY)[1][0] < 0
+
+    # Sideslip from the right increases the effective dihedral lift on the right half, rolling left
+    beta_flow = flow(np.radians(5.0)) + (0.0, 3.0, 0.0)
+    assert strips.loads(beta_flow, np.zeros(3), DENSITY)[1][0] < 0
+
+
+def tailed_aircraft(tail_arm=1.5):
+    aircraft = Aircraft('test')
+    wing = rectangular_wing(mass=10.0)
+    tail = Wing(Wing.SubType.HORZ_STAB, span=0.5, chord=0.2, sweep=0, polyhedral=0, mass=0.0,
+                position=np.array([-tail_arm, 0.0, 0.0]))
+    aircraft.add_component(wing)
+    aircraft.add_component(tail)
+    aircraft.states[VELOCITY] = (SPEED, 0.0, 0.0)
+    return aircraft, wing, tail
+
+
+def test_body_frame_loads_include_rotation_about_center_of_mass():
+    tail_arm = 1.5
+    aircraft, wing, tail = tailed_aircraft(tail_arm)
+    np.testing.assert_allclose(aircraft.center_of_mass, 0.0, atol=1E-12)
+    pitch_rate = 0.4
+    aircraft.states[ANGULAR_RATE] = (0.0, pitch_rate, 0.0)
+    environment = EnvironmentManager()
+
+    # A nose up pitch rate moves a tail behind the center of mass down, w x r = (0, 0, q l)
+    force, moment = tail.calculate_loads_body_frame(aircraft, None, environment, None)
+    expected = tail.strips.loads((SPEED, 0.0, pitch_rate * tail_arm), (0.0, pitch_rate, 0.0), DENSITY)
+    np.testing.assert_allclose(force, expected[0], rtol=1E-12)
+    np.testing.assert_allclose(moment, expected[1], rtol=1E-12, atol=1E-12)
+    assert force[2] < 0
+
+    # So the tail lift damps the pitch rate
+    still = tailed_aircraft(tail_arm)[0]
+    moment_still = still.calculate_loads_body_frame(None, environment, None)[1]
+    moment_pitching = aircraft.calculate_loads_body_frame(None, environment, None)[1]
+    assert moment_pitching[1] < moment_still[1]
+
+
+def test_incidence_matches_angle_of_attack():
+    alpha = np.radians(4.0)
+    aircraft, wing, tail = tailed_aircraft()
+    aircraft.states[VELOCITY] = flow(alpha)
+    environment = EnvironmentManager()
+    reference = wing.calculate_loads_body_frame(aircraft, None, environment, None)
+
+    rigged, rigged_wing, tail = tailed_aircraft()
+    rigged_wing.angle = np.array([0.0, alpha, 0.0])
+    rigged.states[VELOCITY] = (SPEED, 0.0, 0.0)
+    force, moment = rigged_wing.calculate_loads_body_frame(rigged, None, environment, None)
+
+    # The same lift, normal to the body x axis instead of the rotated relative wind
+    lift = reference[0] @ np.array([np.sin(alpha), 0.0, -np.cos(alpha)])
+    assert -force[2] == pytest.approx(lift, rel=1E-9)
@@ -0,0 +1,32 @@
+import numpy as np
+
+from utilities.sweep_summary import SweepSummaryStore
+
+
+def test_long_case_paths_keep_distinct_rows(tmp_path):
+    root = '/'.join(['deep_directory_%02d' % depth for depth in range(40)])
+    cases = ['%s/%sAOA_0Flap/postProcessing/forceCoeffs' % (root, aoa) for aoa in (0, 2)]
+    assert len(cases[0]) > 512
+
+    store = SweepSummaryStore(str(tmp_path / 'summary.npz'))
+    store.upsert([{'case': case, 'sweep': 'aoa', 'aoa': aoa, 'flap': 0.0, 'cl': 0.1 * aoa}
+                  for case, aoa in zip(cases, (0.0, 2.0))])
+    store.upsert([{'case': cases[1], 'sweep': 'aoa', 'aoa': 2.0, 'flap': 0.0, 'cl': 0.25}])
+    assert len(store) == 2
+    assert store.get_case(cases[0])['cl'] == 0.0
+    assert store.get_case(cases[1])['cl'] == 0.25
+
+    store.save()
+    loaded = SweepSummaryStore(str(tmp_path / 'summary.npz'))
+    assert loaded.get_case(cases[1])['case'] == cases[1]
+
+
+def test_pivot_aoa_flap():
+    store = SweepSummaryStore()
+    store.upsert([{'case': 'a%s_%s' % (aoa, flap), 'sweep': 'aoa', 'aoa': aoa, 'flap': flap, 'cl': aoa + flap}
+                  for aoa in (0.0, 4.0) for flap in (0.0, 10.0)] +
+                 [{'case': 'r%s' % re, 'sweep': 're', 're': re, 'cl': 1.0} for re in (1E5, 2E5)])
+    aoa, flap, cl = store.pivot('aoa', 'flap', 'cl', sweep='aoa')
+    np.testing.assert_array_equal(aoa, [0.0, 4.0])
+    np.testing.assert_array_equal(flap, [0.0, 10.0])
+    np.testing.assert_array_equal(cl, [[0.0, 10.0], [4.0, 14.0]])
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from acoustics.emit_receive import CompositeMicrophoneArray, Emitter, Microphone
+from simulation.acoustic_sim import solve_2d_static_emitter_field
+from simulation.beam_steering import PhaseSweep, steering_phases
+from simulation.time_domain_acoustics import TimeDomainPropagator
+
+FREQUENCY = 1000.0
+SAMPLE_RATE = 48E3
+
+
+def microphone_array(points):
+    return CompositeMicrophoneArray([Microphone(np.array([x, y, 0.0]), np.zeros(3), None) for x, y in points])
+
+
+def tone_amplitudes(emitters, points, phase_offsets):
+    """
+    Complex amplitude C of each microphone's received tone Re(C exp(i 2 pi f t)), from ten periods of the signal.
+    """
+    propagator = TimeDomainPropagator(emitters, microphone_array(points), SAMPLE_RATE, phase_offsets=phase_offsets)
+    num_samples = int(10 * SAMPLE_RATE / FREQUENCY)
+    signals = propagator.render(num_samples / SAMPLE_RATE, start_time=1.0)
+    time = 1.0 + np.arange(num_samples) / SAMPLE_RATE
+    return 2 * signals @ np.exp(-2j*np.pi * FREQUENCY * time) / num_samples
+
+
+def test_single_tone_phase_matches_static_field():
+    emitter = Emitter(np.array([0.1, 0.2, 0.0]), np.zeros(3), emit_power=0, frequency=FREQUENCY,
+                      antenna_pattern=None)
+    phase_offset = [1.1]
+    x, y, field = solve_2d_static_emitter_field([emitter], np.array([[-2.0, 2.0], [-2.0, 2.0]]), 0.5,
+                                                phase_offsets=phase_offset, dtype=np.complex128)
+    points = np.stack(np.meshgrid(x, y, indexing='ij'), axis=-1).reshape(-1, 2)
+    amplitude = tone_amplitudes([emitter], points, phase_offset)
+
+    # The time domain tones are the conjugate of the static phasors, cos(2 pi f t - k r - phi)
+    phase_error = np.angle(amplitude * field.ravel())
+    np.testing.assert_allclose(phase_error, 0.0, atol=1E-6)
+
+
+def test_steered_array_peaks_at_the_same_angle():
+    wavelength = 337 / FREQUENCY
+    emitters = [Emitter(np.array([(ind - 3.5) * wavelength / 2, 0.0, 0.0]), np.zeros(3), emit_power=0,
+                        frequency=FREQUENCY, antenna_pattern=None) for ind in range(8)]
+    angles = np.radians(np.arange(-90.0, 90.5, 1.0))
+    steering = steering_phases(emitters, np.radians(30.0))[0]
+    sweep = PhaseSweep.from_arc(emitters, angles, radius=50.0, dtype=np.complex128)
+
+    static = sweep.beam_pattern(steering)
+    received = np.abs(tone_amplitudes(emitters, sweep.points[:, :2], steering))
+    assert np.degrees(angles[np.argmax(static)]) == pytest.approx(30.0)
+    assert np.degrees(angles[np.argmax(received)]) == pytest.approx(30.0)
+    np.testing.assert_allclose(received / received.max(), static / static.max(), atol=0.01)
@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from aerodynamics.vortex_lattice import VortexLattice
+from vehicles.components.wing import Wing
+
+
+def test_bertin_smith_swept_wing_lift_slope():
+    # Bertin & Smith, Aerodynamics for Engineers: 45 degree swept wing of aspect ratio 5, one chordwise and four
+    # spanwise horseshoe vortices per side, CL_alpha = 3.443 per radian
+    wing = Wing(Wing.SubType.MAIN_WING, span=2.5, chord=1.0, sweep=45, polyhedral=0)
+    lattice = VortexLattice([wing], chordwise_panels=1, spanwise_panels=4)
+    alpha = np.radians(1.0)
+    solution = lattice.solve(alpha)
+    assert solution.lift_coefficient[0] / alpha == pytest.approx(3.443, rel=1E-3)
+    assert solution.side_force_coefficient[0] == pytest.approx(0.0, abs=1E-12)
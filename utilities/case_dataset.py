@@ -0,0 +1,180 @@
+import logging
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from utilities.open_foam_utils import get_time_directory_names, read_field
+
+
+class CaseDataset(object):
+    """
+    Lazy, time indexed view of the fields of an OpenFOAM case directory. The time directories and the variables in
+    each are indexed once, fields are only read when accessed, and the most recently used fields are kept in a bounded
+    LRU cache.
+
+    e.x: ds = CaseDataset('cases/AE410Midterm', max_cached_fields=16)
+         p_last = ds['p'][-1]                      # Last time step of p, shape (N,)
+         u_slice = ds['U'][2:10, cells]            # Time steps 2-9 for a subset of cells, shape (8, len(cells), 3)
+         u_window = ds['U'].sel(0.1, 0.5)          # Every time step with 0.1 <= t <= 0.5
+         for time, fields in ds.iter_time(['p', 'U']):
+             ...
+    """
+
+    def __init__(self, directory, max_cached_fields=32, grid_size=None, use_cache=True, cache_dir=None, logger=None):
+        """
+        :param directory: Case directory.
+        :param int max_cached_fields: Maximum number of decoded fields kept in memory.
+        :param int grid_size: Number of cells, only needed to expand uniform fields.
+        :param bool use_cache: Read/write parsed ASCII fields through the binary parse cache.
+        :param str cache_dir: Directory for the parse cache entries, if None they are written next to each field file.
+        :param logger: Logger instance, if not given the default Python instance is taken.
+        """
+        if logger is None:
+            logger = logging.getLogger()
+        self._logger = logger
+
+        self.directory = directory
+        self.max_cached_fields = max_cached_fields
+        self.grid_size = grid_size
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+
+        self._fields = OrderedDict()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-index the time directories and variables of the case, e.g. after a running case writes a new time step.
+        """
+        time_names = get_time_directory_names(self.directory)
+        self.times = np.array(sorted(time_names.keys()))
+        self._time_names = [time_names[time] for time in self.times]
+
+        self.variables = dict()
+        for t_ind, name in enumerate(self._time_names):
+            with os.scandir(os.path.join(self.directory, name)) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.startswith('.'):
+                        self.variables.setdefault(entry.name, list()).append(t_ind)
+        for variable in self.variables:
+            self.variables[variable] = np.array(self.variables[variable], dtype=int)
+
+        self._fields.clear()
+        self._logger.debug('Indexed %s time steps and %s variables in %s' % (len(self.times), len(self.variables),
+                                                                            self.directory))
+
+    def __getitem__(self, variable):
+        if variable not in self.variables:
+            raise KeyError('Variable %s not found in %s' % (variable, self.directory))
+        return FieldSeries(self, variable)
+
+    def __contains__(self, variable):
+        return variable in self.variables
+
+    def keys(self):
+        return sorted(self.variables.keys())
+
+    def load(self, variable, time_index, cells=None):
+        """
+        Load a single field, going through the LRU cache.
+
+        :param str variable: Name of the field file, e.g. 'p'.
+        :param int time_index: Index into self.times.
+        :param cells: Indices of the cells to return, if None every cell is returned.
+        :return: np.ndarray of shape (N,) for scalar fields or (N, components) otherwise.
+        """
+        key = (variable, int(time_index))
+        field = self._fields.get(key)
+        if field is None:
+            file_path = os.path.join(self.directory, self._time_names[time_index], variable)
+            field = read_field(file_path, size=self.grid_size, use_cache=self.use_cache, cache_dir=self.cache_dir)
+            self._fields[key] = field
+            if len(self._fields) > self.max_cached_fields:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(key)
+
+        if cells is not None:
+            field = field[cells]
+        return field
+
+    def iter_time(self, variables=None, cells=None, start=None, stop=None):
+        """
+        Generator over the time steps of the case, only loading one time step at a time.
+
+        :param list variables: Variables to load at each time step, if None every variable is loaded.
+        :param cells: Indices of the cells to return, if None every cell is returned.
+        :param float start: First time to include, if None the first time step.
+        :param float stop: Last time to include, if None the last time step.
+        :return: Yields (time, {variable: field}), variables missing from a time step are left out.
+        """
+        if variables is None:
+            variables = self.keys()
+        present = {variable: set(self.variables[variable].tolist()) if variable in self.variables else set()
+                   for variable in variables}
+        for t_ind in _time_range_indices(self.times, start, stop):
+            fields = dict()
+            for variable in variables:
+                if t_ind in present[variable]:
+                    fields[variable] = self.load(variable, t_ind, cells)
+            yield self.times[t_ind], fields
+
+
+class FieldSeries(object):
+    """
+    Time series of a single variable of a CaseDataset. Indexing is by position in the time steps that hold the
+    variable, optionally followed by a cell selection, e.g. series[5], series[-10:], series[2:8, cells].
+    """
+
+    def __init__(self, dataset, variable):
+        self.dataset = dataset
+        self.variable = variable
+        self._time_indices = dataset.variables[variable]
+
+    @property
+    def times(self):
+        return self.dataset.times[self._time_indices]
+
+    def __len__(self):
+        return len(self._time_indices)
+
+    def __getitem__(self, key):
+        cells = None
+        if isinstance(key, tuple):
+            key, cells = key
+        if isinstance(key, slice) or isinstance(key, (list, np.ndarray)):
+            return self._stack(self._time_indices[key], cells)
+        return self.dataset.load(self.variable, self._time_indices[key], cells)
+
+    def __iter__(self):
+        for t_ind in self._time_indices:
+            yield self.dataset.load(self.variable, t_ind)
+
+    def sel(self, start=None, stop=None, cells=None):
+        """
+        Select the time steps between two times.
+
+        :param float start: First time to include, if None the first time step.
+        :param float stop: Last time to include, if None the last time step.
+        :param cells: Indices of the cells to return, if None every cell is returned.
+        :return: np.ndarray of shape [times, cells] for scalar fields or [times, cells, components] otherwise.
+        """
+        return self._stack(self._time_indices[_time_range_indices(self.times, start, stop)], cells)
+
+    def _stack(self, time_indices, cells):
+        data = None
+        for idx, t_ind in enumerate(time_indices):
+            field = self.dataset.load(self.variable, t_ind, cells)
+            if data is None:
+                data = np.empty((len(time_indices),) + field.shape, dtype=field.dtype)
+            data[idx] = field
+        if data is None:
+            return np.zeros(0)
+        return data
+
+
+def _time_range_indices(times, start, stop):
+    lower = 0 if start is None else np.searchsorted(times, start, side='left')
+    upper = len(times) if stop is None else np.searchsorted(times, stop, side='right')
+    return np.arange(lower, upper)
@@ -0,0 +1,200 @@
+import json
+import math
+import os
+from pathlib import Path
+
+INDEX_VERSION = 2
+
+
+class CaseIndex(object):
+    """
+    Index of the directories and files below a case archive, built with a single os.scandir walk. processor*
+    directories and the time directories of OpenFOAM cases (directories holding system/ or constant/) are pruned by
+    default, as they make up the bulk of an OpenFOAM tree and never hold anything the post-processing looks for.
+    Numerically named directories elsewhere, e.g. a sweep folder called 5, are kept. The index can be saved to disk and
+    refreshed incrementally, only re-listing directories whose mtime has changed.
+
+    e.x: index = CaseIndex(r'M:\\Projects\\OpenFOAM\\Sweep', index_path='sweep_index.json')
+         for case in index.find_directory('AOA_0Flap'):
+             dat_files = index.find_files(case / 'postProcessing' / 'forceCoeffs', 'dat')
+    """
+
+    def __init__(self, top_directory, prune_processor=True, prune_time=True, index_path=None):
+        """
+        :param top_directory: Directory to index.
+        :param bool prune_processor: Skip processor* directories of decomposed cases.
+        :param bool prune_time: Skip the time directories of OpenFOAM cases.
+        :param str index_path: json file to persist the index to. If it exists and matches the options it is loaded
+        and refreshed instead of walking the whole tree.
+        """
+        self.top_directory = Path(top_directory)
+        self.prune_processor = prune_processor
+        self.prune_time = prune_time
+        self.index_path = index_path
+
+        self._dirs = dict()
+        if index_path is not None and os.path.exists(index_path) and self.load(index_path):
+            self.refresh()
+        else:
+            self._walk('.')
+            if index_path is not None:
+                self.save()
+
+    def _is_pruned(self, name, in_case):
+        """
+        :param str name: Directory name.
+        :param bool in_case: The directory is directly inside an OpenFOAM case.
+        """
+        if self.prune_processor and name.startswith('processor'):
+            return True
+        if self.prune_time and in_case:
+            try:
+                return math.isfinite(float(name))
+            except ValueError:
+                return False
+        return False
+
+    def _scan(self, rel_path):
+        dirs = list()
+        files = list()
+        path = os.path.join(self.top_directory, rel_path)
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+        in_case = 'system' in dirs or 'constant' in dirs
+        dirs = [name for name in dirs if not self._is_pruned(name, in_case)]
+        self._dirs[rel_path] = {'mtime_ns': os.stat(path).st_mtime_ns, 'dirs': sorted(dirs), 'files': sorted(files)}
+        return dirs
+
+    def _walk(self, rel_path):
+        stack = [rel_path]
+        while len(stack) > 0:
+            rel_path = stack.pop()
+            for name in self._scan(rel_path):
+                stack.append(os.path.normpath(os.path.join(rel_path, name)))
+
+    def _remove(self, rel_path):
+        stack = [rel_path]
+        while len(stack) > 0:
+            rel_path = stack.pop()
+            entry = self._dirs.pop(rel_path, None)
+            if entry is not None:
+                stack += [os.path.normpath(os.path.join(rel_path, name)) for name in entry['dirs']]
+
+    def refresh(self):
+        """
+        Bring the index up to date. Every indexed directory is stat'ed, and only directories whose mtime changed are
+        re-listed, with any new subdirectories walked and removed ones dropped.
+
+        :return: Number of directories that were re-listed.
+        """
+        rescanned = 0
+        for rel_path in sorted(self._dirs.keys(), key=len):
+            entry = self._dirs.get(rel_path)
+            if entry is None:
+                continue
+            path = os.path.join(self.top_directory, rel_path)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._remove(rel_path)
+                continue
+            if mtime_ns == entry['mtime_ns']:
+                continue
+
+            rescanned += 1
+            old_dirs = set(entry['dirs'])
+            new_dirs = set(self._scan(rel_path))
+            for name in old_dirs - new_dirs:
+                self._remove(os.path.normpath(os.path.join(rel_path, name)))
+            for name in new_dirs - old_dirs:
+                self._walk(os.path.normpath(os.path.join(rel_path, name)))
+
+        if self.index_path is not None:
+            self.save()
+        return rescanned
+
+    def _rel_path(self, directory):
+        try:
+            return os.path.normpath(os.path.relpath(os.path.abspath(directory), os.path.abspath(self.top_directory)))
+        except ValueError:
+            # Different drive to the indexed tree
+            return None
+
+    def __contains__(self, directory):
+        return self._rel_path(directory) in self._dirs
+
+    def directories(self):
+        """
+        :return: Paths of every indexed directory.
+        """
+        return [self.top_directory / rel_path for rel_path in sorted(self._dirs.keys())]
+
+    def find_directory(self, directory_name):
+        """
+        Equivalent of open_foam_utils.find_directory, matching every indexed directory whose name contains
+        directory_name.
+
+        :return: Sorted list of Paths.
+        """
+        return [self.top_directory / rel_path for rel_path in sorted(self._dirs.keys())
+                if directory_name in os.path.basename(rel_path)]
+
+    def find_files(self, directory, file_ext):
+        """
+        Equivalent of open_foam_utils.find_files, returning the files with the extension below an indexed directory.
+
+        :return: Sorted list of Paths.
+        """
+        root = self._rel_path(directory)
+        if root not in self._dirs:
+            return list()
+        suffix = '.%s' % file_ext
+        files = list()
+        stack = [root]
+        while len(stack) > 0:
+            rel_path = stack.pop()
+            entry = self._dirs[rel_path]
+            files += [self.top_directory / rel_path / name for name in entry['files'] if name.endswith(suffix)]
+            stack += [os.path.normpath(os.path.join(rel_path, name)) for name in entry['dirs']]
+        return sorted(files)
+
+    def cases(self):
+        """
+        :return: Paths of every indexed directory that holds a postProcessing directory.
+        """
+        return [self.top_directory / rel_path for rel_path in sorted(self._dirs.keys())
+                if 'postProcessing' in self._dirs[rel_path]['dirs']]
+
+    def widgets(self, case_directory):
+        """
+        :param case_directory: Case directory.
+        :return: Names of the function object directories in the postProcessing directory of the case.
+        """
+        post = self._rel_path(Path(case_directory) / 'postProcessing')
+        return list(self._dirs[post]['dirs']) if post in self._dirs else list()
+
+    def save(self, index_path=None):
+        index_path = self.index_path if index_path is None else index_path
+        tmp_path = '%s.%s.tmp' % (index_path, os.getpid())
+        with open(tmp_path, 'w') as index_file:
+            json.dump({'version': INDEX_VERSION, 'top_directory': str(self.top_directory.resolve()),
+                       'prune_processor': self.prune_processor, 'prune_time': self.prune_time, 'dirs': self._dirs},
+                      index_file)
+        os.replace(tmp_path, index_path)
+
+    def load(self, index_path):
+        """
+        :return: True if the index was loaded, False if it was built for a different tree or options.
+        """
+        with open(index_path, 'r') as index_file:
+            stored = json.load(index_file)
+        if (stored.get('version') != INDEX_VERSION or
+                stored.get('top_directory') != str(self.top_directory.resolve()) or
+                stored.get('prune_processor') != self.prune_processor or stored.get('prune_time') != self.prune_time):
+            return False
+        self._dirs = stored['dirs']
+        return True
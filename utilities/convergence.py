@@ -0,0 +1,216 @@
+import numpy as np
+from scipy import fft
+
+
+class ConvergenceResult(object):
+    def __init__(self, steady_start_index, steady_start_time, mean, std, stderr, tau, periodic, frequency,
+                 averaging_start_index, num_samples, converged):
+        """
+        Result of a convergence analysis of a single coefficient history.
+
+        :param int steady_start_index: Index of the first sample of the detected steady state.
+        :param float steady_start_time: Time of the first sample of the detected steady state.
+        :param float mean: Mean over the averaging window.
+        :param float std: Standard deviation over the averaging window.
+        :param float stderr: Autocorrelation corrected standard error of the mean.
+        :param float tau: Integrated autocorrelation time in samples.
+        :param bool periodic: True if a periodic steady state (e.g. vortex shedding) was detected.
+        :param float frequency: Dominant frequency of the steady state [Hz], NaN if not periodic.
+        :param int averaging_start_index: Index of the first sample averaged. For periodic histories the window is
+        trimmed to a whole number of periods.
+        :param int num_samples: Number of samples averaged.
+        :param bool converged: True if the stderr is within the requested tolerance.
+        """
+        self.steady_start_index = steady_start_index
+        self.steady_start_time = steady_start_time
+        self.mean = mean
+        self.std = std
+        self.stderr = stderr
+        self.tau = tau
+        self.periodic = periodic
+        self.frequency = frequency
+        self.averaging_start_index = averaging_start_index
+        self.num_samples = num_samples
+        self.converged = converged
+
+    @property
+    def period(self):
+        return 1.0 / self.frequency if self.periodic else np.nan
+
+    @property
+    def effective_samples(self):
+        return self.num_samples / self.tau if self.tau > 0 else np.nan
+
+    def as_dict(self):
+        return {'steady_start_index': self.steady_start_index, 'steady_start_time': self.steady_start_time,
+                'mean': self.mean, 'std': self.std, 'stderr': self.stderr, 'tau': self.tau,
+                'periodic': self.periodic, 'frequency': self.frequency,
+                'averaging_start_index': self.averaging_start_index, 'num_samples': self.num_samples,
+                'converged': self.converged}
+
+
+def mser_truncation(val, batch_size=5, max_fraction=0.5):
+    """
+    Start of the steady state by the MSER-m rule: the truncation point that minimises the marginal standard error of
+    the batch means of the remaining history. Evaluated for every candidate truncation at once from suffix sums, so
+    the cost is O(n).
+
+    :param np.ndarray val: Coefficient history.
+    :param int batch_size: Number of samples per batch (MSER-5 by default).
+    :param float max_fraction: Truncation points beyond this fraction of the history are not considered.
+    :return: Index of the first steady state sample.
+    """
+    val = np.asarray(val, dtype=np.float64)
+    num_batches = len(val) // batch_size
+    if num_batches < 4:
+        return 0
+
+    # Batches are aligned to the end of the history so the newest samples are always used
+    offset = len(val) - num_batches * batch_size
+    batches = val[offset:].reshape(num_batches, batch_size).mean(axis=1)
+    batches = batches - batches.mean()
+
+    suffix_sum = np.cumsum(batches[::-1])[::-1]
+    suffix_sq_sum = np.cumsum(batches[::-1] ** 2)[::-1]
+    remaining = np.arange(num_batches, 0, -1)
+    sq_dev = suffix_sq_sum - suffix_sum ** 2 / remaining
+
+    max_truncation = max(1, int(num_batches * max_fraction))
+    mser = sq_dev[:max_truncation] / remaining[:max_truncation] ** 2
+    return offset + int(np.argmin(mser)) * batch_size
+
+
+def autocorrelation(val):
+    """
+    Normalised autocorrelation of a series, computed with an FFT in O(n log n).
+
+    :param np.ndarray val: Series.
+    :return: np.ndarray of the autocorrelation at lags 0 to n-1.
+    """
+    val = np.asarray(val, dtype=np.float64)
+    n = len(val)
+    x = val - val.mean()
+    nfft = fft.next_fast_len(2 * n)
+    spectrum = fft.rfft(x, nfft)
+    acf = fft.irfft(spectrum * np.conj(spectrum), nfft)[:n]
+    if acf[0] <= 0:
+        return np.concatenate(([1.0], np.zeros(n - 1)))
+    return acf / acf[0]
+
+
+def integrated_autocorrelation_time(val, window_factor=5.0):
+    """
+    Integrated autocorrelation time with Sokal's automatic windowing, the smallest window M with M >= c * tau(M).
+
+    :param np.ndarray val: Series.
+    :param float window_factor: Window factor c.
+    :return: tau in samples, 1 for uncorrelated samples.
+    """
+    if len(val) < 4:
+        return 1.0
+    acf = autocorrelation(val)
+    taus = 1.0 + 2.0 * np.cumsum(acf[1:])
+    windows = np.arange(1, len(acf))
+    valid = np.flatnonzero(windows >= window_factor * taus)
+    tau = taus[valid[0]] if valid.size > 0 else taus[-1]
+    return max(float(tau), 1.0)
+
+
+def dominant_frequency(val, sampling_period, min_cycles=3, power_fraction=0.3):
+    """
+    Detect a periodic signal from the peak of its power spectrum.
+
+    :param np.ndarray val: Series, uniformly sampled.
+    :param float sampling_period: Time between samples.
+    :param int min_cycles: Minimum number of periods in the series for it to be considered periodic.
+    :param float power_fraction: Minimum fraction of the (non DC) signal power within the peak.
+    :return: Frequency of the peak [Hz], or NaN if the series is not periodic.
+    """
+    val = np.asarray(val, dtype=np.float64)
+    n = len(val)
+    if n < 4 * min_cycles:
+        return np.nan
+    x = val - val.mean()
+    power = np.abs(fft.rfft(x * np.hanning(n))) ** 2
+    freqs = fft.rfftfreq(n, d=sampling_period)
+    total = power[1:].sum()
+    if total <= 0:
+        return np.nan
+
+    peak = 1 + int(np.argmax(power[1:]))
+    peak_power = power[max(peak - 2, 1):peak + 3].sum()
+    if peak_power / total < power_fraction or freqs[peak] * n * sampling_period < min_cycles:
+        return np.nan
+
+    # Parabolic interpolation of the peak in log power for a sub-bin frequency estimate
+    if 1 < peak < len(power) - 1 and np.all(power[peak - 1:peak + 2] > 0):
+        alpha, beta, gamma = np.log(power[peak - 1:peak + 2])
+        denominator = alpha - 2 * beta + gamma
+        if denominator != 0:
+            return freqs[peak] + 0.5 * (alpha - gamma) / denominator * (freqs[1] - freqs[0])
+    return freqs[peak]
+
+
+def analyse_convergence(time, val, rel_tol=1e-3, abs_tol=0.0, batch_size=5, detect_periodic=True):
+    """
+    Analyse the convergence of a coefficient history: detect the start of the steady state, estimate the
+    autocorrelation corrected uncertainty of its mean, and detect a periodic steady state. Runs in O(n log n).
+
+    :param np.ndarray time: Time of each sample.
+    :param np.ndarray val: Coefficient history.
+    :param float rel_tol: Converged if stderr <= rel_tol * |mean| ...
+    :param float abs_tol: ... or stderr <= abs_tol.
+    :param int batch_size: Batch size of the MSER steady state detection.
+    :param bool detect_periodic: Look for a periodic steady state, and average over whole periods if one is found.
+    :return: ConvergenceResult
+    """
+    time = np.asarray(time, dtype=np.float64)
+    val = np.asarray(val, dtype=np.float64)
+    if len(val) == 0:
+        return ConvergenceResult(0, np.nan, np.nan, np.nan, np.nan, np.nan, False, np.nan, 0, 0, False)
+
+    start = mser_truncation(val, batch_size=batch_size)
+    steady = val[start:]
+
+    frequency = np.nan
+    averaging_start = start
+    if detect_periodic and len(steady) > 1:
+        sampling_period = (time[-1] - time[start]) / (len(steady) - 1)
+        frequency = dominant_frequency(steady, sampling_period)
+        if not np.isnan(frequency):
+            samples_per_period = 1.0 / (frequency * sampling_period)
+            num_periods = int(len(steady) / samples_per_period)
+            if num_periods < 1:
+                frequency = np.nan
+            else:
+                averaging_start = len(val) - int(round(num_periods * samples_per_period))
+
+    window = val[averaging_start:]
+    mean = np.average(window)
+    std = np.std(window)
+    if np.isnan(frequency):
+        tau = integrated_autocorrelation_time(window)
+        stderr = std * np.sqrt(tau / len(window))
+    else:
+        # The mean over whole periods is only uncertain by the cycle to cycle variation, taken from the spread of
+        # the per period means
+        tau = np.nan
+        samples_per_period = len(window) / float(num_periods)
+        edges = np.round(np.arange(num_periods + 1) * samples_per_period).astype(int)
+        period_means = np.add.reduceat(window, edges[:-1]) / np.diff(edges)
+        stderr = np.std(period_means) / np.sqrt(len(period_means)) if num_periods > 1 else std
+
+    converged = bool(stderr <= max(rel_tol * abs(mean), abs_tol))
+    return ConvergenceResult(start, time[start], mean, std, stderr, tau, not np.isnan(frequency), frequency,
+                             averaging_start, len(window), converged)
+
+
+def analyse_coefficients(time, coefficients, **kwargs):
+    """
+    Run analyse_convergence over every coefficient of a case.
+
+    :param np.ndarray time: Time of each sample.
+    :param dict coefficients: {name: np.ndarray} coefficient histories.
+    :return: dict of {name: ConvergenceResult}
+    """
+    return {name: analyse_convergence(time, val, **kwargs) for name, val in coefficients.items()}
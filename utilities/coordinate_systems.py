@@ -1,15 +1,307 @@
+"""
+Attitude representations, all vectorized over leading dimensions and returning plain ndarrays:
+
+- Euler angles (roll, pitch, yaw) [rad] of shape [..., 3], the 3-2-1 (yaw, pitch, roll) sequence.
+- Direction cosine matrices of shape [..., 3, 3], rotating inertial frame vectors into the body frame.
+- Quaternions (w, x, y, z) of shape [..., 4], scalar first, rotating body frame vectors into the inertial frame
+  (v_i = q v_b q*). The quaternion of an attitude and its DCM describe the same rotation, quaternion_to_dcm(q) is the
+  inertial to body DCM like euler_to_dcm.
+
+e.x: dcm = euler_to_dcm(states[:, 6:9])                   # [N, 3, 3] for N states
+     velocity_b = rotate(dcm, velocity_i)                 # [N, 3]
+     q_dot = quaternion_derivative(q, omega_b)            # [N, 4]
+"""
+
+import functools
+
 import numpy as np
 
+
+def euler_to_dcm(euler, out=None):
+    """
+    :param np.ndarray euler: (roll, pitch, yaw) [rad] of shape [..., 3].
+    :param np.ndarray out: Array of shape [..., 3, 3] to write the DCMs into.
+    :return: Inertial to body frame DCMs of shape [..., 3, 3].
+    """
+    euler = np.asarray(euler, dtype=np.float64)
+    if out is None:
+        out = np.empty(euler.shape[:-1] + (3, 3))
+    cr, cp, cy = np.cos(euler[..., 0]), np.cos(euler[..., 1]), np.cos(euler[..., 2])
+    sr, sp, sy = np.sin(euler[..., 0]), np.sin(euler[..., 1]), np.sin(euler[..., 2])
+    out[..., 0, 0] = cy * cp
+    out[..., 0, 1] = sy * cp
+    out[..., 0, 2] = -sp
+    out[..., 1, 0] = cy * sp * sr - sy * cr
+    out[..., 1, 1] = sy * sp * sr + cy * cr
+    out[..., 1, 2] = cp * sr
+    out[..., 2, 0] = cy * sp * cr + sy * sr
+    out[..., 2, 1] = sy * sp * cr - cy * sr
+    out[..., 2, 2] = cp * cr
+    return out
+
+
 def rotation_matrix(angles):
-        roll = angles[6]
-        pitch = angles[7]
-        yaw = angles[8]
-        cp = np.cos(pitch)
-        cr = np.cos(roll)
-        cy = np.cos(yaw)
-        sp = np.sin(pitch)
-        sr = np.sin(roll)
-        sy = np.sin(yaw)
-        return np.matrix([[cy * cp, sy * cp, -sp],
-                          [cy * sp * sr - sy * cr, sy * sp * sr + cy * cr, cp * sr],
-                          [cy * sp * cr + sy * sr, sy * sp * cr - cy * sr, cp * cr]])
+    """
+    Inertial to body frame rotation matrix of explicit Euler angles, see euler_to_dcm.
+
+    :param np.ndarray angles: (roll, pitch, yaw) [rad] of shape [3] or [N, 3], e.g. states[6:9].
+    :return: np.ndarray of shape [3, 3] or [N, 3, 3].
+    """
+    return euler_to_dcm(angles)
+
+
+def dcm_to_euler(dcm):
+    """
+    :param np.ndarray dcm: Inertial to body frame DCMs of shape [..., 3, 3].
+    :return: (roll, pitch, yaw) [rad] of shape [..., 3], pitch in [-pi/2, pi/2].
+    """
+    dcm = np.asarray(dcm, dtype=np.float64)
+    return np.stack((np.arctan2(dcm[..., 1, 2], dcm[..., 2, 2]),
+                     -np.arcsin(np.clip(dcm[..., 0, 2], -1.0, 1.0)),
+                     np.arctan2(dcm[..., 0, 1], dcm[..., 0, 0])), axis=-1)
+
+
+def euler_to_quaternion(euler):
+    """
+    :param np.ndarray euler: (roll, pitch, yaw) [rad] of shape [..., 3].
+    :return: Unit quaternions (w, x, y, z) of shape [..., 4].
+    """
+    half = 0.5 * np.asarray(euler, dtype=np.float64)
+    cr, cp, cy = np.cos(half[..., 0]), np.cos(half[..., 1]), np.cos(half[..., 2])
+    sr, sp, sy = np.sin(half[..., 0]), np.sin(half[..., 1]), np.sin(half[..., 2])
+    return np.stack((cr * cp * cy + sr * sp * sy,
+                     sr * cp * cy - cr * sp * sy,
+                     cr * sp * cy + sr * cp * sy,
+                     cr * cp * sy - sr * sp * cy), axis=-1)
+
+
+def quaternion_to_euler(q):
+    """
+    :param np.ndarray q: Unit quaternions (w, x, y, z) of shape [..., 4].
+    :return: (roll, pitch, yaw) [rad] of shape [..., 3], pitch in [-pi/2, pi/2].
+    """
+    q = np.asarray(q, dtype=np.float64)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    return np.stack((np.arctan2(2 * (y * z + w * x), 1 - 2 * (x * x + y * y)),
+                     np.arcsin(np.clip(2 * (w * y - x * z), -1.0, 1.0)),
+                     np.arctan2(2 * (x * y + w * z), 1 - 2 * (y * y + z * z))), axis=-1)
+
+
+def quaternion_to_dcm(q, out=None):
+    """
+    :param np.ndarray q: Unit quaternions (w, x, y, z) of shape [..., 4].
+    :param np.ndarray out: Array of shape [..., 3, 3] to write the DCMs into.
+    :return: Inertial to body frame DCMs of shape [..., 3, 3].
+    """
+    q = np.asarray(q, dtype=np.float64)
+    if out is None:
+        out = np.empty(q.shape[:-1] + (3, 3))
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    out[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    out[..., 0, 1] = 2 * (x * y + w * z)
+    out[..., 0, 2] = 2 * (x * z - w * y)
+    out[..., 1, 0] = 2 * (x * y - w * z)
+    out[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    out[..., 1, 2] = 2 * (y * z + w * x)
+    out[..., 2, 0] = 2 * (x * z + w * y)
+    out[..., 2, 1] = 2 * (y * z - w * x)
+    out[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return out
+
+
+def dcm_to_quaternion(dcm):
+    """
+    Shepperd's method, taking the square root of the largest of the four quaternion components for accuracy.
+
+    :param np.ndarray dcm: Inertial to body frame DCMs of shape [..., 3, 3].
+    :return: Unit quaternions (w, x, y, z) of shape [..., 4] with w >= 0.
+    """
+    dcm = np.asarray(dcm, dtype=np.float64)
+    c00, c01, c02 = dcm[..., 0, 0], dcm[..., 0, 1], dcm[..., 0, 2]
+    c10, c11, c12 = dcm[..., 1, 0], dcm[..., 1, 1], dcm[..., 1, 2]
+    c20, c21, c22 = dcm[..., 2, 0], dcm[..., 2, 1], dcm[..., 2, 2]
+    diagonal = np.stack((c00 + c11 + c22, c00, c11, c22), axis=-1)
+    branch = np.argmax(diagonal, axis=-1)
+
+    q = np.empty(dcm.shape[:-2] + (4,))
+    # Each branch fills the rows where its component is the largest, 4 q_k^2 = squares_k
+    squares = 1 + 2 * diagonal - diagonal[..., :1]
+    squares[..., 0] = 1 + diagonal[..., 0]
+    sums = (c12 - c21, c20 - c02, c01 - c10)
+    pairs = (c01 + c10, c20 + c02, c12 + c21)
+    for k in range(4):
+        rows = branch == k
+        if not np.any(rows):
+            continue
+        scale = 2 * np.sqrt(np.maximum(squares[..., k][rows], 0.0))
+        if k == 0:
+            q[rows] = np.stack((0.25 * scale, sums[0][rows] / scale, sums[1][rows] / scale, sums[2][rows] / scale),
+                               axis=-1)
+        elif k == 1:
+            q[rows] = np.stack((sums[0][rows] / scale, 0.25 * scale, pairs[0][rows] / scale, pairs[1][rows] / scale),
+                               axis=-1)
+        elif k == 2:
+            q[rows] = np.stack((sums[1][rows] / scale, pairs[0][rows] / scale, 0.25 * scale, pairs[2][rows] / scale),
+                               axis=-1)
+        else:
+            q[rows] = np.stack((sums[2][rows] / scale, pairs[1][rows] / scale, pairs[2][rows] / scale, 0.25 * scale),
+                               axis=-1)
+    q *= np.where(q[..., :1] < 0, -1.0, 1.0)
+    return quaternion_normalize(q, out=q)
+
+
+def quaternion_multiply(p, q, out=None):
+    """
+    Hamilton product p q, broadcast over leading dimensions. The rotation q followed by p.
+
+    :param np.ndarray p: Quaternions (w, x, y, z) of shape [..., 4].
+    :param np.ndarray q: Quaternions (w, x, y, z) of shape [..., 4].
+    :param np.ndarray out: Array of the broadcast shape to write the product into, must not alias p or q.
+    :return: np.ndarray of shape [..., 4].
+    """
+    p = np.asarray(p, dtype=np.float64)
+    q = np.asarray(q, dtype=np.float64)
+    if out is None:
+        out = np.empty(np.broadcast_shapes(p.shape, q.shape))
+    pw, px, py, pz = p[..., 0], p[..., 1], p[..., 2], p[..., 3]
+    qw, qx, qy, qz = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    out[..., 0] = pw * qw - px * qx - py * qy - pz * qz
+    out[..., 1] = pw * qx + px * qw + py * qz - pz * qy
+    out[..., 2] = pw * qy - px * qz + py * qw + pz * qx
+    out[..., 3] = pw * qz + px * qy - py * qx + pz * qw
+    return out
+
+
+def quaternion_conjugate(q):
+    """
+    :param np.ndarray q: Quaternions (w, x, y, z) of shape [..., 4].
+    :return: Conjugates of shape [..., 4], the inverse rotations of unit quaternions.
+    """
+    q = np.array(q, dtype=np.float64)
+    q[..., 1:] *= -1
+    return q
+
+
+def quaternion_normalize(q, out=None):
+    """
+    :param np.ndarray q: Quaternions of shape [..., 4].
+    :param np.ndarray out: Array to write the unit quaternions into, may be q itself.
+    :return: Unit quaternions of shape [..., 4].
+    """
+    q = np.asarray(q, dtype=np.float64)
+    return np.divide(q, np.linalg.norm(q, axis=-1, keepdims=True), out=out)
+
+
+def quaternion_rotate(q, vectors, inverse=False):
+    """
+    Rotate body frame vectors into the inertial frame, v_i = q v_b q*, without forming the DCM.
+
+    :param np.ndarray q: Unit quaternions (w, x, y, z) of shape [..., 4].
+    :param np.ndarray vectors: Vectors of shape [..., 3], broadcast against q.
+    :param bool inverse: Rotate inertial frame vectors into the body frame instead.
+    :return: np.ndarray of shape [..., 3].
+    """
+    q = np.asarray(q, dtype=np.float64)
+    vectors = np.asarray(vectors, dtype=np.float64)
+    axis = -q[..., 1:] if inverse else q[..., 1:]
+    twice_cross = 2 * cross(axis, vectors)
+    return vectors + q[..., :1] * twice_cross + cross(axis, twice_cross)
+
+
+def quaternion_derivative(q, omega, normalization_gain=0.0, out=None):
+    """
+    Attitude kinematics q_dot = 0.5 q (0, omega).
+
+    :param np.ndarray q: Quaternions (w, x, y, z) of shape [..., 4].
+    :param np.ndarray omega: Body frame angular rates (p, q, r) [rad/s] of shape [..., 3].
+    :param float normalization_gain: Gain k [1/s] of an added k (1 - |q|^2) q term, which drives the norm back to one
+    during integration without changing the attitude.
+    :param np.ndarray out: Array of shape [..., 4] to write the derivatives into.
+    :return: np.ndarray of shape [..., 4].
+    """
+    q = np.asarray(q, dtype=np.float64)
+    omega = np.asarray(omega, dtype=np.float64)
+    if out is None:
+        out = np.empty(np.broadcast_shapes(q.shape, omega.shape[:-1] + (4,)))
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    p, r_y, r_z = omega[..., 0], omega[..., 1], omega[..., 2]
+    out[..., 0] = -0.5 * (x * p + y * r_y + z * r_z)
+    out[..., 1] = 0.5 * (w * p + y * r_z - z * r_y)
+    out[..., 2] = 0.5 * (w * r_y + z * p - x * r_z)
+    out[..., 3] = 0.5 * (w * r_z + x * r_y - y * p)
+    if normalization_gain:
+        out += normalization_gain * (1 - np.sum(q * q, axis=-1, keepdims=True)) * q
+    return out
+
+
+def euler_rates(euler, omega):
+    """
+    Euler angle kinematics, singular at pitch = +-pi/2.
+
+    :param np.ndarray euler: (roll, pitch, yaw) [rad] of shape [..., 3].
+    :param np.ndarray omega: Body frame angular rates (p, q, r) [rad/s] of shape [..., 3].
+    :return: (roll, pitch, yaw) rates [rad/s] of shape [..., 3].
+    """
+    euler = np.asarray(euler, dtype=np.float64)
+    omega = np.asarray(omega, dtype=np.float64)
+    cr, sr = np.cos(euler[..., 0]), np.sin(euler[..., 0])
+    cp, tp = np.cos(euler[..., 1]), np.tan(euler[..., 1])
+    p, q, r = omega[..., 0], omega[..., 1], omega[..., 2]
+    off_axis = q * sr + r * cr
+    return np.stack((p + off_axis * tp, q * cr - r * sr, off_axis / cp), axis=-1)
+
+
+def compose_dcm(*dcms):
+    """
+    Chain rotations, compose_dcm(c_ba, c_an) is the DCM from frame n to frame b.
+
+    :param np.ndarray dcms: DCMs of shape [..., 3, 3], broadcast against each other.
+    :return: np.ndarray of shape [..., 3, 3].
+    """
+    return functools.reduce(np.matmul, (np.asarray(dcm, dtype=np.float64) for dcm in dcms))
+
+
+def rotate(dcm, vectors, transpose=False, out=None):
+    """
+    :param np.ndarray dcm: DCMs of shape [..., 3, 3].
+    :param np.ndarray vectors: Vectors of shape [..., 3], broadcast against the DCMs.
+    :param bool transpose: Apply the inverse rotation, e.g. body to inertial with an inertial to body DCM.
+    :param np.ndarray out: Array of the broadcast shape to write the rotated vectors into.
+    :return: np.ndarray of shape [..., 3].
+    """
+    subscripts = '...ji,...j->...i' if transpose else '...ij,...j->...i'
+    if out is None:
+        return np.einsum(subscripts, dcm, vectors)
+    return np.einsum(subscripts, dcm, vectors, out=out)
+
+
+def cross(a, b, out=None):
+    """
+    Cross products a x b of shape [..., 3], as np.cross but without its overhead on small arrays.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if out is None:
+        out = np.empty(np.broadcast_shapes(a.shape, b.shape))
+    a0, a1, a2 = a[..., 0], a[..., 1], a[..., 2]
+    b0, b1, b2 = b[..., 0], b[..., 1], b[..., 2]
+    out[..., 0] = a1 * b2 - a2 * b1
+    out[..., 1] = a2 * b0 - a0 * b2
+    out[..., 2] = a0 * b1 - a1 * b0
+    return out
+
+
+def skew(vectors):
+    """
+    :param np.ndarray vectors: Vectors of shape [..., 3].
+    :return: Cross product matrices of shape [..., 3, 3], skew(a) @ b == cross(a, b).
+    """
+    vectors = np.asarray(vectors, dtype=np.float64)
+    out = np.zeros(vectors.shape[:-1] + (3, 3))
+    out[..., 0, 1] = -vectors[..., 2]
+    out[..., 0, 2] = vectors[..., 1]
+    out[..., 1, 0] = vectors[..., 2]
+    out[..., 1, 2] = -vectors[..., 0]
+    out[..., 2, 0] = -vectors[..., 1]
+    out[..., 2, 1] = vectors[..., 0]
+    return out
@@ -0,0 +1,164 @@
+import mmap
+import re
+
+import numpy as np
+
+FIELD_COMPONENTS = {'scalar': 1, 'vector': 3, 'sphericalTensor': 1, 'symmTensor': 6, 'tensor': 9}
+
+_FORMAT_RE = re.compile(rb'\bformat\s+(ascii|binary)\s*;')
+_CLASS_RE = re.compile(rb'\bclass\s+(\w+)\s*;')
+_SCALAR_SIZE_RE = re.compile(rb'scalar\s*=\s*(\d+)')
+_INTERNAL_FIELD_RE = re.compile(rb'\binternalField\s+(uniform|nonuniform)\s*')
+_LIST_RE = re.compile(rb'(?:List<(\w+)>\s*)?(\d+)\s*\(')
+_LIST_END_RE = re.compile(rb'\)\s*;')
+
+
+class FoamFieldHeader(object):
+    def __init__(self, file_format, field_class, scalar_size, uniform, value_type, size, data_offset):
+        """
+        Layout of the internalField of an OpenFOAM field file.
+
+        :param str file_format: 'ascii' or 'binary'.
+        :param str field_class: Class from the FoamFile header, e.g. 'volScalarField'.
+        :param int scalar_size: Size of a binary scalar in bytes.
+        :param bool uniform: True if the internalField is a single uniform value.
+        :param str value_type: 'scalar', 'vector', 'symmTensor', ...
+        :param int size: Number of values in the list, None for uniform fields.
+        :param int data_offset: Byte offset of the list data (after the opening bracket), or of the uniform value.
+        """
+        self.format = file_format
+        self.field_class = field_class
+        self.scalar_size = scalar_size
+        self.uniform = uniform
+        self.value_type = value_type
+        self.size = size
+        self.data_offset = data_offset
+
+    @property
+    def num_components(self):
+        return FIELD_COMPONENTS[self.value_type]
+
+    @property
+    def dtype(self):
+        return np.dtype('<f4') if self.scalar_size == 4 else np.dtype('<f8')
+
+
+def _value_type_from_class(field_class):
+    for value_type in ('SymmTensor', 'SphericalTensor', 'Tensor', 'Vector', 'Scalar'):
+        if value_type in field_class:
+            return value_type[0].lower() + value_type[1:]
+    return 'scalar'
+
+
+def read_field_header(buffer):
+    """
+    Locate the internalField of an OpenFOAM field file.
+
+    :param buffer: bytes or mmap of the file contents.
+    :return: FoamFieldHeader
+    """
+    internal = _INTERNAL_FIELD_RE.search(buffer)
+    if internal is None:
+        raise ValueError('No internalField entry found')
+
+    header = buffer[:internal.start()]
+    file_format = _FORMAT_RE.search(header)
+    file_format = 'ascii' if file_format is None else file_format.group(1).decode()
+    field_class = _CLASS_RE.search(header)
+    field_class = '' if field_class is None else field_class.group(1).decode()
+    scalar_size = _SCALAR_SIZE_RE.search(header)
+    scalar_size = 8 if scalar_size is None else int(scalar_size.group(1)) // 8
+    value_type = _value_type_from_class(field_class)
+
+    if internal.group(1) == b'uniform':
+        return FoamFieldHeader(file_format, field_class, scalar_size, True, value_type, None, internal.end())
+
+    list_match = _LIST_RE.match(buffer, internal.end())
+    if list_match is None:
+        raise ValueError('Could not find the internalField list')
+    if list_match.group(1) is not None:
+        value_type = list_match.group(1).decode()
+    return FoamFieldHeader(file_format, field_class, scalar_size, False, value_type, int(list_match.group(2)),
+                           list_match.end())
+
+
+def read_field_file(file_path, cells=None, size=None):
+    """
+    Read the internalField of an OpenFOAM field file. ASCII lists are parsed in bulk, binary lists are memory mapped
+    without copying, and uniform fields are broadcast without allocating a full array.
+
+    :param file_path: Path to the field file, e.g. '<case>/0.1/p'.
+    :param cells: Indices of the cells to return, if None every cell is returned.
+    :param int size: Number of cells, needed to expand uniform fields when cells is None.
+    :return: np.ndarray of shape (N,) for scalar fields or (N, components) otherwise. The array may be read-only.
+    """
+    with open(file_path, 'rb') as field_file:
+        buffer = mmap.mmap(field_file.fileno(), 0, access=mmap.ACCESS_READ)
+    header = read_field_header(buffer)
+    num_components = header.num_components
+    shape = (-1,) if num_components == 1 else (-1, num_components)
+
+    if header.uniform:
+        end = buffer.find(b';', header.data_offset)
+        value = np.fromstring(buffer[header.data_offset:end].translate(None, b'()').decode(), sep=' ')
+        buffer.close()
+        size = _subset_size(cells, size)
+        return np.broadcast_to(value if num_components > 1 else value[0], (size,) + tuple(shape[1:]))
+
+    if header.format == 'binary':
+        buffer.close()
+        values = np.memmap(file_path, dtype=header.dtype, mode='r', offset=header.data_offset,
+                           shape=(header.size * num_components,)).reshape(shape)
+    else:
+        end = _LIST_END_RE.search(buffer, header.data_offset)
+        if end is None:
+            buffer.close()
+            raise ValueError('Unterminated internalField list in %s' % file_path)
+        body = buffer[header.data_offset:end.start()]
+        buffer.close()
+        if num_components > 1:
+            body = body.translate(None, b'()')
+        values = np.fromstring(body.decode(), sep=' ')
+        if values.size != header.size * num_components:
+            raise ValueError('Expected %s values in %s, found %s' % (header.size * num_components, file_path,
+                                                                     values.size))
+        values = values.reshape(shape)
+
+    if cells is not None:
+        values = values[cells]
+    return values
+
+
+def _subset_size(cells, size):
+    if cells is None:
+        if size is None:
+            raise ValueError('A uniform field needs the number of cells (size/grid_size) to be expanded')
+        return size
+    if size is not None:
+        return len(np.arange(size)[cells])
+    cells = np.asarray(cells)
+    return int(np.count_nonzero(cells)) if cells.dtype == bool else cells.size
+
+
+def read_field_file_header(file_path):
+    """
+    :param file_path: Path to the field file.
+    :return: FoamFieldHeader of the field file, see read_field_header.
+    """
+    with open(file_path, 'rb') as field_file:
+        buffer = mmap.mmap(field_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return read_field_header(buffer)
+    finally:
+        buffer.close()
+
+
+def is_binary_field(file_path):
+    """
+    :param file_path: Path to the field file.
+    :return: True if the field file is written in binary format.
+    """
+    with open(file_path, 'rb') as field_file:
+        head = field_file.read(4096)
+    file_format = _FORMAT_RE.search(head)
+    return file_format is not None and file_format.group(1) == b'binary'
@@ -1,16 +1,35 @@
+import asyncio
+import logging
 import os
+import time as time_module
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.fftpack import rfft, fftfreq, fftshift
+from numpy.lib.recfunctions import structured_to_unstructured
+from scipy.signal import lfilter
+
+from utilities.case_index import CaseIndex
+from utilities.foam_field import read_field_file, read_field_file_header
+from utilities.parse_cache import cached_parse
+from utilities.report_rendering import FigureRenderer, init_render_worker, write_plot_data
+from utilities.spectral import amplitude_spectrum, average_sampling_period
+from utilities.sweep_summary import SweepSummaryStore, reduce_coefficients, source_signature, window_column
+
+
+FORCE_COEFF_COLUMNS = ('time', 'Cd', 'Cs', 'Cl', 'CmRoll', 'CmPitch', 'CmYaw', 'Cd(f)', 'Cd(r)', 'Cs(f)', 'Cs(r)',
+                       'Cl(f)', 'Cl(r)')
+FOLLOW_TAIL_BYTES = 256  # Bytes before the read offset ForceCoeffFollower checks to detect rewritten files
 
 
 class OpenFOAMForceCoeffDataStruct(object):
     pass
 
 
-def plot_coefficents(time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw, title='', save_dir=None, bins=1, show=True):
+def plot_coefficents(time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw, title='', save_dir=None, bins=1, show=True,
+                     backend='Cairo', renderer=None, images=True, data_format=None):
     """
 
     :param np.ndarray time: Array of time values for plotting.
@@ -23,9 +42,12 @@ def plot_coefficents(time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw, title='', save
     :param str title: Title for the plots/output file.
     :param str save_dir: Directory to save plots to, if None images will not be created.
     :param int bins: Number of bins for running average of the data.
+    :param bool show: Show the plots once they are created.
+    :param str backend: Matplotlib backend used to save the images, if None the active backend is used.
+    :param FigureRenderer renderer: Renderer to draw with, if None a renderer is created and closed for this call.
+    :param bool images: Create the plot images, if False only the data is written.
+    :param str data_format: 'csv' or 'npz' to also write the plotted data to save_dir, if None no data is written.
     """
-    fig1, (ax1, ax2) = plt.subplots(2, 1)
-
     avg_cl = moving_avg(cl, bins)
     avg_cd = moving_avg(cd, bins)
     avg_cs = moving_avg(cs, bins)
@@ -35,47 +57,54 @@ def plot_coefficents(time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw, title='', save
     avg_cy = moving_avg(cm_yaw, bins)
 
     excised_time = time[bins:]
-
-    ax1.plot(excised_time, avg_cl)
-    ax1.plot(excised_time, avg_cd)
-    ax1.plot(excised_time, avg_cs)
+    file_title = 'tmp' if title == '' else title
+
+    if save_dir is not None and data_format is not None:
+        write_plot_data(os.path.join(save_dir, file_title), OrderedDict([
+            ('time', excised_time), ('cl', avg_cl), ('cd', avg_cd), ('cs', avg_cs), ('cm_roll', avg_cr),
+            ('cm_pitch', avg_cp), ('cm_yaw', avg_cy)]), data_format)
+    if not show and (not images or save_dir is None):
+        return
+
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = FigureRenderer(figsize=(20, (20 * 9 / 16.0)), dpi=100, interactive=show)
+
+    fig1, (ax1, ax2) = renderer.figure('coefficients', 2, 1, figsize=(20, (20 * 9 / 16.0)), dpi=100)
+    renderer.plot(ax1, excised_time, avg_cl)
+    renderer.plot(ax1, excised_time, avg_cd)
+    renderer.plot(ax1, excised_time, avg_cs)
     ax1.legend(['Cl', 'Cd', 'Cs'])
     ax1.set_title('Force Coeffs: %s' % title)
 
-    ax2.plot(excised_time, avg_cr)
-    ax2.plot(excised_time, avg_cp)
-    ax2.plot(excised_time, avg_cy)
+    renderer.plot(ax2, excised_time, avg_cr)
+    renderer.plot(ax2, excised_time, avg_cp)
+    renderer.plot(ax2, excised_time, avg_cy)
     ax2.legend(['CmRoll', 'CmPitch', 'CmYaw'])
     ax2.set_title('Moment Coeffs: %s' % title)
 
-    fig1.set_size_inches(20, (20 * 9 / 16.0))
+    if save_dir is not None and images:
+        renderer.save(fig1, os.path.join(save_dir, '%s.png' % file_title), backend=backend)
 
-    if save_dir is not None:
-        if title == '':
-            title = 'tmp'
-        fig1.savefig(fname=os.path.join(save_dir, '%s.png' % title), backend='Cairo')
-
-    fig2, (ax3, ax4) = plt.subplots(2, 1)
-    ax3.plot(excised_time, diff(excised_time, avg_cl))
-    ax3.plot(excised_time, diff(excised_time, avg_cd))
-    ax3.plot(excised_time, diff(excised_time, avg_cs))
+    fig2, (ax3, ax4) = renderer.figure('coefficients_diff', 2, 1, figsize=(20, (20 * 9 / 16.0)), dpi=100)
+    renderer.plot(ax3, excised_time, diff(excised_time, avg_cl))
+    renderer.plot(ax3, excised_time, diff(excised_time, avg_cd))
+    renderer.plot(ax3, excised_time, diff(excised_time, avg_cs))
     ax3.legend(['d(Cl)/dt', 'd(Cd)/dt', 'd(Cs)/dt'])
     ax3.set_title('Force Coeffs Diff: %s' % title)
 
-    ax4.plot(excised_time, diff(excised_time, avg_cr))
-    ax4.plot(excised_time, diff(excised_time, avg_cp))
-    ax4.plot(excised_time, diff(excised_time, avg_cy))
+    renderer.plot(ax4, excised_time, diff(excised_time, avg_cr))
+    renderer.plot(ax4, excised_time, diff(excised_time, avg_cp))
+    renderer.plot(ax4, excised_time, diff(excised_time, avg_cy))
     ax4.legend(['d(CmRoll)/dt', 'd(CmPitch)/dt', 'd(CmYaw)/dt'])
     ax4.set_title('Moment Coeffs Diff: %s' % title)
 
-    fig2.set_size_inches(20, (20 * 9 / 16.0))
-
-    if save_dir is not None:
-        if title == '':
-            title = 'tmp'
-        fig2.savefig(fname=os.path.join(save_dir, '%s_diff.png' % title), backend='Cairo')
+    if save_dir is not None and images:
+        renderer.save(fig2, os.path.join(save_dir, '%s_diff.png' % file_title), backend=backend)
     if show:
         plt.show()
+    if own_renderer:
+        renderer.close()
 
 
 def print_stats(val, excise, variable_name):
@@ -87,47 +116,144 @@ def print_stats(val, excise, variable_name):
     print('=' * 80)
 
 
-def moving_avg(val, bins):
-    bin_arr = np.zeros(bins)
-    ret_val = np.zeros(len(val))
-    for idx in range(0, len(val)):
-        bin_arr[idx % bins] = val[idx]
-        if idx < bins:
-            ret_val[idx] = val[idx]
-        else:
-            ret_val[idx] = np.average(bin_arr)
+def moving_avg(val, bins, mode='simple'):
+    """
+    Moving average of a series, computed in O(n) regardless of the number of bins. The first bins samples are
+    dropped from the output so that it lines up with time[bins:].
+
+    :param np.ndarray val: Series to average.
+    :param int bins: Number of samples in the averaging window.
+    :param str mode: 'simple' for a trailing window average, 'centered' for a window centered on each sample (shrunk
+    at the ends of the series), or 'exponential' for an exponential moving average with a span of bins.
+    :return: np.ndarray of length len(val) - bins.
+    """
+    val = np.asarray(val, dtype=np.float64)
+    if mode == 'simple':
+        if val.size <= bins:
+            return np.zeros(0)
+        # Offset by the mean to limit round off error in the cumulative sum of long series
+        offset = np.average(val)
+        csum = np.concatenate(([0.0], np.cumsum(val - offset)))
+        return (csum[bins + 1:] - csum[1:1 + val.size - bins]) / bins + offset
+    elif mode == 'centered':
+        return centered_moving_avg(val, bins)[bins:]
+    elif mode == 'exponential':
+        return exponential_moving_avg(val, bins)[bins:]
+    raise ValueError('Unknown moving average mode: %s' % mode)
+
+
+def centered_moving_avg(val, bins):
+    """
+    Moving average over a window of bins samples centered on each sample. The window is shrunk at the ends of the
+    series so the output is the same length as the input.
 
-    return ret_val[bins:]
+    :param np.ndarray val: Series to average.
+    :param int bins: Number of samples in the averaging window.
+    :return: np.ndarray of length len(val).
+    """
+    val = np.asarray(val, dtype=np.float64)
+    offset = np.average(val) if val.size > 0 else 0.0
+    csum = np.concatenate(([0.0], np.cumsum(val - offset)))
+    idx = np.arange(val.size)
+    start = np.clip(idx - bins // 2, 0, val.size)
+    end = np.clip(idx - bins // 2 + bins, 0, val.size)
+    return (csum[end] - csum[start]) / (end - start) + offset
+
+
+def exponential_moving_avg(val, bins):
+    """
+    Exponential moving average with a smoothing factor of 2 / (bins + 1), initialised with the first sample.
 
+    :param np.ndarray val: Series to average.
+    :param int bins: Span of the average in samples.
+    :return: np.ndarray of length len(val).
+    """
+    val = np.asarray(val, dtype=np.float64)
+    if val.size == 0:
+        return val.copy()
+    alpha = 2.0 / (bins + 1.0)
+    ret_val, _ = lfilter([alpha], [1.0, alpha - 1.0], val, zi=[(1.0 - alpha) * val[0]])
+    return ret_val
 
-def plot_fft(val, save_dir=None, title='', sampling_rate=1e-3):
-    xf = fftfreq(len(val), d=sampling_rate)
-    xf = fftshift(xf)
-    y = rfft(val, len(val))
 
-    plt.semilogy(xf, np.abs(y))
-    plt.title('Force Coeffs Diff: %s' % title)
+def plot_fft(val, save_dir=None, title='', sampling_rate=1e-3, time=None, show=True, backend='Cairo', renderer=None):
+    """
+    Plot the single sided amplitude spectrum of a series, see spectral.amplitude_spectrum for the spectrum itself.
+
+    :param np.ndarray val: Series to transform.
+    :param str save_dir: Directory to save the plot to, if None no image is created.
+    :param str title: Title for the plot/output file.
+    :param float sampling_rate: Time between samples, used if time is not given.
+    :param np.ndarray time: Time of each sample, non-uniform time steps are resampled.
+    :param bool show: Show the plot once it is created.
+    :param str backend: Matplotlib backend used to save the image, if None the active backend is used.
+    :param FigureRenderer renderer: Renderer to draw with, if None a renderer is created and closed for this call.
+    :return: (frequencies, amplitudes)
+    """
+    if time is None:
+        time = np.arange(len(val)) * sampling_rate
+    freqs, amplitude = amplitude_spectrum(time, val)
+    if not show and save_dir is None:
+        return freqs, amplitude
+
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = FigureRenderer(interactive=show)
+    fig, ax = renderer.figure('fft')
+    ax.semilogy(freqs[1:], amplitude[1:])
+    ax.set_xlabel('Frequency [Hz]')
+    ax.set_title('Force Coeffs FFT: %s' % title)
 
     if save_dir is not None:
-        if title == '':
-            title = 'tmp'
-        plt.savefig(fname=os.path.join(save_dir, '%s_diff.png' % title), backend='Cairo')
-    plt.show()
+        file_title = 'tmp' if title == '' else title
+        renderer.save(fig, os.path.join(save_dir, '%s_fft.png' % file_title), backend=backend)
+    if show:
+        plt.show()
+    if own_renderer:
+        renderer.close()
+    return freqs, amplitude
 
 
-def diff(time, val):
-    differencne = np.zeros(len(val))
+def diff(time, val, method='central'):
+    """
+    Time derivative of a series with non-uniform time spacing.
+
+    :param np.ndarray time: Time of each sample.
+    :param np.ndarray val: Series to differentiate.
+    :param str method: 'central' for a central difference across the neighbouring samples, with the end points set to
+    zero, or 'gradient' for the second order accurate non-uniform difference of np.gradient.
+    :return: np.ndarray of length len(val).
+    """
+    val = np.asarray(val, dtype=np.float64)
+    if method == 'gradient':
+        return np.gradient(val, time)
+    elif method != 'central':
+        raise ValueError('Unknown difference method: %s' % method)
 
-    for idx in range(1, len(time) - 1):
-        differencne[idx] = (val[idx + 1] - val[idx - 1]) / (time[idx + 1] - time[idx - 1])
+    time = np.asarray(time, dtype=np.float64)
+    differencne = np.zeros(len(val))
+    if len(val) > 2:
+        differencne[1:-1] = (val[2:] - val[:-2]) / (time[2:len(val)] - time[:len(val) - 2])
 
     return differencne
 
 def get_average_sampling_rate(time):
-    diff = time[1:-1] - time[0:-2]
-    return np.average(diff)
+    """
+    :return: Mean time between samples.
+    """
+    return average_sampling_period(time)
 
 def format_force_data_as_np_arr(data):
+    """
+    Split parsed force coefficient data into the individual coefficient arrays.
+
+    :param data: Structured array from load_force_coeff, or the time keyed dictionary from parse_force_coeff.
+    :return: Tuple of (time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw) arrays sorted by time.
+    """
+    if isinstance(data, np.ndarray):
+        return (data['time'], data['Cd'], data['Cl'], data['Cs'], data['CmRoll'], data['CmPitch'],
+                data['CmYaw'])
+
     keys = sorted(data.keys())
     data_len = len(data)
 
@@ -153,46 +279,414 @@ def format_force_data_as_np_arr(data):
     return time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw
 
 
-def parse_force_coeff(directory, logger, excise=0):
-    files = find_files(directory, 'dat')
-    # Data is contained within a dictionary with the time used as the key, this is primarily to protect against sim
-    # restarts which could produce duplicate data for time steps
-    data = dict()
-    data_keys = {'time': 0, 'Cd': 1, 'Cs': 2, 'Cl': 3, 'CmRoll': 4, 'CmPitch': 5, 'CmYaw': 6, 'Cd(f)': 7, 'Cd(r)': 8,
-                 'Cs(f)': 9, 'Cs(r)': 10, 'Cl(f)': 11, 'Cl(r)': 12}
+def read_force_coeff_header(lines, num_columns=None):
+    """
+    Discover the column names of a force coefficient file from its '#' header lines. The last header line is taken
+    as the column header, with the leading 'Time' column renamed to 'time'. If no usable header is found the default
+    OpenFOAM column ordering is used.
+
+    :param list lines: Header lines of the file, with or without the leading '#'.
+    :param int num_columns: Number of data columns in the file, used to validate the header if given.
+    :return: List of column names.
+    """
+    columns = None
+    for line in reversed(lines):
+        items = line.lstrip('#').split()
+        if len(items) > 1 and items[0].lower() == 'time':
+            columns = ['time'] + items[1:]
+            break
+
+    if columns is None or (num_columns is not None and len(columns) != num_columns):
+        columns = list(FORCE_COEFF_COLUMNS)
+        if num_columns is not None:
+            columns = columns[:num_columns] + ['col%s' % idx for idx in range(len(columns), num_columns)]
+
+    return columns
+
+
+def read_force_coeff_file(file):
+    """
+    Read a single force coefficient .dat file into a structured array in one bulk parse. Only complete lines are
+    read, so files that are still being written to by a running case can be safely parsed.
+
+    :param file: Path to the .dat file.
+    :return: Structured np.ndarray with one field per column, in file order.
+    """
+    with open(file, 'r') as data_file:
+        text = data_file.read()
+
+    return parse_force_coeff_text(text)[0]
+
+
+def parse_force_coeff_text(text, header=None):
+    """
+    Parse the complete lines of a block of force coefficient file text into a structured array.
+
+    :param str text: Text to parse, a partially written trailing line is ignored.
+    :param list header: Header lines already read from earlier in the same file, used to name the columns when the
+    text does not contain its own header.
+    :return: tuple of (structured np.ndarray, list of every header line seen so far)
+    """
+    header = list() if header is None else list(header)
+
+    # Drop a partially written trailing line
+    text = text[:text.rfind('\n') + 1]
+
+    body_start = 0
+    while body_start < len(text) and text.startswith('#', body_start):
+        line_end = text.find('\n', body_start) + 1
+        header.append(text[body_start:line_end])
+        body_start = line_end
+    body = text[body_start:]
+    if '#' in body:
+        # Headers repeated mid-file (e.g. from a restart appending to the same file)
+        lines = body.splitlines(keepends=True)
+        header += [line for line in lines if line.startswith('#')]
+        body = ''.join([line for line in lines if not line.startswith('#')])
+
+    first_line = body[:body.find('\n')]
+    num_columns = len(first_line.split())
+    columns = read_force_coeff_header(header, num_columns if num_columns > 0 else None)
+    dtype = np.dtype([(name, np.float64) for name in columns])
+
+    if num_columns == 0:
+        return np.zeros(0, dtype=dtype), header
+
+    try:
+        values = np.fromstring(body, sep=' ')
+    except ValueError:
+        values = None
+    if values is None or values.size != body.count('\n') * num_columns:
+        # A short or malformed line (e.g. a write truncated by a restart) would shift every later row into the wrong
+        # columns of the flat parse, so fall back to parsing line by line and dropping the lines that do not fit
+        values = _parse_force_coeff_lines(body, num_columns)
+    values = values.reshape(-1, num_columns)
+
+    arr = np.empty(values.shape[0], dtype=dtype)
+    for idx, name in enumerate(columns):
+        arr[name] = values[:, idx]
+    return arr, header
+
+
+def _parse_force_coeff_lines(body, num_columns):
+    rows = list()
+    for line in body.splitlines():
+        fields = line.split()
+        if len(fields) != num_columns:
+            continue
+        try:
+            rows.append([float(field) for field in fields])
+        except ValueError:
+            continue
+    return np.array(rows, dtype=np.float64).reshape(-1, num_columns)
+
+
+def merge_force_coeff_arrays(arrays, excise=0):
+    """
+    Merge force coefficient arrays from multiple files into a single time sorted array. Duplicate time steps produced
+    by simulation restarts are removed, with the value read last taking precedence.
+
+    :param list arrays: Structured arrays to merge, in read order.
+    :param float excise: Time values below this are dropped.
+    :return: Structured np.ndarray sorted by time.
+    """
+    arrays = [arr for arr in arrays if arr.size > 0]
+    if len(arrays) == 0:
+        return np.zeros(0, dtype=np.dtype([(name, np.float64) for name in FORCE_COEFF_COLUMNS]))
+
+    names = arrays[0].dtype.names
+    arrays = [arr[list(names)] if arr.dtype.names != names else arr for arr in arrays]
+    merged = np.concatenate(arrays)
+    merged = merged[merged['time'] >= excise]
+
+    # Reversed so that np.unique picks up the last occurrence of each time step
+    _, rev_idx = np.unique(merged['time'][::-1], return_index=True)
+    return merged[merged.size - 1 - rev_idx]
+
+
+def load_force_coeff(directory, logger, excise=0, use_cache=True, cache_dir=None, files=None):
+    """
+    Load every force coefficient .dat file below a directory into a single structured array.
+
+    :param directory: Directory of the forceCoeffs function object, e.g. postProcessing/forceCoeffs.
+    :param logger: Logger instance.
+    :param float excise: Time values below this are dropped.
+    :param bool use_cache: Read/write parsed files through the binary cache, see utilities.parse_cache.
+    :param str cache_dir: Directory for the cache entries, if None they are written next to each .dat file.
+    :param list files: The .dat files to load, if None the directory is searched for them.
+    :return: Structured np.ndarray with one field per column, sorted by time with restarts removed.
+    """
+    if files is None:
+        files = find_files(directory, 'dat')
+    files = sorted(files, key=_time_directory_sort_key)
+    arrays = list()
     for file in files:
         logger.info('Opening File: %s ' % file)
-        with open(file) as data_file:
-            for line in data_file.readlines():
-                if '#' not in line:
-                    items = line.split('\t')
-                    # logger.info('time: %s' % items[data_keys['time']])
-                    if float(items[data_keys['time']]) >= excise:
-                        data[float(items[data_keys['time']])] = {'Cd': float(items[data_keys['Cd']]),
-                                                                 'Cs': float(items[data_keys['Cs']]),
-                                                                 'Cl': float(items[data_keys['Cl']]),
-                                                                 'CmRoll': float(items[data_keys['CmRoll']]),
-                                                                 'CmPitch': float(items[data_keys['CmPitch']]),
-                                                                 'CmYaw': float(items[data_keys['CmYaw']]),
-                                                                 'Cd(f)': float(items[data_keys['Cd(f)']]),
-                                                                 'Cd(r)': float(items[data_keys['Cd(r)']]),
-                                                                 'Cs(f)': float(items[data_keys['Cs(f)']]),
-                                                                 'Cs(r)': float(items[data_keys['Cs(r)']]),
-                                                                 'Cl(f)': float(items[data_keys['Cl(f)']]),
-                                                                 'Cl(r)': float(items[data_keys['Cl(r)']]),
-                                                                 }
+        arrays.append(cached_parse(file, read_force_coeff_file, use_cache=use_cache, cache_dir=cache_dir,
+                                   tag='force_coeff'))
+
+    return merge_force_coeff_arrays(arrays, excise=excise)
+
+
+def parse_force_coeff(directory, logger, excise=0, use_cache=True, cache_dir=None):
+    """
+    Dictionary interface to load_force_coeff, the time is used as the key for each row.
+
+    :param directory: Directory of the forceCoeffs function object, e.g. postProcessing/forceCoeffs.
+    :param logger: Logger instance.
+    :param float excise: Time values below this are dropped.
+    :param bool use_cache: Read/write parsed files through the binary cache, see utilities.parse_cache.
+    :param str cache_dir: Directory for the cache entries, if None they are written next to each .dat file.
+    :return: dict of {time: {column: value}}
+    """
+    arr = load_force_coeff(directory, logger, excise=excise, use_cache=use_cache, cache_dir=cache_dir)
+    names = [name for name in arr.dtype.names if name != 'time']
+    data = dict()
+    for time, row in zip(arr['time'].tolist(), arr[names].tolist()):
+        data[time] = dict(zip(names, row))
 
     return data
 
 
-def find_files(directory, file_ext):
+class ForceCoeffFollower(object):
+    """
+    Follows the force coefficient files of a running case, only reading the lines appended since the last poll.
+    Running statistics and the trailing moving average are updated from the new rows only, so polling a long running
+    case is cheap.
+
+    e.x: follower = ForceCoeffFollower('case/postProcessing/forceCoeffs', logger, averaging_window=400)
+         for samples in follower.follow(interval=1.0):
+             print(follower.moving_average['Cl'], follower.stats['Cl']['stdev'])
+    """
+
+    def __init__(self, directory, logger=None, averaging_window=400, excise=0):
+        """
+        :param directory: Directory of the forceCoeffs function object, e.g. postProcessing/forceCoeffs.
+        :param logger: Logger instance, if not given the default Python instance is taken.
+        :param int averaging_window: Number of trailing samples in the moving average.
+        :param float excise: Time values below this are ignored.
+        """
+        if logger is None:
+            logger = logging.getLogger()
+        self._logger = logger
+
+        self.directory = directory
+        self.averaging_window = averaging_window
+        self.excise = excise
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every sample read so far, the next poll reads the force coefficient files from the start.
+        """
+        self.offsets = dict()
+        self._headers = dict()
+        self._signatures = dict()
+
+        self.columns = None
+        self.count = 0
+        self.last_time = -np.inf
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+
+        self._window = None
+        self._window_sum = None
+        self._window_pos = 0
+        self._window_fill = 0
+        self._window_updates = 0
+
+    def poll(self):
+        """
+        Read every complete line appended to the force coefficient files since the last poll. New restart files are
+        picked up as they appear. A restart that rewrites times already seen, by appending them or by truncating,
+        rewriting or replacing a file (detected from its inode, mtime and the bytes read last), resets the follower
+        and every file is read again, so the statistics match load_force_coeff with the rewritten values taking precedence.
+
+        :return: Structured np.ndarray of the new samples, sorted by time, or of every sample after a reset.
+        """
+        rows = self._read_new_rows()
+        if rows.size > 0 and rows['time'][0] <= self.last_time:
+            self._logger.info('Time went back from %g to %g, re-reading %s' % (self.last_time, rows['time'][0],
+                                                                              self.directory))
+            self.reset()
+            rows = self._read_new_rows()
+        if rows.size == 0:
+            return rows
+        if self.columns is None:
+            self._init_columns(rows.dtype)
+
+        rows = rows[list(self.columns)]
+        self._update(rows)
+        return rows
+
+    def _read_new_rows(self):
+        files = sorted(find_files(self.directory, 'dat'), key=_time_directory_sort_key)
+        new_rows = list()
+        for file in files:
+            offset = self.offsets.get(file, 0)
+            stat = os.stat(file)
+            inode, mtime_ns, tail = self._signatures.get(file, (None, None, b''))
+            if offset > 0 and (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (inode, mtime_ns, offset):
+                continue
+            with open(file, 'rb') as data_file:
+                data_file.seek(offset - len(tail))
+                chunk = data_file.read()
+                # A restart truncating, rewriting or replacing the file changes the bytes read last, read it again
+                # from the start. Its earlier times then trigger a reset in poll.
+                if offset > 0 and (stat.st_ino != inode or not chunk.startswith(tail)):
+                    offset, tail = 0, b''
+                    self._headers.pop(file, None)
+                    data_file.seek(0)
+                    chunk = data_file.read()
+            chunk = chunk[len(tail):]
+            chunk = chunk[:chunk.rfind(b'\n') + 1]
+            self._signatures[file] = (stat.st_ino, stat.st_mtime_ns, (tail + chunk)[-FOLLOW_TAIL_BYTES:])
+            if len(chunk) == 0:
+                continue
+            if offset == 0:
+                self._logger.info('Following File: %s ' % file)
+            self.offsets[file] = offset + len(chunk)
+
+            arr, self._headers[file] = parse_force_coeff_text(chunk.decode(), self._headers.get(file))
+            if arr.size > 0:
+                new_rows.append(arr)
+
+        return merge_force_coeff_arrays(new_rows, excise=self.excise)
+
+    def follow(self, interval=1.0, timeout=None):
+        """
+        Generator polling the files, yielding each non-empty block of new samples.
+
+        :param float interval: Seconds to wait between polls.
+        :param float timeout: Stop after this many seconds without new samples, if None follow forever.
+        """
+        last_data = time_module.monotonic()
+        while True:
+            rows = self.poll()
+            if rows.size > 0:
+                last_data = time_module.monotonic()
+                yield rows
+            elif timeout is not None and time_module.monotonic() - last_data > timeout:
+                return
+            else:
+                time_module.sleep(interval)
+
+    async def afollow(self, interval=1.0, timeout=None):
+        """
+        Asynchronous version of follow, for use with 'async for'.
+
+        :param float interval: Seconds to wait between polls.
+        :param float timeout: Stop after this many seconds without new samples, if None follow forever.
+        """
+        loop = asyncio.get_running_loop()
+        last_data = time_module.monotonic()
+        while True:
+            # poll reads and parses the files, keep that blocking work off the event loop
+            rows = await loop.run_in_executor(None, self.poll)
+            if rows.size > 0:
+                last_data = time_module.monotonic()
+                yield rows
+            elif timeout is not None and time_module.monotonic() - last_data > timeout:
+                return
+            else:
+                await asyncio.sleep(interval)
+
+    @property
+    def stats(self):
+        """
+        Running statistics of every coefficient, matching the values printed by print_stats.
+
+        :return: dict of {column: {'average', 'stdev', 'min', 'max', 'count'}}
+        """
+        if self.count == 0:
+            return dict()
+        stdev = np.sqrt(self._m2 / self.count)
+        return {name: {'average': self._mean[idx], 'stdev': stdev[idx], 'min': self._min[idx],
+                       'max': self._max[idx], 'count': self.count}
+                for idx, name in enumerate(self.columns) if name != 'time'}
+
+    @property
+    def moving_average(self):
+        """
+        Average of every coefficient over the last averaging_window samples.
+
+        :return: dict of {column: value}
+        """
+        if self._window_fill == 0:
+            return dict()
+        avg = self._window_sum / self._window_fill
+        return {name: avg[idx] for idx, name in enumerate(self.columns) if name != 'time'}
+
+    def _init_columns(self, dtype):
+        self.columns = dtype.names
+        num_columns = len(self.columns)
+        self._mean = np.zeros(num_columns)
+        self._m2 = np.zeros(num_columns)
+        self._min = np.full(num_columns, np.inf)
+        self._max = np.full(num_columns, -np.inf)
+        self._window = np.zeros([self.averaging_window, num_columns])
+        self._window_sum = np.zeros(num_columns)
+
+    def _update(self, rows):
+        values = structured_to_unstructured(rows, dtype=np.float64)
+
+        # Chan et al. pairwise combination of the running and new block mean/variance
+        num_new = values.shape[0]
+        new_mean = values.mean(axis=0)
+        new_m2 = ((values - new_mean) ** 2).sum(axis=0)
+        total = self.count + num_new
+        delta = new_mean - self._mean
+        self._mean = self._mean + delta * num_new / total
+        self._m2 = self._m2 + new_m2 + delta ** 2 * self.count * num_new / total
+        self.count = total
+        self._min = np.minimum(self._min, values.min(axis=0))
+        self._max = np.maximum(self._max, values.max(axis=0))
+        self.last_time = rows['time'][-1]
+
+        self._update_window(values)
+
+    def _update_window(self, values):
+        window = self.averaging_window
+        values = values[-window:]
+        num_new = values.shape[0]
+        idx = (self._window_pos + np.arange(num_new)) % window
+        if self._window_fill + num_new > window:
+            num_evicted = self._window_fill + num_new - window
+            self._window_sum -= self._window[idx[num_new - num_evicted:]].sum(axis=0)
+        self._window[idx] = values
+        self._window_sum += values.sum(axis=0)
+        self._window_pos = (self._window_pos + num_new) % window
+        self._window_fill = min(self._window_fill + num_new, window)
+
+        # Periodically re-sum the window to stop round off error accumulating in the running sum
+        self._window_updates += num_new
+        if self._window_updates >= window:
+            self._window_sum = self._window[:self._window_fill].sum(axis=0)
+            self._window_updates = 0
+
+
+def _time_directory_sort_key(path):
+    # Restarts are written into a directory named after their start time, sort those numerically
+    try:
+        return float(Path(path).parent.name), str(path)
+    except ValueError:
+        return float('inf'), str(path)
+
+
+def find_files(directory, file_ext, index=None):
+    if index is not None:
+        return index.find_files(directory, file_ext)
     files = list()
     for path in Path(directory).rglob('*.%s' % file_ext):
         files.append(path)
     return files
 
 
-def find_directory(top_directory, directory_name):
+def find_directory(top_directory, directory_name, index=None):
+    if index is not None:
+        return index.find_directory(directory_name)
     directory_paths = list()
     for direct in Path(top_directory).rglob('*%s*' % directory_name):
         if os.path.isdir(direct):
@@ -200,9 +694,33 @@ def find_directory(top_directory, directory_name):
     return directory_paths
 
 
-def aoa_aircraft_analysis(top_level_directory, logger, output_directory, force_coeff_widget_name, averaging_window=400):
-    directories_to_parse = find_directory(top_level_directory, 'AOA_0Flap')
-    collected_data = dict()
+def aoa_aircraft_analysis(top_level_directory, logger, output_directory, force_coeff_widget_name, averaging_window=400,
+                          cache_dir=None, workers=None, images=True, data_format=None, summary_store=None,
+                          index=None):
+    """
+    Reduce and plot every angle of attack case below a directory.
+
+    :param top_level_directory: Directory containing the '<aoa>AOA_0Flap' case directories.
+    :param logger: Logger instance.
+    :param output_directory: Directory to save the plots to.
+    :param str force_coeff_widget_name: Name of the forceCoeffs function object in postProcessing.
+    :param averaging_window: Number of samples at the end of each case to average, or 'auto' to average each case
+    over the steady state detected by utilities.convergence.
+    :param str cache_dir: Directory for the parse cache, if None cache entries are written next to each .dat file.
+    :param int workers: Number of worker processes to reduce the cases with, if None or 1 the cases are reduced
+    serially.
+    :param bool images: Create the plot images, if False only the data is written.
+    :param str data_format: 'csv' or 'npz' to also write the plotted data, if None no data is written.
+    :param summary_store: SweepSummaryStore or path of its .npz file. If given, cases already in the store with
+    unchanged .dat files are not re-read, and the store is updated with the newly reduced cases.
+    :param CaseIndex index: Index of the case tree, if None the tree is indexed with a single walk.
+    """
+    if index is None:
+        index = CaseIndex(top_level_directory)
+    directories_to_parse = find_directory(top_level_directory, 'AOA_0Flap', index=index)
+    cases = dict()
+    case_files = dict()
+    metadata = dict()
     for directory in directories_to_parse:
         folder_name = os.path.split(directory)[1]
         aoa = folder_name[:folder_name.find('AOA')]
@@ -211,15 +729,22 @@ def aoa_aircraft_analysis(top_level_directory, logger, output_directory, force_c
             aoa = -int(aoa[1:])
         else:
             aoa = int(aoa)
-        if os.path.exists(os.path.join(directory, 'postProcessing', force_coeff_widget_name)):
-            data = parse_force_coeff(os.path.join(directory, 'postProcessing', force_coeff_widget_name),
-                                     logger, excise=400)
-            (time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw) = format_force_data_as_np_arr(data)
-            plot_coefficents(time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw, title=folder_name,
-                             save_dir=output_directory,
-                             show=False, bins=1)
-            collected_data[aoa] = {'cl': cl, 'cd': cd, 'cs': cs, 'cm_roll': cm_roll, 'cm_pitch': cm_pitch,
-                                   'cm_yaw': cm_yaw}
+        force_coeff_dir = os.path.join(directory, 'postProcessing', force_coeff_widget_name)
+        if force_coeff_dir in index:
+            cases[aoa] = (force_coeff_dir, folder_name)
+            case_files[aoa] = index.find_files(force_coeff_dir, 'dat')
+            flap = folder_name[folder_name.find('AOA_') + 4:folder_name.find('Flap')]
+            metadata[aoa] = {'sweep': 'aoa', 'aoa': aoa, 'flap': float(flap.replace('m', '-')),
+                             'widget': force_coeff_widget_name}
+
+    if summary_store is None:
+        collected_data = reduce_sweep_cases(cases, logger, output_directory, averaging_window, cache_dir=cache_dir,
+                                            workers=workers, images=images, data_format=data_format,
+                                            case_files=case_files)
+    else:
+        collected_data = summarised_sweep_cases(cases, metadata, summary_store, logger, output_directory,
+                                                averaging_window, cache_dir=cache_dir, workers=workers,
+                                                images=images, data_format=data_format, case_files=case_files)
     aoa_list = list()
     cl = list()
     cd = list()
@@ -231,65 +756,282 @@ def aoa_aircraft_analysis(top_level_directory, logger, output_directory, force_c
 
     for aoa in sorted(collected_data.keys()):
         aoa_list.append(aoa)
-        cl.append(np.average(collected_data[aoa]['cl'][-averaging_window:]))
-        cd.append(np.average(collected_data[aoa]['cd'][-averaging_window:]))
-        cs.append(np.average(collected_data[aoa]['cs'][-averaging_window:]))
-        cm_roll.append(np.average(collected_data[aoa]['cm_roll'][-averaging_window:]))
-        cm_yaw.append(np.average(collected_data[aoa]['cm_yaw'][-averaging_window:]))
-        cm_pitch.append(np.average(collected_data[aoa]['cm_pitch'][-averaging_window:]))
+        cl.append(collected_data[aoa]['cl'])
+        cd.append(collected_data[aoa]['cd'])
+        cs.append(collected_data[aoa]['cs'])
+        cm_roll.append(collected_data[aoa]['cm_roll'])
+        cm_yaw.append(collected_data[aoa]['cm_yaw'])
+        cm_pitch.append(collected_data[aoa]['cm_pitch'])
 
         cl_cd.append(cl[-1] / cd[-1])
 
-    plot_aoa_analysis(aoa_list, cl, cd, cl_cd, cs, cm_roll, cm_pitch, cm_yaw, output_directory)
+    plot_aoa_analysis(aoa_list, cl, cd, cl_cd, cs, cm_roll, cm_pitch, cm_yaw, output_directory, images=images,
+                      data_format=data_format)
+
+
+def reduce_sweep_case(force_coeff_dir, folder_name, logger, output_directory, averaging_window, cache_dir=None,
+                      backend='Cairo', renderer=None, images=True, data_format=None, files=None):
+    """
+    Parse, plot and reduce a single sweep case to the average of each coefficient over the averaging window.
+
+    :param force_coeff_dir: Directory of the forceCoeffs function object for the case.
+    :param str folder_name: Name of the case directory, used as the plot title.
+    :param logger: Logger instance.
+    :param output_directory: Directory to save the plots to.
+    :param averaging_window: Number of samples at the end of the case to average, or 'auto'.
+    :param str cache_dir: Directory for the parse cache.
+    :param str backend: Matplotlib backend used to save the plots, if None the active backend is used.
+    :param FigureRenderer renderer: Renderer to draw the plots with, if None one is created for this case.
+    :param bool images: Create the plot images, if False only the data is written.
+    :param str data_format: 'csv' or 'npz' to also write the plotted data, if None no data is written.
+    :param list files: The .dat files of the case, if None the force_coeff_dir is searched for them.
+    :return: dict of averaged coefficients, keyed 'cl', 'cd', 'cs', 'cm_roll', 'cm_pitch' and 'cm_yaw', along with
+    their stdev/min/max over the averaging window, see sweep_summary.reduce_coefficients.
+    """
+    data = load_force_coeff(force_coeff_dir, logger, excise=400, cache_dir=cache_dir, files=files)
+    (time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw) = format_force_data_as_np_arr(data)
+    plot_coefficents(time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw, title=folder_name,
+                     save_dir=output_directory,
+                     show=False, bins=1, backend=backend, renderer=renderer, images=images, data_format=data_format)
+
+    return reduce_coefficients(time, {'cl': cl, 'cd': cd, 'cs': cs, 'cm_roll': cm_roll, 'cm_pitch': cm_pitch,
+                                      'cm_yaw': cm_yaw}, averaging_window)
 
 
-def plot_aoa_analysis(aoa, cl, cd, cl_cd, cs, cm_roll, cm_pitch, cm_yaw, save_dir):
-    plt.figure(figsize=(16, 9), dpi=160)
-    plt.plot(cd, cl)
-    plt.title('Cl vs Cd')
-    plt.savefig(fname=os.path.join(save_dir, 'cl_vs_cd.png'), backend='svg')
+def reduce_sweep_cases(cases, logger, output_directory, averaging_window, cache_dir=None, workers=None, images=True,
+                       data_format=None, case_files=None):
+    """
+    Run reduce_sweep_case over every case of a sweep, optionally in a process pool. Only the reduced values and the
+    log records are returned from the workers, and the workers render their plots with the Agg backend.
+
+    :param dict cases: {key: (force_coeff_dir, folder_name)} for each case, where key is the sweep variable.
+    :param logger: Logger instance, the records the workers log at its effective level are handled by it in this
+    process once their case is reduced.
+    :param output_directory: Directory to save the plots to.
+    :param averaging_window: Number of samples at the end of each case to average, or 'auto'.
+    :param str cache_dir: Directory for the parse cache.
+    :param int workers: Number of worker processes, if None or 1 the cases are reduced serially.
+    :param bool images: Create the plot images, if False only the data is written.
+    :param str data_format: 'csv' or 'npz' to also write the plotted data, if None no data is written.
+    :param dict case_files: {key: list of .dat files} for each case, if None each case directory is searched.
+    :return: dict of {key: reduced values} ordered by key.
+    """
+    keys = sorted(cases.keys())
+    if case_files is None:
+        case_files = dict()
+    if workers is None or workers <= 1 or len(keys) <= 1:
+        with FigureRenderer() as renderer:
+            results = [reduce_sweep_case(cases[key][0], cases[key][1], logger, output_directory, averaging_window,
+                                         cache_dir=cache_dir, renderer=renderer, images=images,
+                                         data_format=data_format, files=case_files.get(key)) for key in keys]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker) as executor:
+            futures = [executor.submit(_reduce_sweep_case_worker, cases[key][0], cases[key][1], logger.name,
+                                       logger.getEffectiveLevel(), output_directory, averaging_window, cache_dir,
+                                       images, data_format, case_files.get(key)) for key in keys]
+            results = list()
+            for future in futures:
+                result, records = future.result()
+                # The workers only collect their records, they are emitted by the handlers of this process
+                for record in records:
+                    logger.handle(record)
+                results.append(result)
+
+    return dict(zip(keys, results))
+
+
+def summarised_sweep_cases(cases, metadata, summary_store, logger, output_directory, averaging_window, cache_dir=None,
+                           workers=None, images=True, data_format=None, case_files=None):
+    """
+    Reduce the cases of a sweep through a SweepSummaryStore. Only cases that are missing from the store, were reduced
+    with a different averaging window or whose .dat files have changed are re-read, the rest are taken from the store.
+
+    :param dict cases: {key: (force_coeff_dir, folder_name)} for each case, where key is the sweep variable.
+    :param dict metadata: {key: dict} of extra summary columns for each case, e.g. aoa, re, flap and widget.
+    :param summary_store: SweepSummaryStore or path of its .npz file.
+    :param dict case_files: {key: list of .dat files} for each case, if None each case directory is searched.
+    :return: dict of {key: summary row} ordered by key.
+    """
+    if case_files is None:
+        case_files = {key: find_files(cases[key][0], 'dat') for key in cases}
+    if not isinstance(summary_store, SweepSummaryStore):
+        summary_store = SweepSummaryStore(summary_store)
+
+    signatures = dict()
+    collected_data = dict()
+    stale_cases = dict()
+    for key, (force_coeff_dir, folder_name) in cases.items():
+        signatures[key] = source_signature(case_files[key])
+        row = summary_store.get_case(str(force_coeff_dir), signatures[key], averaging_window)
+        if row is None:
+            stale_cases[key] = cases[key]
+        else:
+            collected_data[key] = row
+    logger.info('%s of %s cases up to date in the sweep summary' % (len(collected_data), len(cases)))
+
+    reduced = reduce_sweep_cases(stale_cases, logger, output_directory, averaging_window, cache_dir=cache_dir,
+                                 workers=workers, images=images, data_format=data_format, case_files=case_files)
+    rows = list()
+    for key, values in reduced.items():
+        row = dict(values)
+        row.update(metadata.get(key, dict()))
+        row.update({'case': str(cases[key][0]), 'folder_name': cases[key][1],
+                    'averaging_window': window_column(averaging_window),
+                    'source_mtime_ns': signatures[key][0], 'source_size': signatures[key][1]})
+        rows.append(row)
+        collected_data[key] = row
 
-    plt.figure(figsize=(16, 9), dpi=160)
-    plt.plot(aoa, cl)
-    plt.title('Cl vs AoA')
-    plt.savefig(fname=os.path.join(save_dir, 'cl_vs_aoa.png'), backend='svg')
+    summary_store.upsert(rows)
+    if summary_store.path is not None and len(rows) > 0:
+        summary_store.save()
 
-    plt.figure(figsize=(16, 9), dpi=160)
-    plt.plot(aoa, cd)
-    plt.title('Cd vs AoA')
-    plt.savefig(fname=os.path.join(save_dir, 'cd_vs_aoa.png'), backend='svg')
+    return {key: collected_data[key] for key in sorted(collected_data.keys())}
 
-    plt.figure(figsize=(16, 9), dpi=160)
-    plt.plot(aoa, cl_cd)
-    plt.title('Cl/Cd vs AoA')
-    plt.savefig(fname=os.path.join(save_dir, 'cl_cd_vs_aoa.png'), backend='svg')
 
-    plt.figure(figsize=(16, 9), dpi=160)
-    plt.plot(aoa, cm_roll)
-    plt.plot(aoa, cm_pitch)
-    plt.plot(aoa, cm_yaw)
-    plt.title('Moment Coeff vs AoA')
-    plt.legend(['cm_roll', 'cm_pitch', 'cm_yaw'])
-    plt.savefig(fname=os.path.join(save_dir, 'moment_coeff_vs_aoa.png'), backend='svg')
+_worker_renderer = None
+_worker_records = None
+
+
+class _RecordCollector(logging.Handler):
+    """
+    Keeps the records logged in a pool worker so they can be returned to the parent process with the result.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = list()
+
+    def emit(self, record):
+        # The arguments and traceback may not pickle, so they are merged into the message
+        record.msg = self.format(record)
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        self.records.append(record)
+
+
+def _reduce_sweep_case_worker(force_coeff_dir, folder_name, logger_name, logger_level, output_directory,
+                              averaging_window, cache_dir, images, data_format, files):
+    # Each worker process keeps one renderer so its figures are reused across the cases it is given
+    global _worker_renderer, _worker_records
+    if _worker_renderer is None:
+        _worker_renderer = FigureRenderer()
+    logger = logging.getLogger(logger_name)
+    if _worker_records is None:
+        # Only collect, handlers inherited from a forked parent would emit every record twice
+        _worker_records = _RecordCollector()
+        logger.handlers = [_worker_records]
+        logger.propagate = False
+    logger.setLevel(logger_level)
+    del _worker_records.records[:]
+
+    result = reduce_sweep_case(force_coeff_dir, folder_name, logger, output_directory, averaging_window,
+                               cache_dir=cache_dir, backend='agg', renderer=_worker_renderer, images=images,
+                               data_format=data_format, files=files)
+    return result, list(_worker_records.records)
+
+
+def plot_aoa_analysis(aoa, cl, cd, cl_cd, cs, cm_roll, cm_pitch, cm_yaw, save_dir, renderer=None, images=True,
+                      data_format=None):
+    """
+    Plot the polars of an angle of attack sweep.
+
+    :param FigureRenderer renderer: Renderer to draw with, if None a headless renderer is created for this call.
+    :param bool images: Create the plot images, if False only the data is written.
+    :param str data_format: 'csv' or 'npz' to also write the polar data to save_dir, if None no data is written.
+    """
+    if data_format is not None:
+        write_plot_data(os.path.join(save_dir, 'aoa_polar'), OrderedDict([
+            ('aoa', aoa), ('cl', cl), ('cd', cd), ('cl_cd', cl_cd), ('cs', cs), ('cm_roll', cm_roll),
+            ('cm_pitch', cm_pitch), ('cm_yaw', cm_yaw)]), data_format)
+    if not images:
+        return
+
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = FigureRenderer(figsize=(16, 9), dpi=160)
+
+    fig, ax = renderer.figure('polar')
+    ax.plot(cd, cl)
+    ax.set_title('Cl vs Cd')
+    renderer.save(fig, os.path.join(save_dir, 'cl_vs_cd.png'))
+
+    fig, ax = renderer.figure('polar')
+    ax.plot(aoa, cl)
+    ax.set_title('Cl vs AoA')
+    renderer.save(fig, os.path.join(save_dir, 'cl_vs_aoa.png'))
+
+    fig, ax = renderer.figure('polar')
+    ax.plot(aoa, cd)
+    ax.set_title('Cd vs AoA')
+    renderer.save(fig, os.path.join(save_dir, 'cd_vs_aoa.png'))
+
+    fig, ax = renderer.figure('polar')
+    ax.plot(aoa, cl_cd)
+    ax.set_title('Cl/Cd vs AoA')
+    renderer.save(fig, os.path.join(save_dir, 'cl_cd_vs_aoa.png'))
+
+    fig, ax = renderer.figure('polar')
+    ax.plot(aoa, cm_roll)
+    ax.plot(aoa, cm_pitch)
+    ax.plot(aoa, cm_yaw)
+    ax.set_title('Moment Coeff vs AoA')
+    ax.legend(['cm_roll', 'cm_pitch', 'cm_yaw'])
+    renderer.save(fig, os.path.join(save_dir, 'moment_coeff_vs_aoa.png'))
+
+    if own_renderer:
+        renderer.close()
 
 
 def reynold_aircraft_analysis(top_level_directory, logger, output_directory, force_coeff_widget_name, s, rho, l_ref,
-                              averaging_window=400):
-    directories_to_parse = find_directory(top_level_directory, '_RE')
-    collected_data = dict()
+                              averaging_window=400, cache_dir=None, workers=None, images=True, data_format=None,
+                              summary_store=None, index=None):
+    """
+    Reduce and plot every Reynolds number case below a directory.
+
+    :param top_level_directory: Directory containing the '<name>_<re>_RE' case directories.
+    :param logger: Logger instance.
+    :param output_directory: Directory to save the plots to.
+    :param str force_coeff_widget_name: Name of the forceCoeffs function object in postProcessing.
+    :param float s: Reference area [m²].
+    :param float rho: Air density [kg/m³].
+    :param float l_ref: Reference length [m].
+    :param averaging_window: Number of samples at the end of each case to average, or 'auto' to average each case
+    over the steady state detected by utilities.convergence.
+    :param str cache_dir: Directory for the parse cache, if None cache entries are written next to each .dat file.
+    :param int workers: Number of worker processes to reduce the cases with, if None or 1 the cases are reduced
+    serially.
+    :param bool images: Create the plot images, if False only the data is written.
+    :param str data_format: 'csv' or 'npz' to also write the plotted data, if None no data is written.
+    :param summary_store: SweepSummaryStore or path of its .npz file. If given, cases already in the store with
+    unchanged .dat files are not re-read, and the store is updated with the newly reduced cases.
+    :param CaseIndex index: Index of the case tree, if None the tree is indexed with a single walk.
+    """
+    if index is None:
+        index = CaseIndex(top_level_directory)
+    directories_to_parse = find_directory(top_level_directory, '_RE', index=index)
+    cases = dict()
+    case_files = dict()
+    metadata = dict()
     for directory in directories_to_parse:
         folder_name = os.path.split(directory)[1]
         re = float(folder_name.split('_')[1])
         logger.debug(re)
-        if os.path.exists(os.path.join(directory, 'postProcessing', force_coeff_widget_name)):
-            data = parse_force_coeff(os.path.join(directory, 'postProcessing', force_coeff_widget_name),
-                                     logger, excise=400)
-            (time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw) = format_force_data_as_np_arr(data)
-            plot_coefficents(time, cd, cl, cs, cm_roll, cm_pitch, cm_yaw, title=folder_name,
-                             save_dir=output_directory,
-                             show=False, bins=1)
-            collected_data[re] = {'cl': cl, 'cd': cd, 'cs': cs, 'cm_roll': cm_roll, 'cm_pitch': cm_pitch,
-                                   'cm_yaw': cm_yaw}
+        force_coeff_dir = os.path.join(directory, 'postProcessing', force_coeff_widget_name)
+        if force_coeff_dir in index:
+            cases[re] = (force_coeff_dir, folder_name)
+            case_files[re] = index.find_files(force_coeff_dir, 'dat')
+            metadata[re] = {'sweep': 're', 're': re, 'widget': force_coeff_widget_name}
+
+    if summary_store is None:
+        collected_data = reduce_sweep_cases(cases, logger, output_directory, averaging_window, cache_dir=cache_dir,
+                                            workers=workers, images=images, data_format=data_format,
+                                            case_files=case_files)
+    else:
+        collected_data = summarised_sweep_cases(cases, metadata, summary_store, logger, output_directory,
+                                                averaging_window, cache_dir=cache_dir, workers=workers,
+                                                images=images, data_format=data_format, case_files=case_files)
     re_list = list()
     cl = list()
     lift = list()
@@ -310,135 +1052,164 @@ def reynold_aircraft_analysis(top_level_directory, logger, output_directory, for
         u = (re * 1.5E-5) / l_ref
         vel.append(u)
         q = 0.5 * s * rho * u ** 2
-        cl.append(np.average(collected_data[re]['cl'][-averaging_window:]))
+        cl.append(collected_data[re]['cl'])
         print(cl[-1])
         lift.append(cl[-1] * q / 9.81)
-        cd.append(np.average(collected_data[re]['cd'][-averaging_window:]))
+        cd.append(collected_data[re]['cd'])
         drag.append(cd[-1] * q / 9.81)
         print(cd[-1])
-        cs.append(np.average(collected_data[re]['cs'][-averaging_window:]))
-        cm_roll.append(np.average(collected_data[re]['cm_roll'][-averaging_window:]))
-        cm_yaw.append(np.average(collected_data[re]['cm_yaw'][-averaging_window:]))
-        cm_pitch.append(np.average(collected_data[re]['cm_pitch'][-averaging_window:]))
+        cs.append(collected_data[re]['cs'])
+        cm_roll.append(collected_data[re]['cm_roll'])
+        cm_yaw.append(collected_data[re]['cm_yaw'])
+        cm_pitch.append(collected_data[re]['cm_pitch'])
 
         cl_cd.append(cl[-1] / cd[-1])
 
     plot_reynolds_analysis(re_list, cl, cd, cl_cd, cs, cm_roll, cm_pitch, cm_yaw, lift, drag, rho, s, l_ref,
-                           output_directory)
+                           output_directory, images=images, data_format=data_format)
+
 
+def plot_reynolds_analysis(re, cl, cd, cl_cd, cs, cm_roll, cm_pitch, cm_yaw, lift, drag, rho, s, l_ref, save_dir,
+                           renderer=None, images=True, data_format=None):
+    """
+    Plot the results of a Reynolds number sweep.
 
-def plot_reynolds_analysis(re, cl, cd, cl_cd, cs, cm_roll, cm_pitch, cm_yaw, lift, drag, rho, s, l_ref, save_dir):
+    :param FigureRenderer renderer: Renderer to draw with, if None a headless renderer is created for this call.
+    :param bool images: Create the plot images, if False only the data is written.
+    :param str data_format: 'csv' or 'npz' to also write the sweep data to save_dir, if None no data is written.
+    """
     def rey_to_vel(rey):
         return (rey * 1.5E-5)/l_ref
     def vel_to_rey(vel):
         return vel * l_ref / 1.5E-5
 
-    fig = plt.figure(figsize=(16, 9), dpi=160)
-    ax = fig.add_subplot(111)
-    ax.plot(re, cl)
-    plt.title('Cl vs Reynolds Number\nrho: %skg/m³, S: %sm², L_ref: %sm' % (rho, s, l_ref))
-    plt.xlabel('Reynolds Number')
-    plt.ylabel('Cl')
-    plt.grid(visible=True)
-    ax2 = ax.secondary_xaxis('top', functions=(rey_to_vel, vel_to_rey))
-    ax2.set_xlabel('Velocity [m/s]')
-    plt.savefig(fname=os.path.join(save_dir, 'cl_vs_reynolds.png'), backend='svg')
-
-    fig = plt.figure(figsize=(16, 9), dpi=160)
-    ax = fig.add_subplot(111)
-    ax.plot(re, cd)
-    plt.title('Cd vs Reynolds Number\nrho: %skg/m³, S: %sm², L_ref: %sm' % (rho, s, l_ref))
-    plt.xlabel('Reynolds Number')
-    plt.ylabel('Cd')
-    plt.grid(visible=True)
-    ax2 = ax.secondary_xaxis('top', functions=(rey_to_vel, vel_to_rey))
-    ax2.set_xlabel('Velocity [m/s]')
-    plt.savefig(fname=os.path.join(save_dir, 'cd_vs_reynolds.png'), backend='svg')
-
-    fig = plt.figure(figsize=(16, 9), dpi=160)
-    ax = fig.add_subplot(111)
-    ax.plot(re, cl_cd)
-    plt.title('Cl/Cd vs Reynolds Number\nrho: %skg/m³, S: %sm², L_ref: %sm' % (rho, s, l_ref))
-    plt.xlabel('Reynolds Number')
-    plt.ylabel('Cl/Cd')
-    plt.grid(visible=True)
-    ax2 = ax.secondary_xaxis('top', functions=(rey_to_vel, vel_to_rey))
-    ax2.set_xlabel('Velocity [m/s]')
-    plt.savefig(fname=os.path.join(save_dir, 'cl_cd_vs_reynolds.png'), backend='svg')
-
-    fig = plt.figure(figsize=(16, 9), dpi=160)
-    ax = fig.add_subplot(111)
+    if data_format is not None:
+        write_plot_data(os.path.join(save_dir, 'reynolds_sweep'), OrderedDict([
+            ('re', re), ('velocity', rey_to_vel(np.asarray(re, dtype=np.float64))), ('cl', cl), ('cd', cd),
+            ('cl_cd', cl_cd), ('cs', cs), ('cm_roll', cm_roll), ('cm_pitch', cm_pitch), ('cm_yaw', cm_yaw),
+            ('lift', lift), ('drag', drag)]), data_format)
+    if not images:
+        return
+
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = FigureRenderer(figsize=(16, 9), dpi=160)
+    conditions = 'rho: %skg/m³, S: %sm², L_ref: %sm' % (rho, s, l_ref)
+
+    for values, label, name in [(cl, 'Cl', 'cl'), (cd, 'Cd', 'cd'), (cl_cd, 'Cl/Cd', 'cl_cd')]:
+        fig, ax = renderer.figure('reynolds')
+        ax.plot(re, values)
+        _format_reynolds_axes(ax, '%s vs Reynolds Number\n%s' % (label, conditions), label, rey_to_vel, vel_to_rey)
+        renderer.save(fig, os.path.join(save_dir, '%s_vs_reynolds.png' % name))
+
+    fig, ax = renderer.figure('reynolds')
     ax.plot(re, cm_roll)
-    plt.plot(re, cm_pitch)
-    plt.plot(re, cm_yaw)
-    plt.grid(visible=True)
-    ax2 = ax.secondary_xaxis('top', functions=(rey_to_vel, vel_to_rey))
-    ax2.set_xlabel('Velocity [m/s]')
-    plt.title('Moment Coeff vs Reynolds Number\nrho: %skg/m³, S: %sm², L_ref: %sm' % (rho, s, l_ref))
-    plt.legend(['cm_roll', 'cm_pitch', 'cm_yaw'])
-    plt.xlabel('Reynolds Number')
-    plt.ylabel('Cm')
-    plt.savefig(fname=os.path.join(save_dir, 'moment_coeff_vs_reynolds.png'), backend='svg')
-
-    fig = plt.figure(figsize=(16, 9), dpi=160)
-    ax = fig.add_subplot(111)
-    ax.plot(re, lift)
-    plt.title('Lift vs Reynolds Number\nrho: %skg/m³, S: %sm², L_ref: %sm' % (rho, s, l_ref))
-    plt.xlabel('Reynolds Number')
-    plt.ylabel('Lift [kg]')
-    plt.grid(visible=True)
-    ax2 = ax.secondary_xaxis('top', functions=(rey_to_vel, vel_to_rey))
-    ax2.set_xlabel('Velocity [m/s]')
-    plt.savefig(fname=os.path.join(save_dir, 'lift_vs_reynolds.png'), backend='svg')
-
-    fig = plt.figure(figsize=(16, 9), dpi=160)
-    ax = fig.add_subplot(111)
-    ax.plot(re, drag)
-    plt.title('Drag vs Reynolds Number\nrho: %skg/m³, S: %sm², L_ref: %sm' % (rho, s, l_ref))
-    plt.xlabel('Reynolds Number')
-    plt.ylabel('Drag [kg]')
-    plt.grid(visible=True)
+    ax.plot(re, cm_pitch)
+    ax.plot(re, cm_yaw)
+    _format_reynolds_axes(ax, 'Moment Coeff vs Reynolds Number\n%s' % conditions, 'Cm', rey_to_vel, vel_to_rey)
+    ax.legend(['cm_roll', 'cm_pitch', 'cm_yaw'])
+    renderer.save(fig, os.path.join(save_dir, 'moment_coeff_vs_reynolds.png'))
+
+    for values, label, name in [(lift, 'Lift', 'lift'), (drag, 'Drag', 'drag')]:
+        fig, ax = renderer.figure('reynolds')
+        ax.plot(re, values)
+        _format_reynolds_axes(ax, '%s vs Reynolds Number\n%s' % (label, conditions), '%s [kg]' % label, rey_to_vel,
+                              vel_to_rey)
+        renderer.save(fig, os.path.join(save_dir, '%s_vs_reynolds.png' % name))
+
+    if own_renderer:
+        renderer.close()
+
+
+def _format_reynolds_axes(ax, title, ylabel, rey_to_vel, vel_to_rey):
+    ax.set_title(title)
+    ax.set_xlabel('Reynolds Number')
+    ax.set_ylabel(ylabel)
+    ax.grid(visible=True)
     ax2 = ax.secondary_xaxis('top', functions=(rey_to_vel, vel_to_rey))
     ax2.set_xlabel('Velocity [m/s]')
-    plt.savefig(fname=os.path.join(save_dir, 'drag_vs_reynolds.png'), backend='svg')
 
 
 def get_time_steps(directory):
-    items = os.listdir(directory)
-    times = list()
-    for item in items:
-        if item not in ['system', 'constant', '0.orig'] and Path(os.path.join(directory,item)).is_dir():
-            times.append(float(item))
-    return sorted(times)
+    return sorted(get_time_directory_names(directory).keys())
+
+
+def get_time_directory_names(directory):
+    """
+    Map the time values of a case onto the names of their time directories. str(float) does not round trip names
+    such as '1e-05' or '100', so the real names are needed to open the directories.
+
+    :param directory: Case directory.
+    :return: dict of {time: directory name}
+    """
+    names = dict()
+    for item in os.listdir(directory):
+        if item in ['system', 'constant', '0.orig'] or not Path(os.path.join(directory, item)).is_dir():
+            continue
+        try:
+            names[float(item)] = item
+        except ValueError:
+            continue
+    return names
 
-def load_from_directory(variable, directory, grid_size, scalar=True, skip_zero=True):
-    times = get_time_steps(directory)
 
-    data = np.zeros([len(times), grid_size])
+def load_from_directory(variable, directory, grid_size=None, scalar=True, skip_zero=True, use_cache=True,
+                        cache_dir=None, times=None, cells=None):
+    """
+    Load a field variable from the time directories of a case. Only the requested times and cells are allocated.
+
+    :param str variable: Name of the field file, e.g. 'p'.
+    :param directory: Case directory.
+    :param int grid_size: Number of cells in the internalField, needed for uniform fields when cells is None.
+    :param bool scalar: True for scalar fields, False for vector/tensor fields. Checked against the field file.
+    :param bool skip_zero: Leave the row for the first time directory of the case as zeros.
+    :param bool use_cache: Read/write parsed ASCII fields through the binary cache, see utilities.parse_cache. Binary
+    fields are memory mapped directly.
+    :param str cache_dir: Directory for the cache entries, if None they are written next to each field file.
+    :param times: Time values to load, if None every time directory is loaded.
+    :param cells: Indices of the cells to load, if None every cell is loaded.
+    :return: np.ndarray of shape [times, cells] for scalar fields or [times, cells, components] otherwise.
+    """
+    all_times = get_time_steps(directory)
+    if times is None:
+        times = all_times
+    time_names = get_time_directory_names(directory)
+
+    data = None
     for t_ind, time in enumerate(times):
-        if skip_zero and t_ind == 0:
+        if skip_zero and len(all_times) > 0 and time == all_times[0]:
             continue
-        file_path = os.path.join(directory, str(time), variable)
-        with open(file_path, 'r') as csvfile:
-            tmp_data = list()
-            found_start1 = False
-            found_start2 = False
-            end = False
-            for line in csvfile:
-                if not end:
-                    if 'internalField' in line:
-                        found_start1 = True
-                    if '(' in line and found_start1 and not found_start2:
-                        found_start2 = True
-                        continue
-                    if ')' in line and '(' not in line and found_start2:
-                        end = True
-                        continue
-                    if found_start2:
-                        if scalar:
-                            tmp_data.append(float(line))
-                        else:
-                            tmp_data.append(float(line[1:line.index(' ')+1]))
-            data[t_ind, :] = np.array(tmp_data)
-
-    return data
\ No newline at end of file
+        file_path = os.path.join(directory, time_names.get(time, str(time)), variable)
+        field = read_field(file_path, cells=cells, size=grid_size, use_cache=use_cache, cache_dir=cache_dir)
+        if scalar != (field.ndim == 1):
+            raise ValueError('%s is not a %s field' % (file_path, 'scalar' if scalar else 'vector'))
+        if data is None:
+            data = np.zeros((len(times),) + field.shape, dtype=field.dtype)
+        data[t_ind] = field
+
+    if data is None:
+        data = np.zeros([len(times), grid_size or 0] + ([] if scalar else [3]))
+    return data
+
+
+def read_field(file_path, cells=None, size=None, use_cache=True, cache_dir=None):
+    """
+    Read the internalField of a field file, going through the parse cache for ASCII files.
+
+    :param file_path: Path to the field file.
+    :param cells: Indices of the cells to return, if None every cell is returned.
+    :param int size: Number of cells, needed to expand uniform fields when cells is None.
+    :param bool use_cache: Read/write the parsed field through the binary cache.
+    :param str cache_dir: Directory for the cache entries, if None they are written next to the field file.
+    :return: np.ndarray of shape (N,) for scalar fields or (N, components) otherwise.
+    """
+    # Binary fields are memory mapped and uniform fields a single value, only ASCII lists are worth caching
+    header = read_field_file_header(file_path)
+    if not use_cache or header.format == 'binary' or header.uniform:
+        return read_field_file(file_path, cells=cells, size=size)
+
+    field = cached_parse(file_path, lambda path: np.ascontiguousarray(read_field_file(path, size=size)),
+                         cache_dir=cache_dir, tag='field' if size is None else 'field%s' % size)
+    if cells is not None:
+        field = field[cells]
+    return field
@@ -0,0 +1,129 @@
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.vat_cache.npz'
+
+
+def cache_key(file):
+    """
+    Identity of a source file used to validate cache entries.
+
+    :param file: Path to the source file.
+    :return: tuple of (absolute path, mtime in ns, size in bytes)
+    """
+    stat = os.stat(file)
+    return str(Path(file).resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def cache_path(file, cache_dir=None, tag=''):
+    """
+    Location of the cache entry for a source file. Without a cache directory the entry is written as a sidecar next
+    to the source file, otherwise it is written into the cache directory under a hash of the source path.
+
+    :param file: Path to the source file.
+    :param str cache_dir: Directory to hold the cache entries, if None a sidecar file is used.
+    :param str tag: Distinguishes entries for the same file parsed with different options.
+    :return: Path of the cache entry.
+    """
+    file = Path(file)
+    suffix = ('.%s' % tag if tag else '') + CACHE_SUFFIX
+    if cache_dir is None:
+        return file.parent / ('.%s%s' % (file.name, suffix))
+    digest = hashlib.sha1(str(file.resolve()).encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / ('%s_%s%s' % (file.name, digest, suffix))
+
+
+def load_cached(file, cache_dir=None, tag='', key=None):
+    """
+    Load the cached array for a source file.
+
+    :param file: Path to the source file.
+    :param str cache_dir: Directory holding the cache entries, if None the sidecar file is used.
+    :param str tag: Tag the entry was stored under.
+    :param tuple key: cache_key of the file, if already known.
+    :return: Cached np.ndarray, or None if there is no valid entry.
+    """
+    path = cache_path(file, cache_dir, tag)
+    if not path.exists():
+        return None
+    key = cache_key(file) if key is None else key
+    try:
+        with np.load(path, allow_pickle=False) as entry:
+            stored_key = (str(entry['path']), int(entry['mtime_ns']), int(entry['size']))
+            if int(entry['version']) != CACHE_VERSION or stored_key != key:
+                return None
+            return entry['data']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached(file, data, cache_dir=None, tag='', key=None):
+    """
+    Store the parsed array for a source file. Failing to write the cache (e.g. a read-only case archive) is not an
+    error, the data will simply be re-parsed next time.
+
+    :param file: Path to the source file.
+    :param np.ndarray data: Parsed data to store.
+    :param str cache_dir: Directory to hold the cache entries, if None a sidecar file is used.
+    :param str tag: Tag to store the entry under.
+    :param tuple key: cache_key of the file taken before it was parsed. A file that is still being written (e.g. by a
+    running case) may grow between the parse and a later stat, which would store the stale data as valid for the new
+    contents, so callers that parse should pass the key taken up front.
+    :return: True if the entry was written.
+    """
+    path = cache_path(file, cache_dir, tag)
+    path_str, mtime_ns, size = cache_key(file) if key is None else key
+    tmp_path = path.with_name(path.name + '.%s.tmp' % os.getpid())
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as cache_file:
+            np.savez(cache_file, data=data, path=path_str, mtime_ns=mtime_ns, size=size, version=CACHE_VERSION)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return False
+    return True
+
+
+def cached_parse(file, parse_func, use_cache=True, cache_dir=None, tag=''):
+    """
+    Parse a file through the cache, only calling parse_func if there is no valid cache entry for the file.
+
+    :param file: Path to the source file.
+    :param parse_func: Function taking the file path and returning an np.ndarray.
+    :param bool use_cache: If False the file is always parsed and the cache is not touched.
+    :param str cache_dir: Directory to hold the cache entries, if None a sidecar file is used.
+    :param str tag: Distinguishes entries for the same file parsed with different options.
+    :return: Parsed np.ndarray.
+    """
+    if not use_cache:
+        return parse_func(file)
+
+    # The key is taken before parsing, so a file appended to during the parse no longer matches the stored entry
+    key = cache_key(file)
+    data = load_cached(file, cache_dir, tag, key=key)
+    if data is None:
+        data = parse_func(file)
+        save_cached(file, data, cache_dir, tag, key=key)
+    return data
+
+
+def clear_cache(directory, cache_dir=None):
+    """
+    Remove cache entries, either the sidecars below a directory or every entry in a cache directory.
+
+    :param directory: Directory to search for sidecar entries.
+    :param str cache_dir: Cache directory to empty instead of searching for sidecars.
+    :return: Number of entries removed.
+    """
+    search_dir = directory if cache_dir is None else cache_dir
+    removed = 0
+    for path in Path(search_dir).rglob('*%s' % CACHE_SUFFIX):
+        path.unlink()
+        removed += 1
+    return removed
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+class FigureRenderer(object):
+    """
+    Reusable figure pool for rendering report plots. Each named figure is created once and cleared between uses, and
+    headless renderers draw onto plain Agg canvases outside of pyplot, so long sweeps do not accumulate open figures.
+
+    e.x: with FigureRenderer(max_points=4000) as renderer:
+             fig, (ax1, ax2) = renderer.figure('coeffs', nrows=2)
+             renderer.plot(ax1, time, cl)
+             renderer.save(fig, os.path.join(save_dir, 'cl.png'))
+    """
+
+    def __init__(self, figsize=(16, 9), dpi=160, max_points=None, interactive=False):
+        """
+        :param tuple figsize: Default figure size in inches.
+        :param int dpi: Default figure resolution.
+        :param int max_points: Series longer than this are min/max decimated before plotting, if None the figure
+        width in pixels is used.
+        :param bool interactive: Create the figures through pyplot so they can be shown with plt.show().
+        """
+        self.figsize = figsize
+        self.dpi = dpi
+        self.max_points = max_points
+        self.interactive = interactive
+        self._figures = dict()
+
+    def figure(self, name, nrows=1, ncols=1, figsize=None, dpi=None):
+        """
+        Get a cleared figure and its axes.
+
+        :param str name: Name of the figure in the pool, figures with the same name are reused.
+        :param int nrows: Number of subplot rows.
+        :param int ncols: Number of subplot columns.
+        :param tuple figsize: Figure size in inches, if None the renderer default is used.
+        :param int dpi: Figure resolution, if None the renderer default is used.
+        :return: (Figure, axes) as returned by plt.subplots.
+        """
+        figsize = self.figsize if figsize is None else figsize
+        dpi = self.dpi if dpi is None else dpi
+        fig = self._figures.get(name)
+        if fig is None:
+            if self.interactive:
+                fig = plt.figure(figsize=figsize, dpi=dpi)
+            else:
+                fig = Figure(figsize=figsize, dpi=dpi)
+                FigureCanvasAgg(fig)
+            self._figures[name] = fig
+        else:
+            fig.clf()
+            fig.set_size_inches(figsize)
+            fig.set_dpi(dpi)
+        return fig, fig.subplots(nrows, ncols)
+
+    def plot(self, ax, x, y, *args, **kwargs):
+        """
+        ax.plot with long series decimated to the resolution of the figure.
+        """
+        max_points = self.max_points
+        if max_points is None:
+            max_points = int(ax.figure.get_figwidth() * ax.figure.dpi) * 2
+        x, y = decimate_minmax(x, y, max_points // 2)
+        return ax.plot(x, y, *args, **kwargs)
+
+    def save(self, fig, path, backend=None):
+        """
+        Save a figure, the output format is taken from the file extension.
+
+        :param Figure fig: Figure to save.
+        :param str path: Output file path.
+        :param str backend: Matplotlib backend to save with, if None the figure's own canvas is used.
+        """
+        fig.savefig(fname=path, backend=backend)
+
+    def close(self):
+        for fig in self._figures.values():
+            if self.interactive:
+                plt.close(fig)
+            else:
+                fig.clf()
+        self._figures.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def decimate_minmax(x, y, num_bins):
+    """
+    Reduce a series to the first, last, minimum and maximum sample of each of num_bins equal index ranges. When
+    num_bins matches the number of pixel columns the plotted envelope is unchanged.
+
+    :param np.ndarray x: x values of the series.
+    :param np.ndarray y: y values of the series.
+    :param int num_bins: Number of index ranges to reduce the series to.
+    :return: (x, y) decimated series, at most 4 * num_bins samples long.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if num_bins <= 0 or n <= 4 * num_bins:
+        return x, y
+
+    bin_size = int(np.ceil(n / float(num_bins)))
+    num_bins = int(np.ceil(n / float(bin_size)))
+    padded = np.empty(num_bins * bin_size, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    padded = padded.reshape(num_bins, bin_size)
+
+    starts = np.arange(num_bins) * bin_size
+    idx = np.concatenate((starts, np.minimum(starts + bin_size - 1, n - 1),
+                          starts + np.argmin(padded, axis=1), starts + np.argmax(padded, axis=1)))
+    idx = np.unique(np.minimum(idx, n - 1))
+    return x[idx], y[idx]
+
+
+def write_plot_data(path, columns, data_format='csv'):
+    """
+    Write the data behind a plot instead of (or as well as) the image.
+
+    :param str path: Output path without the extension.
+    :param OrderedDict columns: {name: array} of equal length columns.
+    :param str data_format: 'csv' or 'npz'.
+    :return: Path of the written file.
+    """
+    columns = OrderedDict(columns)
+    if data_format == 'npz':
+        path = '%s.npz' % path
+        np.savez(path, **{name: np.asarray(value) for name, value in columns.items()})
+    elif data_format == 'csv':
+        path = '%s.csv' % path
+        np.savetxt(path, np.column_stack([np.asarray(value, dtype=np.float64) for value in columns.values()]),
+                   delimiter=',', header=','.join(columns.keys()), comments='')
+    else:
+        raise ValueError('Unknown data format: %s' % data_format)
+    return path
+
+
+def init_render_worker():
+    plt.switch_backend('Agg')
+
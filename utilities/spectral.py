@@ -0,0 +1,197 @@
+import numpy as np
+from scipy import fft, signal
+
+from utilities.sweep_summary import COEFFICIENTS
+
+UNIFORM_TOLERANCE = 1e-6
+
+
+def average_sampling_period(time):
+    """
+    :param np.ndarray time: Time of each sample.
+    :return: Mean time between samples.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    if len(time) < 2:
+        return np.nan
+    return (time[-1] - time[0]) / (len(time) - 1)
+
+
+def is_uniform(time, tolerance=UNIFORM_TOLERANCE):
+    """
+    :return: True if every time step is within tolerance (relative to the mean step) of the mean step.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    if len(time) < 3:
+        return True
+    steps = np.diff(time)
+    mean_step = average_sampling_period(time)
+    return bool(np.max(np.abs(steps - mean_step)) <= tolerance * abs(mean_step))
+
+
+def resample_uniform(time, values, sampling_period=None):
+    """
+    Linearly interpolate series sampled at non-uniform time steps (e.g. adjustable time step runs) onto a uniform
+    time grid. The interpolation weights are found once and applied to every series at once.
+
+    :param np.ndarray time: Time of each sample, increasing.
+    :param np.ndarray values: Series of shape [..., len(time)].
+    :param float sampling_period: Time step of the uniform grid, if None the average time step is used.
+    :return: (uniform time, resampled values of shape [..., len(uniform time)]). Uniformly sampled input is returned
+    unchanged.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if sampling_period is None:
+        if is_uniform(time):
+            return time, values
+        sampling_period = average_sampling_period(time)
+
+    num_samples = int(np.floor((time[-1] - time[0]) / sampling_period + UNIFORM_TOLERANCE)) + 1
+    uniform_time = time[0] + np.arange(num_samples) * sampling_period
+    upper = np.clip(np.searchsorted(time, uniform_time, side='right'), 1, len(time) - 1)
+    lower = upper - 1
+    weight = np.clip((uniform_time - time[lower]) / (time[upper] - time[lower]), 0.0, 1.0)
+    return uniform_time, values[..., lower] * (1.0 - weight) + values[..., upper] * weight
+
+
+def amplitude_spectrum(time, values, window='hann', detrend='constant'):
+    """
+    Single sided amplitude spectrum of one or more series, transformed together along the last axis.
+
+    e.x: freqs, amplitude = amplitude_spectrum(time, np.vstack((cl, cd)))
+
+    :param np.ndarray time: Time of each sample, resampled to a uniform grid if needed.
+    :param np.ndarray values: Series of shape [..., len(time)].
+    :param str window: scipy.signal window name, or None for a rectangular window.
+    :param str detrend: 'constant', 'linear' or None.
+    :return: (frequencies [Hz], amplitudes of shape [..., len(frequencies)]) where a sinusoid of amplitude A gives a
+    peak of A.
+    """
+    time, values = resample_uniform(time, values)
+    n = values.shape[-1]
+    if detrend is not None:
+        values = signal.detrend(values, axis=-1, type=detrend)
+    weights = np.ones(n) if window is None else signal.get_window(window, n)
+    spectrum = fft.rfft(values * weights, axis=-1)
+
+    amplitude = np.abs(spectrum) * (2.0 / weights.sum())
+    amplitude[..., 0] /= 2.0
+    if n % 2 == 0:
+        amplitude[..., -1] /= 2.0
+    return fft.rfftfreq(n, d=average_sampling_period(time)), amplitude
+
+
+def welch_psd(time, values, segment_length=None, overlap=0.5, window='hann', detrend='constant'):
+    """
+    Welch power spectral density of one or more series, averaged over overlapping segments to reduce the variance
+    of the estimate.
+
+    :param np.ndarray time: Time of each sample, resampled to a uniform grid if needed.
+    :param np.ndarray values: Series of shape [..., len(time)].
+    :param int segment_length: Samples per segment, if None a quarter of the series (at most 8 segments at 50% overlap).
+    :param float overlap: Fraction of each segment overlapping the next.
+    :param str window: scipy.signal window name.
+    :param str detrend: 'constant', 'linear' or None.
+    :return: (frequencies [Hz], PSD of shape [..., len(frequencies)] in units^2/Hz)
+    """
+    time, values = resample_uniform(time, values)
+    n = values.shape[-1]
+    if segment_length is None:
+        segment_length = max(n // 4, 1)
+    segment_length = min(segment_length, n)
+    return signal.welch(values, fs=1.0 / average_sampling_period(time), window=window, nperseg=segment_length,
+                        noverlap=int(segment_length * overlap), detrend=False if detrend is None else detrend,
+                        axis=-1)
+
+
+def peak_frequency(freqs, power, min_frequency=0.0, max_frequency=None):
+    """
+    Frequency of the largest peak of each spectrum, refined between bins by parabolic interpolation.
+
+    :param np.ndarray freqs: Frequencies of the spectrum bins.
+    :param np.ndarray power: Spectra of shape [..., len(freqs)], amplitudes or PSD.
+    :param float min_frequency: Ignore bins below this frequency, the DC bin is always ignored.
+    :param float max_frequency: Ignore bins above this frequency.
+    :return: (peak frequencies, peak values) of shape power.shape[:-1].
+    """
+    power = np.asarray(power, dtype=np.float64)
+    mask = (freqs > max(min_frequency, 0.0))
+    if max_frequency is not None:
+        mask &= freqs <= max_frequency
+    if not np.any(mask):
+        shape = power.shape[:-1]
+        return np.full(shape, np.nan), np.full(shape, np.nan)
+
+    band = np.flatnonzero(mask)
+    peak = band[0] + np.argmax(power[..., band], axis=-1)
+    peak_value = np.take_along_axis(power, peak[..., np.newaxis], axis=-1)[..., 0]
+
+    lower = np.clip(peak - 1, 0, len(freqs) - 1)
+    upper = np.clip(peak + 1, 0, len(freqs) - 1)
+    alpha = np.take_along_axis(power, lower[..., np.newaxis], axis=-1)[..., 0]
+    gamma = np.take_along_axis(power, upper[..., np.newaxis], axis=-1)[..., 0]
+    denominator = alpha - 2 * peak_value + gamma
+    interior = (peak > band[0]) & (peak < band[-1]) & (denominator < 0)
+    offset = np.zeros(peak.shape)
+    np.divide(0.5 * (alpha - gamma), denominator, out=offset, where=interior)
+
+    bin_width = freqs[1] - freqs[0] if len(freqs) > 1 else 0.0
+    return freqs[peak] + offset * bin_width, peak_value
+
+
+def strouhal_number(frequency, length, velocity):
+    """
+    :param frequency: Shedding frequency [Hz].
+    :param float length: Reference length, e.g. chord or diameter.
+    :param float velocity: Free stream velocity.
+    :return: St = f * L / U
+    """
+    return np.asarray(frequency) * length / velocity
+
+
+def coefficient_spectra(data, coefficients=COEFFICIENTS, method='welch', excise=0, **kwargs):
+    """
+    Spectra of every force coefficient of a case in one batched transform.
+
+    :param np.ndarray data: Structured array from open_foam_utils.load_force_coeff.
+    :param tuple coefficients: Names of the coefficients, as in sweep_summary.COEFFICIENTS.
+    :param str method: 'welch' for the PSD or 'amplitude' for the amplitude spectrum.
+    :param int excise: Number of samples at the start of the history to drop, e.g. the start up transient.
+    :return: (frequencies, {name: spectrum})
+    """
+    columns = {'cl': 'Cl', 'cd': 'Cd', 'cs': 'Cs', 'cm_roll': 'CmRoll', 'cm_pitch': 'CmPitch', 'cm_yaw': 'CmYaw'}
+    time = data['time'][excise:]
+    values = np.vstack([data[columns[name]][excise:] for name in coefficients])
+    if method == 'welch':
+        freqs, spectra = welch_psd(time, values, **kwargs)
+    elif method == 'amplitude':
+        freqs, spectra = amplitude_spectrum(time, values, **kwargs)
+    else:
+        raise ValueError('Unknown spectrum method: %s' % method)
+    return freqs, dict(zip(coefficients, spectra))
+
+
+def shedding_frequencies(data, length=None, velocity=None, coefficients=COEFFICIENTS, excise=0, min_frequency=0.0,
+                         **kwargs):
+    """
+    Dominant frequency of every force coefficient of a case, and the Strouhal number if a reference length and
+    velocity are given.
+
+    e.x: for aoa, (force_coeff_dir, folder_name) in cases.items():
+             shedding[aoa] = shedding_frequencies(load_force_coeff(force_coeff_dir, logger), length=chord,
+                                                  velocity=u_inf, excise=2000)
+
+    :param np.ndarray data: Structured array from open_foam_utils.load_force_coeff.
+    :param float length: Reference length for the Strouhal number.
+    :param float velocity: Free stream velocity for the Strouhal number.
+    :param int excise: Number of samples at the start of the history to drop.
+    :param float min_frequency: Ignore peaks below this frequency, e.g. slow drift of the solution.
+    :return: {name: (frequency, strouhal number)}, the Strouhal number is NaN without a length and velocity.
+    """
+    freqs, spectra = coefficient_spectra(data, coefficients=coefficients, excise=excise, **kwargs)
+    peaks, _ = peak_frequency(freqs, np.vstack([spectra[name] for name in coefficients]),
+                              min_frequency=min_frequency)
+    strouhal = strouhal_number(peaks, length, velocity) if length is not None and velocity is not None else \
+        np.full(len(peaks), np.nan)
+    return {name: (peaks[idx], strouhal[idx]) for idx, name in enumerate(coefficients)}
@@ -0,0 +1,246 @@
+import os
+
+import numpy as np
+
+from utilities.convergence import analyse_convergence, integrated_autocorrelation_time
+
+COEFFICIENTS = ('cl', 'cd', 'cs', 'cm_roll', 'cm_pitch', 'cm_yaw')
+STATS = ('stdev', 'min', 'max', 'stderr')
+AUTO_WINDOW = 'auto'
+AUTO_WINDOW_COLUMN = -1  # averaging_window column value of 'auto'
+CONVERGED_REL_TOL = 1e-3
+
+SUMMARY_DTYPE = np.dtype([('case', 'U512'), ('folder_name', 'U256'), ('sweep', 'U16'), ('widget', 'U128'),
+                          ('aoa', np.float64), ('re', np.float64), ('flap', np.float64),
+                          ('averaging_window', np.int64), ('num_samples', np.int64), ('time_end', np.float64),
+                          ('source_mtime_ns', np.int64), ('source_size', np.int64),
+                          ('steady_start_time', np.float64), ('converged', np.bool_)] +
+                         [(coeff, np.float64) for coeff in COEFFICIENTS] +
+                         [('%s_%s' % (coeff, stat), np.float64) for coeff in COEFFICIENTS for stat in STATS])
+
+
+def source_signature(files):
+    """
+    Signature of the force coefficient files of a case, used to detect cases that have changed since they were
+    summarised.
+
+    :param list files: Paths of the .dat files of the case.
+    :return: tuple of (latest mtime in ns, total size in bytes)
+    """
+    mtime_ns = 0
+    size = 0
+    for file in files:
+        stat = os.stat(file)
+        mtime_ns = max(mtime_ns, stat.st_mtime_ns)
+        size += stat.st_size
+    return mtime_ns, size
+
+
+def reduce_coefficients(time, coefficients, averaging_window):
+    """
+    Reduce coefficient histories to the average and the print_stats statistics over the averaging window, along with
+    the autocorrelation corrected standard error of the average.
+
+    :param np.ndarray time: Time of each sample.
+    :param dict coefficients: {name: np.ndarray} histories, keyed by the names in COEFFICIENTS.
+    :param averaging_window: Number of samples at the end of the history to reduce, or 'auto' to average over the
+    steady state found by convergence.analyse_convergence.
+    :return: dict of {name: average, name_stdev: ..., name_min: ..., name_max: ..., name_stderr: ..., 'num_samples',
+    'time_end', 'steady_start_time', 'converged'}
+    """
+    window_column(averaging_window)  # Rejects windows of zero or fewer samples
+    reduced = {'num_samples': len(time), 'time_end': time[-1] if len(time) > 0 else np.nan,
+               'steady_start_time': np.nan, 'converged': len(time) > 0}
+    for name, val in coefficients.items():
+        if averaging_window == AUTO_WINDOW:
+            result = analyse_convergence(time, val, rel_tol=CONVERGED_REL_TOL)
+            window = val[result.averaging_start_index:]
+            stderr = result.stderr
+            reduced['converged'] = reduced['converged'] and result.converged
+            if len(window) > 0:
+                reduced['steady_start_time'] = np.nanmax([reduced['steady_start_time'],
+                                                          time[result.averaging_start_index]])
+        else:
+            window = val[-averaging_window:]
+            stderr = np.std(window) * np.sqrt(integrated_autocorrelation_time(window) / len(window)) \
+                if len(window) > 0 else np.nan
+            reduced['converged'] = reduced['converged'] and bool(stderr <= CONVERGED_REL_TOL * abs(np.mean(window)))
+        reduced[name] = np.average(window)
+        reduced['%s_stdev' % name] = np.std(window) if len(window) > 0 else np.nan
+        reduced['%s_min' % name] = np.min(window) if len(window) > 0 else np.nan
+        reduced['%s_max' % name] = np.max(window) if len(window) > 0 else np.nan
+        reduced['%s_stderr' % name] = stderr
+    return reduced
+
+
+def window_column(averaging_window):
+    """
+    :return: The averaging_window as stored in the summary, AUTO_WINDOW_COLUMN for 'auto'.
+    """
+    if averaging_window == AUTO_WINDOW:
+        return AUTO_WINDOW_COLUMN
+    if int(averaging_window) <= 0:
+        raise ValueError('averaging_window must be a positive number of samples or %r, got %r' %
+                         (AUTO_WINDOW, averaging_window))
+    return int(averaging_window)
+
+
+class SweepSummaryStore(object):
+    """
+    Columnar store of sweep case reductions, one row per case. Rows are held in a single structured array and saved
+    as an .npz file, so polars can be queried and pivoted without re-reading any .dat files.
+
+    e.x: store = SweepSummaryStore('sweep_summary.npz')
+         aoa, cl = store.polar('aoa', 'cl', sweep='aoa', flap=0)
+         aoa, flap, cl_grid = store.pivot('aoa', 'flap', 'cl', sweep='aoa')
+
+    String columns (case, folder_name, sweep, widget) start at the lengths of SUMMARY_DTYPE and are widened to hold
+    the longest value stored, so long case paths are never truncated into another case's key.
+    """
+
+    def __init__(self, path=None):
+        """
+        :param str path: .npz file backing the store, loaded if it exists. If None the store is in memory only.
+        """
+        self.path = path
+        self.data = np.zeros(0, dtype=SUMMARY_DTYPE)
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return self.data.size
+
+    def load(self, path):
+        with np.load(path, allow_pickle=False) as stored:
+            data = stored['data']
+        dtype = _widen_strings(SUMMARY_DTYPE, {name: data[name] for name in data.dtype.names})
+        self.data = _empty_rows(data.size, dtype)
+        for name in data.dtype.names:
+            if name in SUMMARY_DTYPE.names:
+                self.data[name] = data[name]
+
+    def save(self, path=None):
+        path = self.path if path is None else path
+        if path is None:
+            raise ValueError('No path given to save the sweep summary to')
+        tmp_path = '%s.%s.tmp' % (path, os.getpid())
+        with open(tmp_path, 'wb') as store_file:
+            np.savez(store_file, data=self.data)
+        os.replace(tmp_path, path)
+
+    def upsert(self, rows):
+        """
+        Insert rows, replacing any existing rows for the same case.
+
+        :param list rows: dicts of column values, missing columns are left as zero/NaN.
+        """
+        if len(rows) == 0:
+            return
+        dtype = _widen_strings(self.data.dtype, {name: [row[name] for row in rows if name in row]
+                                                 for name in SUMMARY_DTYPE.names})
+        if dtype != self.data.dtype:
+            self.data = self.data.astype(dtype)
+        new = _empty_rows(len(rows), dtype)
+        for idx, row in enumerate(rows):
+            for name, value in row.items():
+                if name in SUMMARY_DTYPE.names:
+                    new[name][idx] = value
+
+        keep = ~np.isin(self.data['case'], new['case'])
+        self.data = np.concatenate((self.data[keep], new))
+        self.data = self.data[np.lexsort((self.data['re'], self.data['aoa'], self.data['case']))]
+
+    def get_case(self, case, signature=None, averaging_window=None):
+        """
+        Stored row of a case, if it is up to date.
+
+        :param str case: Case identifier, the force coefficient directory of the case.
+        :param tuple signature: Current source_signature of the case, if given the row must match it.
+        :param averaging_window: If given the row must have been reduced with the same window.
+        :return: Row as a dict, or None if the case is missing or out of date.
+        """
+        idx = np.flatnonzero(self.data['case'] == str(case))
+        if idx.size == 0:
+            return None
+        row = self.data[idx[-1]]
+        if signature is not None and (int(row['source_mtime_ns']), int(row['source_size'])) != tuple(signature):
+            return None
+        if averaging_window is not None and int(row['averaging_window']) != window_column(averaging_window):
+            return None
+        return {name: row[name].item() for name in SUMMARY_DTYPE.names}
+
+    def query(self, columns=None, **filters):
+        """
+        Filter the store. Each filter is either a value to match, a (low, high) inclusive range, or a callable taking
+        the column array and returning a boolean mask.
+
+        e.x: store.query(sweep='aoa', aoa=(-4, 10), flap=0)
+
+        :param list columns: Columns to return, if None every column is returned.
+        :return: Structured np.ndarray of the matching rows.
+        """
+        mask = np.ones(self.data.size, dtype=bool)
+        for name, condition in filters.items():
+            column = self.data[name]
+            if callable(condition):
+                mask &= condition(column)
+            elif isinstance(condition, tuple):
+                mask &= (column >= condition[0]) & (column <= condition[1])
+            else:
+                mask &= column == condition
+        rows = self.data[mask]
+        if columns is not None:
+            rows = rows[list(columns)]
+        return rows
+
+    def polar(self, x, y, **filters):
+        """
+        :param str x: Column for the independent variable, e.g. 'aoa'.
+        :param str y: Column for the dependent variable, e.g. 'cl'.
+        :return: (x, y) arrays sorted by x.
+        """
+        rows = self.query(**filters)
+        order = np.argsort(rows[x], kind='stable')
+        return rows[x][order], rows[y][order]
+
+    def pivot(self, index, columns, values, **filters):
+        """
+        Pivot the store into a 2D grid, e.g. Cl over AoA and Reynolds number. Missing combinations are NaN and
+        duplicate combinations take the last row.
+
+        :param str index: Column for the grid rows.
+        :param str columns: Column for the grid columns.
+        :param str values: Column for the grid values.
+        :return: (index values, column values, np.ndarray of shape [len(index values), len(column values)])
+        """
+        rows = self.query(**filters)
+        index_values, index_idx = np.unique(rows[index], return_inverse=True)
+        column_values, column_idx = np.unique(rows[columns], return_inverse=True)
+        grid = np.full((index_values.size, column_values.size), np.nan)
+        grid[index_idx, column_idx] = rows[values]
+        return index_values, column_values, grid
+
+
+def _widen_strings(dtype, values):
+    """
+    :param np.dtype dtype: Structured dtype of the summary.
+    :param dict values: {column: values} to be stored.
+    :return: dtype with every string column long enough for its values.
+    """
+    fields = list()
+    for name in dtype.names:
+        field = dtype[name]
+        if field.kind == 'U' and len(values.get(name, ())) > 0:
+            length = max(field.itemsize // np.dtype('U1').itemsize, max(len(str(value)) for value in values[name]))
+            field = np.dtype('U%d' % length)
+        fields.append((name, field))
+    return np.dtype(fields)
+
+
+def _empty_rows(size, dtype):
+    # Missing values are NaN for float columns and zero otherwise
+    rows = np.zeros(size, dtype=dtype)
+    for name in dtype.names:
+        if dtype[name].kind == 'f':
+            rows[name] = np.nan
+    return rows
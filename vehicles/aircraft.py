@@ -13,14 +13,20 @@ class Aircraft(Vehicle):
     def update_forces(self, control_manager, environment_manager):
         raise NotImplementedError('Not implemented for vehicle type')
 
+    def calculate_loads_body_frame(self, control_manager, environment_manager, simulation_manager):
+        return self.sum_component_loads(control_manager, environment_manager, simulation_manager)
+
+    def calculate_angular_momentum_body_frame(self):
+        return self.store.relative_angular_momentum()
+
     def plot_planform(self, half=False):
         legend = list()
         for com in self.components:
-            (x,y) = com[0].planform_coordinates(half)
-            x += com[1][1]
-            y += com[1][0]
+            (x,y) = com.planform_coordinates(half)
+            x += com.position[1]
+            y += com.position[0]
             plt.plot(x,y)
-            legend.append('%s:%s' % (com[0].type,com[0].sub_type))
+            legend.append('%s:%s' % (com.type,com.sub_type))
 
         plt.xlabel('y (m)')
         plt.ylabel('x (m)')
@@ -0,0 +1,368 @@
+import numpy as np
+
+from utilities.coordinate_systems import cross, euler_to_dcm
+
+
+class ComponentHandle(object):
+    """
+    Lightweight view of one row of a ComponentStore. Handles stay valid when rows are removed or moved between
+    stores, the store updates their index.
+    """
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def mass(self):
+        return self.store.mass[self.index]
+
+    @mass.setter
+    def mass(self, mass):
+        self.store.mass[self.index] = mass
+        self.store.mark_dirty(self.index)
+
+    @property
+    def position(self):
+        return self.store.position[self.index]
+
+    @position.setter
+    def position(self, position):
+        self.store.position[self.index] = position
+        self.store.mark_dirty(self.index)
+
+    @property
+    def angle(self):
+        return self.store.angle[self.index]
+
+    @angle.setter
+    def angle(self, angle):
+        self.store.angle[self.index] = angle
+        self.store.mark_dirty(self.index)
+
+    @property
+    def inertia_0(self):
+        return self.store.inertia_0[self.index]
+
+    @inertia_0.setter
+    def inertia_0(self, inertia_0):
+        self.store.inertia_0[self.index] = inertia_0
+        self.store.mark_dirty(self.index)
+
+    @property
+    def angle_rate(self):
+        return self.store.angle_rate[self.index]
+
+    @angle_rate.setter
+    def angle_rate(self, angle_rate):
+        self.store.angle_rate[self.index] = angle_rate
+
+    @property
+    def inertia(self):
+        """
+        Inertia tensor about the body origin in the body frame.
+        """
+        return self.store.inertia[self.index]
+
+    @property
+    def rotation(self):
+        return self.store.rotation[self.index]
+
+    def set_mass(self, mass, scale_inertia=True):
+        """
+        Change the mass, e.g. for fuel burn, optionally scaling inertia_0 with it.
+        """
+        store = self.store
+        if scale_inertia and store.mass[self.index] > 0:
+            store.inertia_0[self.index] *= mass / store.mass[self.index]
+        store.mass[self.index] = mass
+        store.mark_dirty(self.index)
+
+
+class ComponentStore(object):
+    """
+    Structure of arrays of the mass properties, attitude, spin rate and loads of many components, so vehicle level
+    sums are single vectorized reductions instead of Python loops over component objects:
+
+        mass [N], position [N, 3], angle [N, 3], inertia_0 [N, 3, 3], angle_rate [N, 3], force [N, 3], moment [N, 3]
+
+    position is the component center of mass and angle its (roll, pitch, yaw) relative to the body frame, inertia_0
+    and angle_rate (the spin of the component relative to the body, e.g. a rotor) are in the component frame, force
+    and moment are the body frame loads of each component (moment about its own position) written by the load
+    models before total_loads(). Rotation matrices and body frame inertias are cached per row and recomputed only for
+    rows whose mass, position, angle or inertia_0 changed through a handle or mark_dirty().
+
+    The store is also a mass property contributor for vehicles.mass_properties.MassProperties, folding the changed
+    rows into its totals incrementally.
+
+    e.x: store = ComponentStore()
+         handles = [store.add(mass=m, position=p) for m, p in zip(masses, positions)]
+         handles[0].set_mass(fuel_mass)                     # only this row is re-aggregated
+         store.force[:] = strip_forces                      # [N, 3]
+         force, moment = store.total_loads(center_of_mass)
+    """
+
+    def __init__(self, capacity=16, owner=None):
+        """
+        :param int capacity: Initial number of rows allocated, grown by doubling.
+        :param owner: Object with a component_changed(store) method called when a row's mass properties change,
+        e.g. a Vehicle.
+        """
+        self.owner = owner
+        self._size = 0
+        self._handles = list()
+        self._allocate(capacity)
+        self._mass_total = 0.0
+        self._first_moment_total = np.zeros(3)
+        self._inertia_total = np.zeros((3, 3))
+
+    def _allocate(self, capacity):
+        old = getattr(self, '_arrays', None)
+        self._arrays = {'mass': np.zeros(capacity),
+                        'position': np.zeros((capacity, 3)),
+                        'angle': np.zeros((capacity, 3)),
+                        'inertia_0': np.zeros((capacity, 3, 3)),
+                        'angle_rate': np.zeros((capacity, 3)),
+                        'force': np.zeros((capacity, 3)),
+                        'moment': np.zeros((capacity, 3)),
+                        # Cached per row values and the contribution of each row already in the totals
+                        'rotation': np.zeros((capacity, 3, 3)),
+                        'inertia': np.zeros((capacity, 3, 3)),
+                        'applied_mass': np.zeros(capacity),
+                        'applied_first_moment': np.zeros((capacity, 3)),
+                        'dirty': np.zeros(capacity, dtype=bool)}
+        if old is not None:
+            for name, array in old.items():
+                self._arrays[name][:self._size] = array[:self._size]
+        self._any_dirty = bool(np.any(self._arrays['dirty'][:self._size]))
+
+    def __len__(self):
+        return self._size
+
+    def _view(name):
+        return property(lambda self: self._arrays[name][:self._size],
+                        doc='Rows of %s, a view into the contiguous store array.' % name)
+
+    mass = _view('mass')
+    position = _view('position')
+    angle = _view('angle')
+    inertia_0 = _view('inertia_0')
+    angle_rate = _view('angle_rate')
+    force = _view('force')
+    moment = _view('moment')
+    del _view
+
+    @property
+    def handles(self):
+        return list(self._handles)
+
+    def add(self, mass=0.0, position=np.zeros(3), angle=np.zeros(3), inertia_0=np.zeros((3, 3)),
+            angle_rate=np.zeros(3)):
+        """
+        :return: ComponentHandle of the new row.
+        """
+        if self._size == len(self._arrays['mass']):
+            self._allocate(max(2 * self._size, 1))
+        index = self._size
+        self._size += 1
+        arrays = self._arrays
+        arrays['mass'][index] = mass
+        arrays['position'][index] = position
+        arrays['angle'][index] = angle
+        arrays['inertia_0'][index] = inertia_0
+        arrays['angle_rate'][index] = angle_rate
+        arrays['force'][index] = 0.0
+        arrays['moment'][index] = 0.0
+        arrays['inertia'][index] = 0.0
+        arrays['applied_mass'][index] = 0.0
+        arrays['applied_first_moment'][index] = 0.0
+        handle = ComponentHandle(self, index)
+        self._handles.append(handle)
+        self.mark_dirty(index)
+        return handle
+
+    def add_many(self, mass, position, angle=None, inertia_0=None, angle_rate=None):
+        """
+        Add a block of rows at once, e.g. the strips of a wing or slices of a propellant grain.
+
+        :return: slice of the new rows, valid until rows are removed from the store.
+        """
+        mass = np.atleast_1d(np.asarray(mass, dtype=np.float64))
+        count = len(mass)
+        while self._size + count > len(self._arrays['mass']):
+            self._allocate(max(2 * len(self._arrays['mass']), 1))
+        rows = slice(self._size, self._size + count)
+        start = self._size
+        self._size += count
+        arrays = self._arrays
+        arrays['mass'][rows] = mass
+        arrays['position'][rows] = position
+        arrays['angle'][rows] = 0.0 if angle is None else angle
+        arrays['inertia_0'][rows] = 0.0 if inertia_0 is None else inertia_0
+        arrays['angle_rate'][rows] = 0.0 if angle_rate is None else angle_rate
+        for name in ('force', 'moment', 'inertia', 'applied_mass', 'applied_first_moment'):
+            arrays[name][rows] = 0.0
+        self._handles.extend(ComponentHandle(self, index) for index in range(start, self._size))
+        self.mark_dirty(rows)
+        return rows
+
+    def remove(self, handle):
+        """
+        Remove a row, moving the last row into its place.
+        """
+        index = handle.index
+        self._fold_out(index)
+        last = self._size - 1
+        if index != last:
+            for array in self._arrays.values():
+                array[index] = array[last]
+            moved = self._handles[last]
+            moved.index = index
+            self._handles[index] = moved
+        self._handles.pop()
+        self._size -= 1
+        handle.store = None
+        handle.index = None
+        self._notify()
+
+    def adopt(self, handle):
+        """
+        Move a handle's row from its store into this one, the handle object stays the same.
+        """
+        source = handle.store
+        new = self.add(source.mass[handle.index], source.position[handle.index], source.angle[handle.index],
+                       source.inertia_0[handle.index], source.angle_rate[handle.index])
+        source.remove(handle)
+        self._handles[new.index] = handle
+        handle.store = self
+        handle.index = new.index
+        return handle
+
+    def mark_dirty(self, rows=None):
+        """
+        Flag rows (an index, slice, mask or None for all) whose mass properties were changed through the arrays.
+        """
+        self._arrays['dirty'][:self._size][slice(None) if rows is None else rows] = True
+        self._any_dirty = True
+        self._notify()
+
+    def _notify(self):
+        if self.owner is not None:
+            self.owner.component_changed(self)
+
+    def _fold_out(self, index):
+        # Remove a row's applied contribution from the totals
+        arrays = self._arrays
+        self._mass_total -= arrays['applied_mass'][index]
+        self._first_moment_total = self._first_moment_total - arrays['applied_first_moment'][index]
+        self._inertia_total = self._inertia_total - arrays['inertia'][index]
+        arrays['applied_mass'][index] = 0.0
+        arrays['applied_first_moment'][index] = 0.0
+        arrays['inertia'][index] = 0.0
+
+    def update(self):
+        """
+        Recompute the rotation and inertia of the dirty rows and fold their changes into the totals.
+        """
+        if not self._any_dirty:
+            return
+        arrays = self._arrays
+        rows = np.flatnonzero(arrays['dirty'][:self._size])
+        if len(rows):
+            mass = arrays['mass'][rows]
+            position = arrays['position'][rows]
+            rotation = euler_to_dcm(arrays['angle'][rows])
+            arrays['rotation'][rows] = rotation
+            # C^T I_0 C, then the parallel axis theorem to the body origin
+            inertia = np.matmul(np.matmul(np.swapaxes(rotation, 1, 2), arrays['inertia_0'][rows]), rotation)
+            distance_sq = np.einsum('ni,ni->n', position, position)
+            inertia += mass[:, np.newaxis, np.newaxis] * (distance_sq[:, np.newaxis, np.newaxis] * np.eye(3) -
+                                                          position[:, :, np.newaxis] * position[:, np.newaxis, :])
+            first_moment = mass[:, np.newaxis] * position
+
+            self._mass_total += np.sum(mass - arrays['applied_mass'][rows])
+            self._first_moment_total = self._first_moment_total + np.sum(
+                first_moment - arrays['applied_first_moment'][rows], axis=0)
+            self._inertia_total = self._inertia_total + np.sum(inertia - arrays['inertia'][rows], axis=0)
+            arrays['inertia'][rows] = inertia
+            arrays['applied_mass'][rows] = mass
+            arrays['applied_first_moment'][rows] = first_moment
+            arrays['dirty'][rows] = False
+        self._any_dirty = False
+
+    @property
+    def rotation(self):
+        """
+        Body to component rotation matrices [N, 3, 3].
+        """
+        self.update()
+        return self._arrays['rotation'][:self._size]
+
+    @property
+    def inertia(self):
+        """
+        Inertia tensors about the body origin in the body frame [N, 3, 3].
+        """
+        self.update()
+        return self._arrays['inertia'][:self._size]
+
+    def mass_contribution(self):
+        """
+        :return: (mass, first moment of mass, inertia about the body origin) summed over the rows.
+        """
+        self.update()
+        return self._mass_total, self._first_moment_total.copy(), self._inertia_total.copy()
+
+    def rebuild(self):
+        """
+        Recompute the totals from every row, clearing round off accumulated by incremental updates.
+        """
+        self._mass_total = 0.0
+        self._first_moment_total = np.zeros(3)
+        self._inertia_total = np.zeros((3, 3))
+        for name in ('applied_mass', 'applied_first_moment', 'inertia'):
+            self._arrays[name][:self._size] = 0.0
+        self.mark_dirty()
+        self.update()
+
+    def total_loads(self, reference_point=np.zeros(3)):
+        """
+        Sum the component loads about a reference point, sum(moment) + sum((position - reference) x force).
+
+        :param np.ndarray reference_point: Body frame point, e.g. the center of mass.
+        :return: (force [3], moment [3]) in the body frame.
+        """
+        force = self.force
+        total_force = np.sum(force, axis=0)
+        arm_moment = np.sum(cross(self.position, force), axis=0) - cross(reference_point, total_force)
+        return total_force, np.sum(self.moment, axis=0) + arm_moment
+
+    def relative_angular_momentum(self):
+        """
+        Body frame angular momentum of the components spinning relative to the body, sum C^T I_0 angle_rate.
+        """
+        spin_momentum = np.einsum('nij,nj->ni', self.inertia_0, self.angle_rate)
+        return np.einsum('nji,nj->i', self.rotation, spin_momentum)
+
+    def angular_momentum(self, body_rate, reference_point=None):
+        """
+        Total body frame angular momentum of the components for a body rate.
+
+        :param np.ndarray body_rate: Body angular rates [rad/s].
+        :param np.ndarray reference_point: Point the inertia is taken about, the body origin if None.
+        """
+        inertia = np.sum(self.inertia, axis=0)
+        if reference_point is not None:
+            mass = np.sum(self.mass)
+            first_moment = np.sum(self.mass[:, np.newaxis] * self.position, axis=0)
+            inertia = inertia + _parallel_axis_shift(mass, first_moment, reference_point)
+        return inertia @ np.asarray(body_rate, dtype=np.float64) + self.relative_angular_momentum()
+
+
+def _parallel_axis_shift(mass, first_moment, point):
+    # Change of sum m (|r|^2 E - r r^T) when the reference moves from the origin to point
+    point = np.asarray(point, dtype=np.float64)
+    cross_term = np.outer(first_moment, point)
+    return (mass * point.dot(point) - 2 * first_moment.dot(point)) * np.eye(3) + cross_term + cross_term.T - \
+        mass * np.outer(point, point)
@@ -2,27 +2,90 @@ import abc
 
 import numpy as np
 
-from utilities.coordinate_systems import rotation_matrix
+from vehicles.component_store import ComponentStore
 
 class Component(object):
     def __init__(self, mass, position, angle, inertia_0):
-        self.mass = mass
+        """
+        :param float mass: Mass [kg].
+        :param np.ndarray position: Center of mass in the vehicle body frame [m].
+        :param np.ndarray angle: (roll, pitch, yaw) [rad] of the component frame relative to the vehicle body frame.
+        :param np.ndarray inertia_0: Inertia tensor about the component center of mass in the component frame.
+
+        The mass properties live in a row of a vehicles.component_store.ComponentStore, a private one until the
+        component is added to a vehicle, which moves the row into the vehicle's store. Assigning mass, position, angle
+        or inertia_0 (rather than modifying the arrays in place) invalidates the row's cached inertia and marks the
+        vehicle mass properties dirty.
+        """
+        self.handle = ComponentStore(capacity=1).add(mass, position, angle, inertia_0)
         self.cost = 0.0
-        self.position = position
-        self.angle = angle
-        self.angle_rate = np.zeros(3)
-        self.inertia_0 = inertia_0
 
         # Type is inhertited to upper level components and handled there
         self.type = None
 
+    @property
+    def mass(self):
+        return self.handle.mass
+
+    @mass.setter
+    def mass(self, mass):
+        self.handle.mass = mass
+
+    @property
+    def position(self):
+        return self.handle.position
+
+    @position.setter
+    def position(self, position):
+        self.handle.position = position
+
+    @property
+    def angle(self):
+        return self.handle.angle
+
+    @angle.setter
+    def angle(self, angle):
+        self.handle.angle = angle
+
+    @property
+    def inertia_0(self):
+        return self.handle.inertia_0
+
+    @inertia_0.setter
+    def inertia_0(self, inertia_0):
+        self.handle.inertia_0 = inertia_0
+
+    @property
+    def angle_rate(self):
+        return self.handle.angle_rate
+
+    @angle_rate.setter
+    def angle_rate(self, angle_rate):
+        self.handle.angle_rate = angle_rate
+
+    def set_mass(self, mass, scale_inertia=True):
+        """
+        Change the mass, e.g. for fuel burn, with a single invalidation.
+
+        :param float mass: New mass [kg].
+        :param bool scale_inertia: Scale inertia_0 with the mass, as for a uniform body losing density.
+        """
+        self.handle.set_mass(mass, scale_inertia=scale_inertia)
+
     @property
     def inertia(self):
-        return rotate_inertia(translate_inertia(self.inertia_0, self.position). self.angle)
+        """
+        Inertia tensor about the vehicle body origin in the vehicle body frame, cached until the mass, position,
+        angle or inertia_0 change.
+        """
+        return self.handle.inertia
 
     @property
     def angular_momentum(self):
-        return rotation_matrix(self.angle) * (self.inertia_0 * self.angle_rate) * rotation_matrix(self.angle).T
+        """
+        Body frame angular momentum of the component spinning relative to the body at angle_rate.
+        """
+        return self.handle.rotation.T @ (self.inertia_0 @ self.angle_rate)
 
     def log(self,logger):
         logger.info('Component: %s\r\tWeight: %s\r\tCost: %s\r\n' % (self.type, self.mass, self.cost))
@@ -34,21 +97,3 @@ class Component(object):
     @abc.abstractmethod
     def calculate_angular_momentum_body_frame(self, body_rate):
         raise NotImplementedError('Not implemented for component type')
-
-
-@staticmethod
-def rotate_inertia(inertia, angle):
-    rot_mat = rotation_matrix(angle)
-    return rot_mat * inertia * rot_mat.T
-
-
-@staticmethod
-def translate_inertia(inertia, mass, position):
-    """
-
-    :param np.matrix inertia:
-    :param float mass:
-    :param np.ndarray position:
-    :return:
-    """
-    return inertia + mass * (position.dot(position)*np.eye(3) + np.outer(position, position))
\ No newline at end of file
@@ -4,11 +4,15 @@ from matplotlib import pyplot as plt
 
 from .components import Component
 from aerodynamics.airfoil import Airfoil
+from aerodynamics.strip_theory import StripGeometry
+from simulation.rigid_body import ANGULAR_RATE, POSITION, VELOCITY
+from utilities.coordinate_systems import cross
 
 
 class Wing(Component):
 
-    def __init__(self, sub_type, span, chord, sweep, polyhedral, symmetric=True, twist=None, Airfoil=None, logger=None):
+    def __init__(self, sub_type, span, chord, sweep, polyhedral, symmetric=True, twist=None, Airfoil=None, logger=None,
+                 mass=0.0, position=np.zeros(3), angle=np.zeros(3), inertia_0=np.zeros((3, 3)), strips_per_segment=8):
         """
         Wings are formed from various segments, with each segment being a portion of the lists given to for __init__.
         A wing can be formed from a single segment or various segments, and each input must either be a single value
@@ -36,9 +40,16 @@ class Wing(Component):
         for initial design, but is required for future analysis. Length n+1
         :param logger: Logger instance for printing data to the terminal, if not given the default Python instance is
         taken.
+        :param float mass: Mass [kg], see Component.
+        :param np.ndarray position: Root quarter chord in the vehicle body frame [m], see Component.
+        :param np.ndarray angle: (roll, pitch, yaw) [rad] of the wing frame relative to the vehicle body frame, pitch
+        being the incidence of the wing.
+        :param np.ndarray inertia_0: Inertia tensor about the wing center of mass in the wing frame, see Component.
+        :param int strips_per_segment: Number of spanwise strips each segment is cut into for the strip theory loads of
+        calculate_loads_body_frame.
         """
 
-        super().__init__()
+        super().__init__(mass, position, angle, inertia_0)
 
         if logger is None:
             logger = logging.getLogger()
@@ -56,10 +67,11 @@ class Wing(Component):
 
         self._standardize_data_types()
 
-        self.area = self._area
-        self.projected_area = self._projected_area
-        self.mac = self._mean_aerodynamic_chord
-        self.ar = self._aspect_ratio
+        self.mac = self.mean_aerodynamic_chord
+        self.ar = self.aspect_ratio
+
+        # Strip geometry is fixed by the planform, only the flight condition changes from step to step
+        self.strips = StripGeometry.from_wing(self, strips_per_segment=strips_per_segment)
 
 
     def total_span(self):
@@ -70,26 +82,29 @@ class Wing(Component):
 
     def _standardize_data_types(self):
 
-        if isinstance(self.span, int):
-            self._logger.debug('Integer Span given, converting to single value list (span)')
+        if np.isscalar(self.span):
+            self._logger.debug('Scalar Span given, converting to single value list (span)')
             self.span = [self.span]
 
         n = len(self.span)
 
-        if isinstance(self.chord, int):
-            self._logger.debug('Integer Chord given, converting to list size (%s) (chord,...., chord)' % (n+1))
+        if self.twist is None:
+            self.twist = 0.0
+
+        if np.isscalar(self.chord):
+            self._logger.debug('Scalar Chord given, converting to list size (%s) (chord,...., chord)' % (n+1))
             self.chord = [self.chord] * (len(self.span)+1)
 
-        if isinstance(self.sweep, int):
-            self._logger.debug('Integer Sweep given, converting to list size (%s)' % n)
+        if np.isscalar(self.sweep):
+            self._logger.debug('Scalar Sweep given, converting to list size (%s)' % n)
             self.sweep = [self.sweep]* len(self.span)
 
-        if isinstance(self.polyhedral, int):
-            self._logger.debug('Integer Polyhedral given, converting to list size (%s)' % n)
+        if np.isscalar(self.polyhedral):
+            self._logger.debug('Scalar Polyhedral given, converting to list size (%s)' % n)
             self.polyhedral = [self.polyhedral]* len(self.span)
 
-        if isinstance(self.twist, int):
-            self._logger.debug('Integer Twist given, converting to list size (%s)' % n)
+        if np.isscalar(self.twist):
+            self._logger.debug('Scalar Twist given, converting to list size (%s)' % n)
             self.twist = [self.twist] * len(self.span)
 
         len_c = len(self.chord)
@@ -98,29 +113,33 @@ class Wing(Component):
         len_t = len(self.twist)
 
         if (len_c) != (n + 1):
-            self._logger.exception('Size of Chord list is not n+1, cannot form wing :: %s != (%s + 1)' % (len_c, n))
-            raise
+            message = 'Size of Chord list is not n+1, cannot form wing :: %s != (%s + 1)' % (len_c, n)
+            self._logger.error(message)
+            raise ValueError(message)
 
         if len_s != n:
             if len_s == 1:
                 self.sweep = self.sweep* len(self.span)
             else:
-                self._logger.exception('Size of Sweep Sweep is not n, cannot form wing :: %s != (%s)' % (len_s, n))
-                raise
+                message = 'Size of Sweep Sweep is not n, cannot form wing :: %s != (%s)' % (len_s, n)
+                self._logger.error(message)
+                raise ValueError(message)
 
         if len_p != n:
             if len_p == 1:
                 self.polyhedral = self.polyhedral* len(self.span)
             else:
-                self._logger.exception('Size of Polyhedral list is not n, cannot form wing :: %s != (%s)' % (len_p, n))
-                raise
+                message = 'Size of Polyhedral list is not n, cannot form wing :: %s != (%s)' % (len_p, n)
+                self._logger.error(message)
+                raise ValueError(message)
 
         if len_t != n:
             if len_t == 1:
                 self.twist = self.twist* len(self.span)
             else:
-                self._logger.exception('Size of Twist list is not n, cannot form wing :: %s != (%s)' % (len_t, n))
-                raise
+                message = 'Size of Twist list is not n, cannot form wing :: %s != (%s)' % (len_t, n)
+                self._logger.error(message)
+                raise ValueError(message)
 
         if self.airfoil is not None:
             if isinstance(self.airfoil, Airfoil):
@@ -133,8 +152,9 @@ class Wing(Component):
                 if len_a == 1:
                     self.airfoil = self.airfoil* (len(self.span) +1)
                 else:
-                    self._logger.exception('Size of Airfoil list is not n+1, cannot form wing :: %s != (%s + 1)' % (len_a, n))
-                    raise
+                    message = 'Size of Airfoil list is not n+1, cannot form wing :: %s != (%s + 1)' % (len_a, n)
+                    self._logger.error(message)
+                    raise ValueError(message)
 
 
     @property
@@ -173,6 +193,26 @@ class Wing(Component):
         return ar
 
 
+    def calculate_loads_body_frame(self, vehicle, control_manager, environment_manager, simulation_manager):
+        """
+        Strip theory loads of the wing at the vehicle's current state.
+
+        :return: (force, moment) in the vehicle body frame [N, N m], the moment about the wing position.
+        """
+        states = vehicle.states
+        velocity_b = vehicle.local_level_transform @ (states[VELOCITY] - environment_manager.wind(vehicle))
+        angular_rate = states[ANGULAR_RATE]
+        velocity_b = velocity_b + cross(angular_rate, self.position - vehicle.center_of_mass)
+        density = environment_manager.air_density(-states[POSITION][2])
+
+        rotation = self.handle.rotation
+        force, moment = self.strips.loads(rotation @ velocity_b, rotation @ angular_rate, density)
+        return rotation.T @ force, rotation.T @ moment
+
+    def calculate_angular_momentum_body_frame(self, body_rate):
+        return self.inertia @ body_rate + self.angular_momentum
+
+
     def planform_coordinates(self, half=False):
         len_c = len(self.chord)
         x_init = list()
@@ -190,7 +230,7 @@ class Wing(Component):
 
             if inx < len_c - 1:
                 rel_x += self.span[inx]
-                rel_y += self.span[inx]*np.sin(np.deg2rad(-self.sweep[inx]))
+                rel_y += self.span[inx]*np.tan(np.deg2rad(-self.sweep[inx]))
 
         x = list()
         y = list()
@@ -0,0 +1,134 @@
+import numpy as np
+
+
+def translate_inertia(inertia, mass, position):
+    """
+    Parallel axis theorem, from the center of mass to a point -position from it.
+
+    :param np.ndarray inertia: Inertia tensor about the center of mass [kg m^2], shape [3, 3].
+    :param float mass: Mass [kg].
+    :param np.ndarray position: Center of mass relative to the new reference point [m].
+    :return: The inertia tensor about the reference point.
+    """
+    position = np.asarray(position, dtype=np.float64)
+    return np.asarray(inertia) + mass * (position.dot(position) * np.eye(3) - np.outer(position, position))
+
+
+class MassProperties(object):
+    """
+    Running totals of the mass, first moment of mass and inertia (about the body origin) of a set of contributors,
+    e.g. the vehicles.component_store.ComponentStore of a Vehicle. Each contributor's contribution is kept, so adding,
+    removing or changing one contributor updates the totals by subtracting its old contribution and adding the new
+    one instead of summing every contributor again. The inertia about the center of mass and its inverse are cached
+    until a contribution changes.
+
+    Contributors provide mass_contribution() returning (mass, mass * position, inertia about the body origin).
+
+    e.x: store = ComponentStore()
+         tank = store.add(mass=20.0, position=np.array([0.5, 0.0, 0.0]))
+         properties = MassProperties()
+         properties.add(store)
+         tank.set_mass(tank.mass - burn_rate * dt)
+         properties.mark_dirty(store)                   # done by Vehicle.component_changed for its store
+         properties.inv_inertia                         # the store re-aggregates the tank row only, then inverts once
+    """
+
+    def __init__(self):
+        self._contributions = dict()
+        self._dirty = dict()
+        self._mass = 0.0
+        self._first_moment = np.zeros(3)
+        self._inertia_origin = np.zeros((3, 3))
+        self._inertia = None
+        self._inv_inertia = None
+        self.num_updates = 0
+
+    def __len__(self):
+        return len(self._contributions)
+
+    def add(self, component):
+        key = id(component)
+        if key in self._contributions:
+            raise ValueError('Component already added: %s' % component)
+        self._contributions[key] = (0.0, np.zeros(3), np.zeros((3, 3)))
+        self._dirty[key] = component
+
+    def remove(self, component):
+        key = id(component)
+        mass, first_moment, inertia = self._contributions.pop(key)
+        self._dirty.pop(key, None)
+        self._apply(-mass, -first_moment, -inertia)
+
+    def mark_dirty(self, component):
+        key = id(component)
+        if key in self._contributions:
+            self._dirty[key] = component
+
+    @property
+    def dirty(self):
+        return bool(self._dirty)
+
+    def update(self):
+        """
+        Fold the changes of the dirty components into the totals.
+        """
+        for key, component in self._dirty.items():
+            old_mass, old_first_moment, old_inertia = self._contributions[key]
+            mass, first_moment, inertia = component.mass_contribution()
+            self._apply(mass - old_mass, first_moment - old_first_moment, inertia - old_inertia)
+            self._contributions[key] = (mass, first_moment, inertia)
+            self.num_updates += 1
+        self._dirty.clear()
+
+    def rebuild(self, components):
+        """
+        Recompute the totals from scratch, clearing any round off accumulated by incremental updates.
+        """
+        self.__init__()
+        for component in components:
+            self.add(component)
+        self.update()
+
+    def _apply(self, mass, first_moment, inertia):
+        self._mass += mass
+        self._first_moment = self._first_moment + first_moment
+        self._inertia_origin = self._inertia_origin + inertia
+        self._inertia = None
+        self._inv_inertia = None
+
+    @property
+    def mass(self):
+        self.update()
+        return self._mass
+
+    @property
+    def center_of_mass(self):
+        self.update()
+        if self._mass == 0:
+            return np.zeros(3)
+        return self._first_moment / self._mass
+
+    @property
+    def inertia_origin(self):
+        """
+        Inertia tensor about the body origin.
+        """
+        self.update()
+        return self._inertia_origin
+
+    @property
+    def inertia(self):
+        """
+        Inertia tensor about the center of mass.
+        """
+        self.update()
+        if self._inertia is None:
+            self._inertia = translate_inertia(self._inertia_origin, -self._mass, self.center_of_mass)
+        return self._inertia
+
+    @property
+    def inv_inertia(self):
+        inertia = self.inertia
+        if self._inv_inertia is None:
+            self._inv_inertia = np.linalg.inv(inertia)
+        return self._inv_inertia
@@ -3,22 +3,25 @@ import logging
 
 import numpy as np
 
-from utilities.coordinate_systems import rotation_matrix
+from simulation.rigid_body import ANGULAR_RATE, QUATERNION, STATE_SIZE, VELOCITY
+from utilities.coordinate_systems import quaternion_to_dcm, quaternion_to_euler, skew
+from vehicles.component_store import ComponentStore
+from vehicles.mass_properties import MassProperties
 
 
 class Vehicle(object):
 
     def __init__(self, name, logger=None):
         self.components = list()
-        self.mass = 0.0
-        self.center_of_mass = np.zeros(3)
-        self.inertia = np.identity(3)
-        self.inv_inertia = np.linalg.inv(self.inertia)
+        self.store = ComponentStore(owner=self)  # Mass properties, spin rates and loads of every component
+        self.mass_properties = MassProperties()
+        self.mass_properties.add(self.store)
 
         self.inertia_changed = False
         self.mass_changed = False
 
-        self.states = np.zeros(12) # Translational and angular positions and rates
+        self.states = np.zeros(STATE_SIZE)  # Position, velocity, attitude quaternion and body rates, see rigid_body
+        self.states[QUATERNION] = (1.0, 0.0, 0.0, 0.0)
 
         self.name = name
         if logger is None:
@@ -27,22 +30,69 @@ class Vehicle(object):
 
     def add_component(self, component):
         self.components.append(component)
+        self.store.adopt(component.handle)
+
+    def remove_component(self, component):
+        self.components.remove(component)
+        ComponentStore(capacity=1).adopt(component.handle)
+
+    def component_changed(self, store):
+        """
+        Called by the component store when the mass, position, angle or inertia of a component changes.
+        """
+        self.mass_properties.mark_dirty(store)
         self.inertia_changed = True
         self.mass_changed = True
 
-    def update_inertia_and_mass(self):
-        self.mass = 0.0
-        self.inertia = np.matrix(np.zeros([3,3]))
-        self.center_of_mass = np.zeros(3)
+    def update_inertia_and_mass(self, rebuild=False):
+        """
+        Fold the changed components into the mass properties. Only the components marked dirty since the last update
+        are re-aggregated, rebuild=True sums every component again.
+        """
+        if rebuild:
+            self.store.rebuild()
+            self.mass_properties.rebuild([self.store])
+        elif self.inertia_changed or self.mass_changed:
+            self.mass_properties.update()
+        self.inertia_changed = False
+        self.mass_changed = False
+
+    @property
+    def mass(self):
+        self.update_inertia_and_mass()
+        return self.mass_properties.mass
 
-        for component in self.components:
-            self.mass += component.mass
-            self.inertia += component.inertia
-            self.center_of_mass += component.mass*component.position
+    @property
+    def center_of_mass(self):
+        self.update_inertia_and_mass()
+        return self.mass_properties.center_of_mass
+
+    @property
+    def inertia(self):
+        """
+        Inertia tensor about the center of mass in the body frame.
+        """
+        self.update_inertia_and_mass()
+        return self.mass_properties.inertia
+
+    @property
+    def inv_inertia(self):
+        self.update_inertia_and_mass()
+        return self.mass_properties.inv_inertia
 
-        self.center_of_mass /= self.mass
-        self.inv_inertia = np.linalg.inv(self.inertia)
 
+    def sum_component_loads(self, control_manager, environment_manager, simulation_manager):
+        """
+        Each component's loads, about its own position, are written into its row of the component store, then
+        summed about the center of mass in one vectorized reduction.
+        """
+        store = self.store
+        for component in self.components:
+            index = component.handle.index
+            store.force[index], store.moment[index] = component.calculate_loads_body_frame(
+                self, control_manager, environment_manager, simulation_manager)
+
+        return store.total_loads(self.center_of_mass)
 
     @abc.abstractmethod
     def calculate_loads_body_frame(self, control_manager, environment_manager, simulation_manager):
@@ -54,21 +104,23 @@ class Vehicle(object):
 
     @property
     def local_level_transform(self):
-        return rotation_matrix(self.states[6:9])
+        return quaternion_to_dcm(self.states[QUATERNION])
+
+    @property
+    def attitude(self):
+        return quaternion_to_euler(self.states[QUATERNION])
 
     @property
     def velocity(self):
-        return np.matrix([[self.state[3]],[self.state[4]],[self.state[5]]])
+        return self.states[VELOCITY].copy()
 
     @property
     def ang_rate(self):
-        return np.matrix([[self.state[9]],[self.state[10]],[self.state[11]]])
+        return self.states[ANGULAR_RATE].copy()
 
     @property
     def omega_be_b(self):
-        return np.matrix([[0, -self.state[8], self.state[7]],
-                          [self.state[8], 0, -self.state[6]],
-                          [-self.state[7], self.state[6], 0]])
+        return skew(self.states[ANGULAR_RATE])
 
 
     def log(self):